@@ -0,0 +1,61 @@
+from collections import Counter
+
+from django.db.models import Case, Count, F, IntegerField, Value, When
+
+from users.models import User
+
+from . import stats
+from .cache import invalidate
+from .models import Comment, Review, TitleStats
+
+
+def update_activity_count(author_id, field, delta):
+    """
+    Apply a change of the review or comment count stored on the author.
+    """
+    User.objects.filter(pk=author_id).update(**{field: F(field) + delta})
+
+
+def subtract_counts(queryset, field, counts):
+    """
+    Subtract {pk: count} from a counter column of many rows in one UPDATE.
+    """
+    if not counts:
+        return
+    queryset.filter(pk__in=counts).update(**{field: F(field) - Case(
+        *(When(pk=pk, then=Value(count)) for pk, count in counts.items()),
+        output_field=IntegerField())})
+
+
+def remove_comment(comment):
+    update_activity_count(comment.author_id, 'comment_count', -1)
+    stats.record_comment(comment.review_id, -1)
+    invalidate('comment')
+
+
+def remove_comments(comments):
+    """
+    Apply a delete of many comments to the counts of their authors and the
+    statistics of their titles with one grouped query and two UPDATEs.
+    """
+    authors, titles = Counter(), Counter()
+    for author_id, title_id, count in comments.order_by().values_list(
+            'author_id', 'review__title_id').annotate(Count('pk')):
+        authors[author_id] += count
+        titles[title_id] += count
+    if not authors:
+        return
+    subtract_counts(User.objects, 'comment_count', authors)
+    subtract_counts(TitleStats.objects, 'comment_count', titles)
+    invalidate('comment')
+
+
+def remove_title_activity(title):
+    """
+    Apply a delete of a title to the counts of the authors of its reviews
+    and their comments.
+    """
+    subtract_counts(User.objects, 'review_count', dict(
+        Review.objects.filter(title=title).order_by().values_list(
+            'author_id').annotate(Count('pk'))))
+    remove_comments(Comment.objects.filter(review__title=title))
@@ -1,6 +1,6 @@
 from django.contrib import admin
 
-from .models import Review, Comment, Category, Genre, Title
+from .models import Review, Comment, Category, Genre, Title, TitleStats
 
 
 class CategoryAdmin(admin.ModelAdmin):
@@ -15,10 +15,26 @@ class GenreAdmin(admin.ModelAdmin):
     list_filter = ('name', )
 
 
+class TitleStatsInline(admin.StackedInline):
+    """
+    Read-only statistics, kept up to date by the review and comment signals
+    on admin edits as well.
+    """
+    model = TitleStats
+    can_delete = False
+
+    def get_readonly_fields(self, request, obj=None):
+        return [field.name for field in TitleStats._meta.fields]
+
+    def has_add_permission(self, request, obj=None):
+        return False
+
+
 class TitleAdmin(admin.ModelAdmin):
     list_display = ('name', 'category')
     search_fields = ('name', )
     list_filter = ('name', )
+    inlines = (TitleStatsInline, )
 
 
 class ReviewAdmin(admin.ModelAdmin):
@@ -0,0 +1,222 @@
+from django.db import connection, transaction
+from django.db.models import Prefetch
+from rest_framework import serializers
+
+from .cache import invalidate
+from .models import Category, Genre, Title, TitleRanking, TitleStats
+from .serializers import TitleSerializer
+
+NOT_FOUND = 'Объект не найден.'
+DUPLICATE = 'Объект с таким slug уже существует.'
+REPEATED = 'Объект уже указан в этом пакете.'
+REQUIRED = serializers.Field.default_error_messages['required']
+
+
+class SlugBulkSerializer(serializers.Serializer):
+    name = serializers.CharField(max_length=200)
+    slug = serializers.SlugField(max_length=300)
+
+
+class TitleBulkSerializer(serializers.ModelSerializer):
+    """
+    One item of a bulk title write. Genre and category slugs are resolved
+    for the whole batch by TitleBulkWriter.
+    """
+    id = serializers.IntegerField(required=False)
+    genre = serializers.ListField(child=serializers.SlugField())
+    category = serializers.SlugField(required=False, allow_null=True)
+
+    class Meta:
+        model = Title
+        fields = ('id', 'name', 'year', 'description', 'genre', 'category')
+
+
+class BulkWriter:
+    """
+    Validate a list of items one by one, then write the valid ones with
+    batched queries. An update may name each object only once. write()
+    returns one result per item, in input order:
+    {'index', 'status': 'created' | 'updated' | 'error', 'data' | 'errors'}.
+    """
+    serializer_class = None
+    resource = None
+    lookup_field = None
+
+    def write(self, items, partial=False):
+        self.results = [None] * len(items)
+        valid = []
+        seen = set()
+        for index, item in enumerate(items):
+            serializer = self.serializer_class(data=item, partial=partial)
+            if not serializer.is_valid():
+                self.fail(index, serializer.errors)
+            elif not partial:
+                valid.append((index, serializer.validated_data))
+            elif self.lookup_field not in serializer.validated_data:
+                self.fail(index, {self.lookup_field: [REQUIRED]})
+            elif serializer.validated_data[self.lookup_field] in seen:
+                self.fail(index, {self.lookup_field: [REPEATED]})
+            else:
+                seen.add(serializer.validated_data[self.lookup_field])
+                valid.append((index, serializer.validated_data))
+        with transaction.atomic():
+            if partial:
+                self.update(valid)
+            else:
+                self.create(valid)
+            invalidate(self.resource)
+        return self.results
+
+    def fail(self, index, errors):
+        self.results[index] = {'index': index, 'status': 'error',
+                               'errors': errors}
+
+    def succeed(self, index, status, data):
+        self.results[index] = {'index': index, 'status': status,
+                               'data': data}
+
+    def create(self, valid):
+        raise NotImplementedError
+
+    def update(self, valid):
+        raise NotImplementedError
+
+
+class SlugBulkWriter(BulkWriter):
+    """
+    Bulk writes of categories or genres, matched by slug on update.
+    """
+    serializer_class = SlugBulkSerializer
+    lookup_field = 'slug'
+
+    def __init__(self, model, resource):
+        self.model = model
+        self.resource = resource
+
+    def create(self, valid):
+        slugs = [data['slug'] for _, data in valid]
+        taken = set(self.model.objects.filter(slug__in=slugs).values_list(
+            'slug', flat=True))
+        objs = []
+        for index, data in valid:
+            if data['slug'] in taken:
+                self.fail(index, {'slug': [DUPLICATE]})
+                continue
+            taken.add(data['slug'])
+            objs.append(self.model(**data))
+            self.succeed(index, 'created', dict(data))
+        self.model.objects.bulk_create(objs)
+
+    def update(self, valid):
+        objs = self.model.objects.in_bulk(
+            [data['slug'] for _, data in valid], field_name='slug')
+        changed = []
+        for index, data in valid:
+            obj = objs.get(data['slug'])
+            if obj is None:
+                self.fail(index, {'slug': [NOT_FOUND]})
+                continue
+            obj.name = data.get('name', obj.name)
+            changed.append(obj)
+            self.succeed(index, 'updated', {'name': obj.name,
+                                            'slug': obj.slug})
+        self.model.objects.bulk_update(changed, ['name'])
+
+
+class TitleBulkWriter(BulkWriter):
+    """
+    Bulk writes of titles, matched by id on update. All genre and category
+    slugs of the batch are resolved with one query per model and the genre
+    links are inserted in one batch.
+    """
+    serializer_class = TitleBulkSerializer
+    resource = 'title'
+    lookup_field = 'id'
+
+    def resolve(self, valid):
+        genre_slugs = {slug for _, data in valid
+                       for slug in data.get('genre', ())}
+        category_slugs = {data['category'] for _, data in valid
+                          if data.get('category')}
+        genres = Genre.objects.in_bulk(genre_slugs, field_name='slug')
+        categories = Category.objects.in_bulk(category_slugs,
+                                              field_name='slug')
+        resolved = []
+        for index, data in valid:
+            errors = {}
+            missing = [slug for slug in data.get('genre', ())
+                       if slug not in genres]
+            if missing:
+                errors['genre'] = [self.does_not_exist(slug)
+                                   for slug in missing]
+            if data.get('category') and data['category'] not in categories:
+                errors['category'] = [self.does_not_exist(data['category'])]
+            if errors:
+                self.fail(index, errors)
+                continue
+            data = dict(data)
+            if 'genre' in data:
+                data['genre'] = [genres[slug] for slug in data['genre']]
+            if data.get('category'):
+                data['category'] = categories[data['category']]
+            resolved.append((index, data))
+        return resolved
+
+    def does_not_exist(self, slug):
+        message = serializers.SlugRelatedField.default_error_messages[
+            'does_not_exist']
+        return message.format(slug_name='slug', value=slug)
+
+    def create(self, valid):
+        valid = self.resolve(valid)
+        titles = [Title(**{field: value for field, value in data.items()
+                           if field not in ('id', 'genre')})
+                  for _, data in valid]
+        if connection.features.can_return_rows_from_bulk_insert:
+            Title.objects.bulk_create(titles)
+            TitleRanking.objects.bulk_create(
+                [TitleRanking(title=title) for title in titles])
+            TitleStats.objects.bulk_create(
+                [TitleStats(title=title) for title in titles])
+        else:
+            for title in titles:
+                title.save()
+        self.link_genres(zip(titles, (data for _, data in valid)))
+        self.serialize(valid, [title.pk for title in titles], 'created')
+
+    def update(self, valid):
+        valid = self.resolve(valid)
+        titles = Title.objects.in_bulk([data['id'] for _, data in valid])
+        found, changed_fields = [], set()
+        for index, data in valid:
+            title = titles.get(data['id'])
+            if title is None:
+                self.fail(index, {'id': [NOT_FOUND]})
+                continue
+            for field, value in data.items():
+                if field not in ('id', 'genre'):
+                    setattr(title, field, value)
+                    changed_fields.add(field)
+            found.append((index, data))
+        if changed_fields:
+            Title.objects.bulk_update(
+                [titles[data['id']] for _, data in found], changed_fields)
+        relinked = [(titles[data['id']], data) for _, data in found
+                    if 'genre' in data]
+        Title.genre.through.objects.filter(
+            title__in=[title for title, _ in relinked]).delete()
+        self.link_genres(relinked)
+        self.serialize(found, [data['id'] for _, data in found], 'updated')
+
+    def link_genres(self, titles_and_data):
+        Title.genre.through.objects.bulk_create(
+            [Title.genre.through(title_id=title.pk, genre_id=genre.pk)
+             for title, data in titles_and_data
+             for genre in dict.fromkeys(data.get('genre', ()))])
+
+    def serialize(self, valid, pks, status):
+        titles = Title.objects.select_related('category').prefetch_related(
+            Prefetch('genre', queryset=Genre.objects.order_by('pk'))
+        ).in_bulk(pks)
+        for (index, _), pk in zip(valid, pks):
+            self.succeed(index, status, TitleSerializer(titles[pk]).data)
@@ -0,0 +1,153 @@
+import hashlib
+import json
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.utils.cache import patch_vary_headers
+from django.utils.http import http_date, parse_http_date_safe, \
+    quote_etag
+
+from rest_framework import status
+from rest_framework.response import Response
+
+from api_yamdb.db.router import reading_from_replicas
+from api_yamdb.metrics import record_cache_lookup
+
+VERSION_KEY = 'response-cache:version:{}'
+# Set for DATABASE_REPLICA_PIN_SECONDS after a write to the resource.
+CHANGED_KEY = 'response-cache:changed:{}'
+ENTRY_KEY = 'response-cache:entry:{}'
+
+# Resources whose writes change the representation of a cached resource.
+DEPENDENCIES = {
+    'category': ('category', ),
+    'genre': ('genre', ),
+    'title': ('title', 'category', 'genre'),
+    # Titles with embedded statistics, see TitleViewSet.
+    'title-stats': ('title', 'category', 'genre', 'comment'),
+}
+
+
+def get_cache():
+    return caches[settings.RESPONSE_CACHE_ALIAS]
+
+
+def get_role(user):
+    if not user or not user.is_authenticated:
+        return 'anon'
+    if user.is_superuser or user.is_staff:
+        return 'staff'
+    return user.role
+
+
+def make_key(request, resource):
+    """
+    Build the cache key of a response from the normalized URL, the sorted
+    query string, the role of the user and the current versions of every
+    resource it depends on. Also return whether any of them was written
+    recently enough for the replicas to lag behind.
+    """
+    dependencies = DEPENDENCIES[resource]
+    version_keys = [VERSION_KEY.format(name) for name in dependencies]
+    changed_keys = [CHANGED_KEY.format(name) for name in dependencies]
+    versions = get_cache().get_many(version_keys + changed_keys)
+    query = sorted(
+        (key, value) for key, values in request.query_params.lists()
+        for value in values)
+    raw_key = json.dumps([
+        request.build_absolute_uri(request.path).rstrip('/'),
+        query,
+        get_role(request.user),
+        [versions.get(key, 0) for key in version_keys],
+    ])
+    changed = any(key in versions for key in changed_keys)
+    return ENTRY_KEY.format(hashlib.md5(raw_key.encode()).hexdigest()), \
+        changed
+
+
+def bump_version(resource):
+    cache = get_cache()
+    key = VERSION_KEY.format(resource)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, 1, timeout=None)
+    if settings.DATABASE_REPLICAS:
+        cache.set(CHANGED_KEY.format(resource), 1,
+                  settings.DATABASE_REPLICA_PIN_SECONDS)
+
+
+def invalidate(resource):
+    """
+    Drop every cached response depending on the resource.
+    The version is bumped again on commit, so a response rendered from
+    the pre-commit state by a concurrent reader is not served afterwards.
+    """
+    bump_version(resource)
+    transaction.on_commit(lambda: bump_version(resource))
+
+
+class CachedResponseMixin:
+    """
+    Serve list and retrieve responses of a viewset from the response cache.
+    Entries are invalidated by bumping resource versions from model signals
+    and carry ETag and Last-Modified headers for conditional requests.
+    Within DATABASE_REPLICA_PIN_SECONDS of a write to a resource, misses
+    are rendered from the primary, so a lagging replica does not fill the
+    new version with the old state.
+    """
+    cache_resource = None
+
+    def cached_response(self, request, method, *args, **kwargs):
+        cache = get_cache()
+        key, changed = make_key(request, self.cache_resource)
+        entry = cache.get(key)
+        record_cache_lookup(self.cache_resource, entry is not None)
+        if entry is None:
+            if changed:
+                with reading_from_replicas(False):
+                    response = method(request, *args, **kwargs)
+            else:
+                response = method(request, *args, **kwargs)
+            if response.status_code != status.HTTP_200_OK:
+                return response
+            content = json.dumps(response.data, cls=DjangoJSONEncoder,
+                                 sort_keys=True)
+            entry = {
+                'data': response.data,
+                'etag': quote_etag(hashlib.md5(content.encode()).hexdigest()),
+                'last_modified': int(time.time()),
+            }
+            cache.set(key, entry, settings.RESPONSE_CACHE_TIMEOUT)
+
+        headers = {
+            'ETag': entry['etag'],
+            'Last-Modified': http_date(entry['last_modified']),
+        }
+        if self.is_not_modified(request, entry):
+            response = Response(status=status.HTTP_304_NOT_MODIFIED,
+                                headers=headers)
+        else:
+            response = Response(entry['data'], headers=headers)
+        patch_vary_headers(response, ('Authorization', ))
+        return response
+
+    def is_not_modified(self, request, entry):
+        if_none_match = request.META.get('HTTP_IF_NONE_MATCH')
+        if if_none_match is not None:
+            etags = [etag.strip() for etag in if_none_match.split(',')]
+            return entry['etag'] in etags or '*' in etags
+        if_modified_since = parse_http_date_safe(
+            request.META.get('HTTP_IF_MODIFIED_SINCE', ''))
+        return (if_modified_since is not None
+                and entry['last_modified'] <= if_modified_since)
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(request, super().list, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_response(request, super().retrieve, *args,
+                                    **kwargs)
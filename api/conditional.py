@@ -0,0 +1,108 @@
+import hashlib
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.utils.http import parse_etags, quote_etag
+
+from rest_framework import status
+from rest_framework.exceptions import APIException
+from rest_framework.response import Response
+
+VERSION_FIELD = 'updated_at'
+
+
+class PreconditionFailed(APIException):
+    status_code = status.HTTP_412_PRECONDITION_FAILED
+    default_detail = 'Объект изменился, загрузите его заново.'
+    default_code = 'precondition_failed'
+
+
+def get_version(row):
+    if isinstance(row, dict):
+        return row[VERSION_FIELD]
+    return getattr(row, VERSION_FIELD)
+
+
+def object_etag(pk, version):
+    return quote_etag(f'{pk}-{version:%Y%m%d%H%M%S%f}')
+
+
+def list_etag(rows, meta):
+    """
+    ETag of a page from the primary keys of its rows, the latest version
+    among them and the pagination metadata (count and links).
+    """
+    pks = [row['id'] if isinstance(row, dict) else row.pk for row in rows]
+    latest = max(map(get_version, rows), default=None)
+    content = json.dumps([pks, latest, meta], cls=DjangoJSONEncoder)
+    return quote_etag(hashlib.md5(content.encode()).hexdigest())
+
+
+def etag_matches(header, etag, weak=False):
+    """
+    Compare an ETag with an If-Match (strong comparison) or If-None-Match
+    (weak comparison) header.
+    """
+    etags = parse_etags(header)
+    if etags == ['*']:
+        return True
+    if weak:
+        etags = [value[2:] if value.startswith('W/') else value
+                 for value in etags]
+    return etag in etags
+
+
+def not_modified(request, etag):
+    if_none_match = request.META.get('HTTP_IF_NONE_MATCH')
+    return if_none_match is not None and etag_matches(if_none_match, etag,
+                                                      weak=True)
+
+
+def not_modified_response(etag):
+    return Response(status=status.HTTP_304_NOT_MODIFIED,
+                    headers={'ETag': etag})
+
+
+class ConditionalObjectMixin:
+    """
+    Strong ETags of a single object from its row version. GET answers
+    If-None-Match with 304 before serializing; PATCH, PUT and DELETE with
+    If-Match are applied only if the row still has that version, checked
+    under a row lock.
+    """
+    def get_etag(self, instance):
+        return object_etag(instance.pk, get_version(instance))
+
+    def retrieve(self, request, *args, **kwargs):
+        instance = self.get_object()
+        etag = self.get_etag(instance)
+        if not_modified(request, etag):
+            return not_modified_response(etag)
+        serializer = self.get_serializer(instance)
+        return Response(serializer.data, headers={'ETag': etag})
+
+    def update(self, request, *args, **kwargs):
+        response = super().update(request, *args, **kwargs)
+        response['ETag'] = self.get_etag(self.get_object())
+        return response
+
+    def check_if_match(self, instance):
+        if_match = self.request.META.get('HTTP_IF_MATCH')
+        if if_match is None:
+            return
+        current = type(instance).objects.select_for_update().filter(
+            pk=instance.pk).values_list(VERSION_FIELD, flat=True).first()
+        if (current != get_version(instance)
+                or not etag_matches(if_match, self.get_etag(instance))):
+            raise PreconditionFailed()
+
+    def perform_update(self, serializer):
+        with transaction.atomic():
+            self.check_if_match(serializer.instance)
+            super().perform_update(serializer)
+
+    def perform_destroy(self, instance):
+        with transaction.atomic():
+            self.check_if_match(instance)
+            super().perform_destroy(instance)
@@ -0,0 +1,112 @@
+import csv
+import json
+from datetime import datetime
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils.dateparse import parse_date, parse_datetime
+
+from .models import Comment, Review
+
+# Columns of data/review.csv and data/comments.csv with the fields they
+# are read from.
+EXPORTS = {
+    'reviews': (Review, (
+        ('id', 'id'),
+        ('title_id', 'title_id'),
+        ('text', 'text'),
+        ('author', 'author_id'),
+        ('score', 'score'),
+        ('pub_date', 'pub_date'),
+    ), 'title_id'),
+    'comments': (Comment, (
+        ('id', 'id'),
+        ('review_id', 'review_id'),
+        ('text', 'text'),
+        ('author', 'author_id'),
+        ('pub_date', 'pub_date'),
+    ), 'review__title_id'),
+}
+FORMATS = ('ndjson', 'csv')
+CONTENT_TYPES = {
+    'ndjson': 'application/x-ndjson; charset=utf-8',
+    'csv': 'text/csv; charset=utf-8',
+}
+
+
+ENCODER = DjangoJSONEncoder()
+
+
+class ExportError(ValueError):
+    pass
+
+
+def parse_moment(value):
+    try:
+        moment = parse_datetime(value) or parse_date(value)
+    except ValueError:
+        moment = None
+    if moment is None:
+        raise ExportError(f'Неверная дата: {value}.')
+    return moment
+
+
+def get_rows(resource, title=None, author=None, since=None, until=None):
+    """
+    values_list queryset of the exported columns, filtered by title id,
+    author username and a [since, until) pub_date range.
+    """
+    model, columns, title_lookup = EXPORTS[resource]
+    queryset = model.objects.order_by('pk')
+    if title is not None:
+        if not str(title).isdigit():
+            raise ExportError(f'Неверный id произведения: {title}.')
+        queryset = queryset.filter(**{title_lookup: int(title)})
+    if author is not None:
+        queryset = queryset.filter(author__username=author)
+    if since is not None:
+        queryset = queryset.filter(pub_date__gte=parse_moment(since))
+    if until is not None:
+        queryset = queryset.filter(pub_date__lt=parse_moment(until))
+    return queryset.values_list(*(field for _, field in columns))
+
+
+def encode_value(value):
+    # Dates as in the CSV files and JSON responses: 2019-09-24T21:08:21.567Z
+    if isinstance(value, datetime):
+        return ENCODER.default(value)
+    return value
+
+
+class Echo:
+    def write(self, value):
+        return value
+
+
+def stream(resource, rows, output_format):
+    """
+    Yield the rows as NDJSON or CSV text, reading them with a server-side
+    cursor and joining EXPORT_CHUNK_SIZE rows per chunk, so memory does not
+    grow with the number of rows.
+    """
+    chunk_size = settings.EXPORT_CHUNK_SIZE
+    header = [name for name, _ in EXPORTS[resource][1]]
+    if output_format == 'csv':
+        writer = csv.writer(Echo(), lineterminator='\n')
+        yield writer.writerow(header)
+
+        def format_row(row):
+            return writer.writerow([encode_value(value) for value in row])
+    else:
+        def format_row(row):
+            return json.dumps(
+                dict(zip(header, (encode_value(value) for value in row))),
+                ensure_ascii=False) + '\n'
+    lines = []
+    for row in rows.iterator(chunk_size=chunk_size):
+        lines.append(format_row(row))
+        if len(lines) >= chunk_size:
+            yield ''.join(lines)
+            lines = []
+    if lines:
+        yield ''.join(lines)
@@ -1,15 +1,60 @@
+from django.db.models import CharField, Count, F, IntegerField, Value
 from django_filters import rest_framework as filters
 
 from .models import Title
+from .search import search_titles
+
+YEAR_BUCKET = 10
 
 
 class TitlesFilter(filters.FilterSet):
+    q = filters.CharFilter(method='search')
     name = filters.CharFilter(field_name='name', lookup_expr='contains')
-    category = filters.CharFilter(field_name='category__slug',
-                                  lookup_expr='contains')
-    genre = filters.CharFilter(field_name='genre__slug',
-                               lookup_expr='contains')
+    category = filters.CharFilter(field_name='category__slug')
+    genre = filters.CharFilter(field_name='genre__slug')
 
     class Meta():
         model = Title
-        fields = ['name', 'genre', 'category', 'year']
+        fields = ['q', 'name', 'genre', 'category', 'year']
+
+    def search(self, queryset, name, value):
+        return search_titles(queryset, value)
+
+    def facet_counts(self):
+        """
+        Count the filtered titles per genre, category and decade in one
+        query: the three grouped counts are combined with UNION ALL.
+        """
+        titles = Title.objects.filter(pk__in=self.qs.order_by().values('pk'))
+        no_slug = Value(None, output_field=CharField())
+        no_start = Value(None, output_field=IntegerField())
+        genres = Title.genre.through.objects.filter(
+            title__in=titles).values(
+                facet=Value('genre', output_field=CharField()),
+                slug=F('genre__slug'), label=F('genre__name'),
+                start=no_start).annotate(count=Count('title_id')).order_by()
+        categories = titles.filter(category__isnull=False).values(
+            facet=Value('category', output_field=CharField()),
+            slug=F('category__slug'), label=F('category__name'),
+            start=no_start).annotate(count=Count('pk')).order_by()
+        years = titles.filter(year__isnull=False).values(
+            facet=Value('year', output_field=CharField()),
+            slug=no_slug, label=no_slug,
+            start=F('year') / YEAR_BUCKET * YEAR_BUCKET).annotate(
+                count=Count('pk')).order_by()
+        facets = {'genre': [], 'category': [], 'year': []}
+        for row in sorted(genres.union(categories, years, all=True),
+                          key=lambda row: (row['slug'] or '',
+                                           row['start'] or 0)):
+            if row['facet'] == 'year':
+                facets['year'].append({
+                    'from': row['start'],
+                    'to': row['start'] + YEAR_BUCKET - 1,
+                    'count': row['count'],
+                })
+            else:
+                facets[row['facet']].append({
+                    'slug': row['slug'], 'name': row['label'],
+                    'count': row['count'],
+                })
+        return facets
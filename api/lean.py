@@ -0,0 +1,48 @@
+from rest_framework import serializers
+
+DATETIME = serializers.DateTimeField().to_representation
+
+
+class LeanListSerializer:
+    """
+    Read-only list serialization from values() rows. Only the listed
+    columns are fetched, related names come from joins instead of lazy
+    loads, and every row becomes a plain dict with the keys and values the
+    matching ModelSerializer produces.
+    """
+    def __init__(self, *fields):
+        # (output name, values() lookup, converter or None)
+        self.fields = fields
+
+    def get_rows(self, queryset, *extra):
+        """
+        Rows with the columns of the fields and the extra lookups.
+        """
+        return queryset.values(*dict.fromkeys(
+            [*(lookup for _, lookup, _ in self.fields), *extra]))
+
+    def to_representation(self, rows):
+        fields = self.fields
+        return [
+            {name: row[lookup] if convert is None else convert(row[lookup])
+             for name, lookup, convert in fields}
+            for row in rows
+        ]
+
+
+# Same output as ReviewSerializer and CommentSerializer.
+REVIEW_LIST = LeanListSerializer(
+    ('id', 'id', None),
+    ('author', 'author__username', None),
+    ('title', 'title__name', None),
+    ('text', 'text', None),
+    ('score', 'score', None),
+    ('pub_date', 'pub_date', DATETIME),
+)
+COMMENT_LIST = LeanListSerializer(
+    ('id', 'id', None),
+    ('author', 'author__username', None),
+    ('review', 'review_id', None),
+    ('text', 'text', None),
+    ('pub_date', 'pub_date', DATETIME),
+)
@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from api.export import EXPORTS, FORMATS, ExportError, get_rows, stream
+
+
+class Command(BaseCommand):
+    help = ('Stream all reviews or comments as NDJSON or CSV in the format '
+            'of data/review.csv and data/comments.csv.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('resource', choices=sorted(EXPORTS))
+        parser.add_argument('--format', dest='output_format',
+                            choices=FORMATS, default='ndjson')
+        parser.add_argument('--title', help='Title id.')
+        parser.add_argument('--author', help='Author username.')
+        parser.add_argument('--since', help='First pub_date, inclusive.')
+        parser.add_argument('--until', help='Last pub_date, exclusive.')
+        parser.add_argument('--output', help='File to write, stdout if not '
+                                             'set.')
+
+    def handle(self, *args, **options):
+        try:
+            rows = get_rows(options['resource'],
+                            title=options['title'],
+                            author=options['author'],
+                            since=options['since'],
+                            until=options['until'])
+        except ExportError as exc:
+            raise CommandError(str(exc))
+        chunks = stream(options['resource'], rows, options['output_format'])
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8',
+                      newline='') as output:
+                output.writelines(chunks)
+        else:
+            for chunk in chunks:
+                self.stdout.write(chunk, ending='')
@@ -0,0 +1,195 @@
+import csv
+import io
+import os
+import time
+from contextlib import contextmanager
+from itertools import islice
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.core.management.color import no_style
+from django.db import connection, transaction
+
+from api.cache import invalidate
+from api.models import Category, Comment, Genre, Review, Title
+from users.models import User
+
+# Files in dependency order with the model they fill and the renamed columns.
+IMPORTS = (
+    ('users.csv', User, {'description': 'bio'}),
+    ('category.csv', Category, {}),
+    ('genre.csv', Genre, {}),
+    ('titles.csv', Title, {'category': 'category_id'}),
+    ('genre_title.csv', Title.genre.through, {}),
+    ('review.csv', Review, {'author': 'author_id'}),
+    ('comments.csv', Comment, {'author': 'author_id'}),
+)
+
+# Rows repeating these values are skipped, the first one is kept.
+UNIQUE_FIELDS = {
+    Review: ('title_id', 'author_id'),
+}
+
+
+@contextmanager
+def keep_auto_now_values(model):
+    """
+    Let bulk_create store the imported pub_date instead of now().
+    """
+    fields = [field for field in model._meta.concrete_fields
+              if getattr(field, 'auto_now_add', False)]
+    for field in fields:
+        field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field in fields:
+            field.auto_now_add = True
+
+
+def copy_field(value):
+    if value is None:
+        return ''
+    return '"{}"'.format(str(value).replace('"', '""'))
+
+
+class Command(BaseCommand):
+    help = ('Load the CSV files from data/ in dependency order. '
+            'Uses COPY FROM STDIN on PostgreSQL and bulk_create elsewhere.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--path',
+                            default=os.path.join(settings.BASE_DIR, 'data'),
+                            help='Directory with the CSV files.')
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--no-copy',
+                            action='store_true',
+                            help='Use bulk_create even on PostgreSQL.')
+
+    def handle(self, *args, **options):
+        self.batch_size = options['batch_size']
+        self.use_copy = (connection.vendor == 'postgresql'
+                         and not options['no_copy'])
+        self.password = make_password(None)
+        self.skipped_ids = {}
+        models = []
+        for filename, model, columns in IMPORTS:
+            path = os.path.join(options['path'], filename)
+            if not os.path.exists(path):
+                self.stdout.write(f'{filename}: skipped, file not found')
+                continue
+            started = time.monotonic()
+            with transaction.atomic():
+                count = self.import_file(path, model, columns)
+            elapsed = time.monotonic() - started
+            rate = count / elapsed if elapsed else count
+            skipped = len(self.skipped_ids.get(model, ()))
+            self.stdout.write(f'{filename}: {count} rows in {elapsed:.2f}s '
+                              f'({rate:.0f} rows/s), {skipped} skipped')
+            models.append(model)
+
+        self.reset_sequences(models)
+        call_command('rebuild_ratings', stdout=self.stdout)
+        call_command('rebuild_user_counts', stdout=self.stdout)
+        call_command('refresh_rankings', stdout=self.stdout)
+        call_command('rebuild_title_stats', stdout=self.stdout)
+        for resource in ('category', 'genre', 'title'):
+            invalidate(resource)
+        self.stdout.write(self.style.SUCCESS('Import finished.'))
+
+    def import_file(self, path, model, columns):
+        fields = {field.attname: field
+                  for field in model._meta.concrete_fields}
+        count = 0
+        with open(path, encoding='utf-8', newline='') as csv_file:
+            reader = csv.DictReader(csv_file)
+            unknown = {columns.get(name, name)
+                       for name in reader.fieldnames} - set(fields)
+            if unknown:
+                raise CommandError(f'{os.path.basename(path)}: unknown '
+                                   f'columns {", ".join(sorted(unknown))}')
+            objects = self.skip_duplicates(
+                model, (self.build(model, fields, columns, row)
+                        for row in reader))
+            while True:
+                batch = list(islice(objects, self.batch_size))
+                if not batch:
+                    break
+                if self.use_copy:
+                    self.copy(model, batch)
+                else:
+                    with keep_auto_now_values(model):
+                        model.objects.bulk_create(batch)
+                count += len(batch)
+        return count
+
+    def build(self, model, fields, columns, row):
+        values = {}
+        for name, value in row.items():
+            field = fields[columns.get(name, name)]
+            if value == '' and field.null:
+                value = None
+            values[field.attname] = field.to_python(value)
+        if model is User:
+            values.setdefault('password', self.password)
+        return model(**values)
+
+    def skip_duplicates(self, model, objects):
+        """
+        Drop rows breaking a unique constraint and rows referencing them.
+        """
+        unique_fields = UNIQUE_FIELDS.get(model)
+        references = [
+            (field.attname, self.skipped_ids[field.related_model])
+            for field in model._meta.concrete_fields
+            if field.is_relation and field.related_model in self.skipped_ids
+        ]
+        if not unique_fields and not references:
+            yield from objects
+            return
+        skipped = self.skipped_ids.setdefault(model, set())
+        seen = set()
+        for obj in objects:
+            if any(getattr(obj, attname) in ids
+                   for attname, ids in references):
+                skipped.add(obj.pk)
+                continue
+            if unique_fields:
+                key = tuple(getattr(obj, name) for name in unique_fields)
+                if key in seen:
+                    skipped.add(obj.pk)
+                    continue
+                seen.add(key)
+            yield obj
+
+    def copy_buffer(self, model, batch):
+        """
+        Write the batch as CSV for COPY. NULL is an unquoted empty field and
+        every other value is quoted, so an empty string stays an empty
+        string and is not loaded as NULL.
+        """
+        buffer = io.StringIO()
+        for obj in batch:
+            buffer.write(','.join(
+                copy_field(field.get_db_prep_save(getattr(obj, field.attname),
+                                                  connection))
+                for field in model._meta.concrete_fields))
+            buffer.write('\n')
+        buffer.seek(0)
+        return buffer
+
+    def copy(self, model, batch):
+        columns = ', '.join(connection.ops.quote_name(field.column)
+                            for field in model._meta.concrete_fields)
+        sql = (f'COPY {connection.ops.quote_name(model._meta.db_table)} '
+               f'({columns}) FROM STDIN WITH (FORMAT csv)')
+        with connection.cursor() as cursor:
+            cursor.copy_expert(sql, self.copy_buffer(model, batch))
+
+    def reset_sequences(self, models):
+        statements = connection.ops.sequence_reset_sql(no_style(), models)
+        with connection.cursor() as cursor:
+            for sql in statements:
+                cursor.execute(sql)
@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, F, IntegerField, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce, NullIf
+
+from api.cache import invalidate
+from api.models import Review, Title
+
+
+class Command(BaseCommand):
+    help = 'Recompute stored rating aggregates of all titles from reviews.'
+
+    def handle(self, *args, **options):
+        reviews = Review.objects.filter(
+            title=OuterRef('pk')).order_by().values('title')
+        score_sum = Subquery(
+            reviews.annotate(total=Sum('score')).values('total'),
+            output_field=IntegerField())
+        score_count = Subquery(
+            reviews.annotate(total=Count('pk')).values('total'),
+            output_field=IntegerField())
+        with transaction.atomic():
+            updated = Title.objects.update(
+                rating_sum=Coalesce(score_sum, 0),
+                rating_count=Coalesce(score_count, 0),
+            )
+            Title.objects.update(
+                rating=F('rating_sum') / NullIf('rating_count', 0))
+            invalidate('title')
+        self.stdout.write(
+            self.style.SUCCESS(f'Rebuilt ratings for {updated} titles.'))
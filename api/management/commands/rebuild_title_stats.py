@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+
+from api import stats
+from api.cache import invalidate
+
+
+class Command(BaseCommand):
+    help = ('Recompute review statistics of all titles in chunks, several '
+            'chunks at a time.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=4,
+                            help='Chunks recomputed in parallel.')
+        parser.add_argument('--chunk-size', type=int,
+                            default=stats.CHUNK_SIZE,
+                            help='Titles per chunk and transaction.')
+
+    def handle(self, *args, **options):
+        updated = stats.rebuild(workers=options['workers'],
+                                chunk_size=options['chunk_size'])
+        invalidate('title')
+        self.stdout.write(
+            self.style.SUCCESS(f'Rebuilt statistics of {updated} titles.'))
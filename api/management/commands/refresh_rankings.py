@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from api import ranking
+from api.cache import invalidate
+
+
+class Command(BaseCommand):
+    help = ('Recompute top and trending rankings of all titles. Run it '
+            'periodically to refresh the mean score used by /titles/top/.')
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            updated = ranking.rebuild()
+            invalidate('title')
+        self.stdout.write(
+            self.style.SUCCESS(f'Refreshed rankings of {updated} titles.'))
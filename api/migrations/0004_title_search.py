@@ -0,0 +1,62 @@
+# Generated by Django 3.0.8 on 2026-10-18 18:36
+
+import django.contrib.postgres.search
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations
+
+CREATE_SEARCH_SQL = """
+CREATE FUNCTION api_title_search_vector_update() RETURNS trigger AS $$
+BEGIN
+    NEW.search_vector :=
+        setweight(to_tsvector('russian', coalesce(NEW.name, '')), 'A') ||
+        setweight(to_tsvector('russian', coalesce(NEW.description, '')), 'B');
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER api_title_search_vector_trigger
+    BEFORE INSERT OR UPDATE OF name, description ON api_title
+    FOR EACH ROW EXECUTE PROCEDURE api_title_search_vector_update();
+
+UPDATE api_title SET name = name;
+
+CREATE INDEX api_title_search_vector_idx
+    ON api_title USING gin (search_vector);
+CREATE INDEX api_title_name_trgm_idx
+    ON api_title USING gin (name gin_trgm_ops);
+"""
+
+DROP_SEARCH_SQL = """
+DROP INDEX IF EXISTS api_title_name_trgm_idx;
+DROP INDEX IF EXISTS api_title_search_vector_idx;
+DROP TRIGGER IF EXISTS api_title_search_vector_trigger ON api_title;
+DROP FUNCTION IF EXISTS api_title_search_vector_update();
+"""
+
+
+def create_search_objects(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(CREATE_SEARCH_SQL, params=None)
+
+
+def drop_search_objects(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(DROP_SEARCH_SQL, params=None)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0003_feed_indexes'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.AddField(
+            model_name='title',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(
+                editable=False, null=True),
+        ),
+        migrations.RunPython(create_search_objects, drop_search_objects),
+    ]
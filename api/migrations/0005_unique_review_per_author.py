@@ -0,0 +1,44 @@
+# Generated by Django 3.0.8 on 2026-10-18 18:43
+
+from django.db import migrations, models
+
+
+def delete_duplicate_reviews(apps, schema_editor):
+    """
+    Keep the first review of every author on a title, as the API did.
+    """
+    Title = apps.get_model('api', 'Title')
+    Review = apps.get_model('api', 'Review')
+    duplicates = Review.objects.values('title', 'author').annotate(
+        first_id=models.Min('pk'),
+        total=models.Count('pk')).filter(total__gt=1).order_by()
+    title_ids = set()
+    for row in duplicates:
+        Review.objects.filter(title=row['title'], author=row['author']).exclude(
+            pk=row['first_id']).delete()
+        title_ids.add(row['title'])
+    for title_id in title_ids:
+        aggregate = Review.objects.filter(title=title_id).aggregate(
+            score_sum=models.Sum('score'), score_count=models.Count('pk'))
+        Title.objects.filter(pk=title_id).update(
+            rating_sum=aggregate['score_sum'],
+            rating_count=aggregate['score_count'],
+            rating=aggregate['score_sum'] // aggregate['score_count'],
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0004_title_search'),
+    ]
+
+    operations = [
+        migrations.RunPython(delete_duplicate_reviews,
+                             migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='review',
+            constraint=models.UniqueConstraint(
+                fields=('title', 'author'), name='unique_review_per_author'),
+        ),
+    ]
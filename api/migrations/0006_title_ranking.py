@@ -0,0 +1,67 @@
+# Generated by Django 3.0.8 on 2026-10-18 19:00
+
+import math
+from datetime import datetime
+
+from django.conf import settings
+from django.db import migrations, models
+from django.utils import timezone
+import django.db.models.deletion
+
+
+def fill_rankings(apps, schema_editor):
+    Title = apps.get_model('api', 'Title')
+    Review = apps.get_model('api', 'Review')
+    TitleRanking = apps.get_model('api', 'TitleRanking')
+    totals = Title.objects.aggregate(score_sum=models.Sum('rating_sum'),
+                                     score_count=models.Sum('rating_count'))
+    mean = (totals['score_sum'] / totals['score_count']
+            if totals['score_count'] else 0.0)
+    weight = settings.TOP_TITLES_MIN_REVIEWS
+    epoch = datetime(2020, 1, 1, tzinfo=timezone.utc)
+    half_life = settings.TRENDING_HALF_LIFE_HOURS * 3600
+    trending = {}
+    for title_id, pub_date in Review.objects.values_list('title_id',
+                                                         'pub_date'):
+        exponent = (pub_date - epoch).total_seconds() / half_life
+        total = trending.get(title_id)
+        if total is not None:
+            high, low = max(total, exponent), min(total, exponent)
+            exponent = high + math.log2(1 + 2 ** (low - high))
+        trending[title_id] = exponent
+    TitleRanking.objects.bulk_create(
+        TitleRanking(
+            title_id=title_id,
+            bayesian_rating=((score_sum + weight * mean)
+                             / (score_count + weight)
+                             if score_count else None),
+            trending=trending.get(title_id))
+        for title_id, score_sum, score_count in Title.objects.values_list(
+            'pk', 'rating_sum', 'rating_count'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0005_unique_review_per_author'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TitleRanking',
+            fields=[
+                ('title', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='ranking', serialize=False, to='api.Title')),
+                ('bayesian_rating', models.FloatField(null=True)),
+                ('trending', models.FloatField(null=True)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='titleranking',
+            index=models.Index(fields=['-bayesian_rating', 'title'], name='ranking_top_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='titleranking',
+            index=models.Index(fields=['-trending', 'title'], name='ranking_trending_idx'),
+        ),
+        migrations.RunPython(fill_rankings, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,56 @@
+# Generated by Django 3.0.8 on 2026-10-18 19:13
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def fill_title_stats(apps, schema_editor):
+    Title = apps.get_model('api', 'Title')
+    Review = apps.get_model('api', 'Review')
+    Comment = apps.get_model('api', 'Comment')
+    TitleStats = apps.get_model('api', 'TitleStats')
+    stats = {pk: TitleStats(title_id=pk)
+             for pk in Title.objects.values_list('pk', flat=True)}
+    for title_id, score, pub_date in Review.objects.values_list(
+            'title_id', 'score', 'pub_date'):
+        row = stats[title_id]
+        row.review_count += 1
+        if 1 <= score <= 10:
+            field = f'score_{score}'
+            setattr(row, field, getattr(row, field) + 1)
+        if row.last_review_at is None or pub_date > row.last_review_at:
+            row.last_review_at = pub_date
+    for title_id in Comment.objects.values_list('review__title_id',
+                                                flat=True):
+        stats[title_id].comment_count += 1
+    TitleStats.objects.bulk_create(stats.values())
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0007_author_feed_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TitleStats',
+            fields=[
+                ('title', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to='api.Title')),
+                ('review_count', models.PositiveIntegerField(default=0)),
+                ('comment_count', models.PositiveIntegerField(default=0)),
+                ('score_1', models.PositiveIntegerField(default=0)),
+                ('score_2', models.PositiveIntegerField(default=0)),
+                ('score_3', models.PositiveIntegerField(default=0)),
+                ('score_4', models.PositiveIntegerField(default=0)),
+                ('score_5', models.PositiveIntegerField(default=0)),
+                ('score_6', models.PositiveIntegerField(default=0)),
+                ('score_7', models.PositiveIntegerField(default=0)),
+                ('score_8', models.PositiveIntegerField(default=0)),
+                ('score_9', models.PositiveIntegerField(default=0)),
+                ('score_10', models.PositiveIntegerField(default=0)),
+                ('last_review_at', models.DateTimeField(null=True)),
+            ],
+        ),
+        migrations.RunPython(fill_title_stats, migrations.RunPython.noop),
+    ]
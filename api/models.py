@@ -1,4 +1,8 @@
-from django.db import models
+import threading
+from contextlib import contextmanager
+
+from django.contrib.postgres.search import SearchVectorField
+from django.db import models, transaction
 from django.core.validators import MinValueValidator, MaxValueValidator
 
 from users.models import User
@@ -20,6 +24,35 @@ class Genre(models.Model):
         return self.name
 
 
+_deleting = threading.local()
+
+
+@contextmanager
+def deleting_titles(pks):
+    """
+    Mark titles as deleted with everything below them. The receivers of
+    their reviews then leave the bookkeeping to the receiver of the title,
+    which does it with grouped queries, see api.signals.
+    """
+    previous = getattr(_deleting, 'titles', frozenset())
+    _deleting.titles = previous | set(pks)
+    try:
+        with transaction.atomic():
+            yield
+    finally:
+        _deleting.titles = previous
+
+
+def is_deleting_title(pk):
+    return pk in getattr(_deleting, 'titles', ())
+
+
+class TitleQuerySet(models.QuerySet):
+    def delete(self):
+        with deleting_titles(self.values_list('pk', flat=True)):
+            return super().delete()
+
+
 class Title(models.Model):
     name = models.CharField(max_length=200)
     year = models.PositiveIntegerField(null=True, blank=True)
@@ -30,15 +63,72 @@ class Title(models.Model):
                                  null=True,
                                  on_delete=models.SET_NULL,
                                  related_name='titles')
+    rating_sum = models.PositiveIntegerField(default=0, editable=False)
+    rating_count = models.PositiveIntegerField(default=0, editable=False)
+    rating = models.PositiveSmallIntegerField(null=True,
+                                              blank=True,
+                                              editable=False)
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    objects = TitleQuerySet.as_manager()
 
     def __str__(self):
         return self.name
 
-    @property
-    def rating(self):
-        reviews = self.reviews.all()
-        score_avg = reviews.aggregate(models.Avg('score')).get('score__avg')
-        return None if score_avg is None else int(score_avg)
+    def delete(self, *args, **kwargs):
+        with deleting_titles([self.pk]):
+            return super().delete(*args, **kwargs)
+
+
+class TitleRanking(models.Model):
+    """
+    Precomputed ranking of a title served by /titles/top/ and
+    /titles/trending/, maintained by api.ranking.
+    """
+    title = models.OneToOneField(Title,
+                                 on_delete=models.CASCADE,
+                                 primary_key=True,
+                                 related_name='ranking')
+    bayesian_rating = models.FloatField(null=True)
+    # log2 of the review count decayed by TRENDING_HALF_LIFE_HOURS, measured
+    # from a fixed epoch, so the order does not change as time passes.
+    trending = models.FloatField(null=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['-bayesian_rating', 'title'],
+                         name='ranking_top_idx'),
+            models.Index(fields=['-trending', 'title'],
+                         name='ranking_trending_idx'),
+        ]
+
+
+class TitleStats(models.Model):
+    """
+    Review statistics of a title served by /titles/{id}/stats/,
+    maintained by api.stats.
+    """
+    title = models.OneToOneField(Title,
+                                 on_delete=models.CASCADE,
+                                 primary_key=True,
+                                 related_name='stats')
+    review_count = models.PositiveIntegerField(default=0)
+    comment_count = models.PositiveIntegerField(default=0)
+    # Reviews per score, score_1 to score_10.
+    score_1 = models.PositiveIntegerField(default=0)
+    score_2 = models.PositiveIntegerField(default=0)
+    score_3 = models.PositiveIntegerField(default=0)
+    score_4 = models.PositiveIntegerField(default=0)
+    score_5 = models.PositiveIntegerField(default=0)
+    score_6 = models.PositiveIntegerField(default=0)
+    score_7 = models.PositiveIntegerField(default=0)
+    score_8 = models.PositiveIntegerField(default=0)
+    score_9 = models.PositiveIntegerField(default=0)
+    score_10 = models.PositiveIntegerField(default=0)
+    last_review_at = models.DateTimeField(null=True)
+
+    def __str__(self):
+        return f'{self.title_id}, {self.review_count}, {self.comment_count}'
 
 
 class Review(models.Model):
@@ -55,10 +145,59 @@ class Review(models.Model):
     pub_date = models.DateTimeField('date published',
                                     auto_now_add=True,
                                     db_index=True)
+    # Row version of conditional requests, see api.conditional.
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['title', 'author'],
+                                    name='unique_review_per_author'),
+        ]
+        indexes = [
+            models.Index(fields=['title', 'pub_date', 'id'],
+                         name='review_title_feed_idx'),
+            models.Index(fields=['author', 'pub_date', 'id'],
+                         name='review_author_feed_idx'),
+        ]
 
     def __str__(self):
         return f'{self.title}, {self.score}, {self.author}'
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_score = instance.__dict__.get('score')
+        instance._loaded_title_id = instance.__dict__.get('title_id')
+        return instance
+
+    def lock_stored(self):
+        """
+        Lock the row of the review until the end of the transaction and
+        return its stored (score, title_id), or None when it is gone.
+        Rating bookkeeping starts from these values, not from the ones
+        loaded with the instance, which a concurrent write may have changed.
+        """
+        return Review.objects.select_for_update().filter(
+            pk=self.pk).values_list('score', 'title_id').first()
+
+    def save(self, *args, **kwargs):
+        with transaction.atomic():
+            if not self._state.adding and self.pk is not None:
+                self._loaded_score, self._loaded_title_id = (
+                    self.lock_stored() or (None, None))
+            super().save(*args, **kwargs)
+
+
+class CommentQuerySet(models.QuerySet):
+    def delete(self):
+        # Comments have no delete receivers, so that cascades from reviews,
+        # titles and users delete them in batches; see api.activity.
+        from .activity import remove_comments
+
+        with transaction.atomic():
+            remove_comments(self)
+            return super().delete()
+
 
 class Comment(models.Model):
     review = models.ForeignKey(Review,
@@ -71,6 +210,31 @@ class Comment(models.Model):
     pub_date = models.DateTimeField('date published',
                                     auto_now_add=True,
                                     db_index=True)
+    # Row version of conditional requests, see api.conditional.
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['review', 'pub_date', 'id'],
+                         name='comment_review_feed_idx'),
+            models.Index(fields=['author', 'pub_date', 'id'],
+                         name='comment_author_feed_idx'),
+        ]
+
+    objects = CommentQuerySet.as_manager()
 
     def __str__(self):
         return f'{self.author}, {self.pub_date:%d.%m.%Y}, {self.text[:50]}'
+
+    def delete(self, *args, **kwargs):
+        from .activity import remove_comment
+
+        with transaction.atomic():
+            remove_comment(self)
+            return super().delete(*args, **kwargs)
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_review_id = instance.__dict__.get('review_id')
+        return instance
@@ -0,0 +1,54 @@
+from rest_framework.pagination import BasePagination, CursorPagination, \
+    PageNumberPagination
+
+
+class PubDateCursorPagination(CursorPagination):
+    """
+    Keyset pagination over (pub_date, id), newest first.
+    Does not run COUNT(*) and never uses OFFSET for deep pages.
+    """
+    ordering = ('-pub_date', '-id')
+
+
+class FeedPagination(BasePagination):
+    """
+    Page number pagination by default, cursor pagination on request.
+    Cursor mode is enabled with '?pagination=cursor' and is kept
+    for the following pages through the opaque '?cursor=' parameter.
+    """
+    mode_query_param = 'pagination'
+    cursor_mode = 'cursor'
+    page_number_class = PageNumberPagination
+    cursor_class = PubDateCursorPagination
+
+    @property
+    def display_page_controls(self):
+        paginator = getattr(self, 'paginator', None)
+        return getattr(paginator, 'display_page_controls', False)
+
+    def use_cursor(self, request):
+        return (request.query_params.get(self.mode_query_param)
+                == self.cursor_mode or self.cursor_class.cursor_query_param
+                in request.query_params)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if self.use_cursor(request):
+            self.paginator = self.cursor_class()
+        else:
+            self.paginator = self.page_number_class()
+        return self.paginator.paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        return self.paginator.get_paginated_response(data)
+
+    def to_html(self):
+        return self.paginator.to_html()
+
+    def get_schema_fields(self, view):
+        return (self.page_number_class().get_schema_fields(view)
+                + self.cursor_class().get_schema_fields(view))
+
+    def get_schema_operation_parameters(self, view):
+        return (
+            self.page_number_class().get_schema_operation_parameters(view)
+            + self.cursor_class().get_schema_operation_parameters(view))
@@ -0,0 +1,183 @@
+import math
+from datetime import datetime
+from itertools import groupby
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Sum
+from django.utils import timezone
+
+from .cache import get_cache
+from .models import Review, Title, TitleRanking
+
+MEAN_SCORE_KEY = 'ranking:mean-score'
+MEAN_SCORE_TIMEOUT = 3600
+TRENDING_EPOCH = datetime(2020, 1, 1, tzinfo=timezone.utc)
+BATCH_SIZE = 1000
+
+
+def compute_mean_score():
+    totals = Title.objects.aggregate(score_sum=Sum('rating_sum'),
+                                     score_count=Sum('rating_count'))
+    if not totals['score_count']:
+        return 0.0
+    return totals['score_sum'] / totals['score_count']
+
+
+def get_mean_score():
+    mean = get_cache().get(MEAN_SCORE_KEY)
+    if mean is None:
+        mean = compute_mean_score()
+        get_cache().set(MEAN_SCORE_KEY, mean, MEAN_SCORE_TIMEOUT)
+    return mean
+
+
+def bayesian_rating(score_sum, score_count, mean):
+    """
+    Average score pulled towards the mean of all titles until the title
+    has many more than TOP_TITLES_MIN_REVIEWS reviews.
+    """
+    if not score_count:
+        return None
+    weight = settings.TOP_TITLES_MIN_REVIEWS
+    return (score_sum + weight * mean) / (score_count + weight)
+
+
+def decay_exponent(moment):
+    half_life = settings.TRENDING_HALF_LIFE_HOURS * 3600
+    return (moment - TRENDING_EPOCH).total_seconds() / half_life
+
+
+def add_log2(total, exponent):
+    """
+    log2(2 ** total + 2 ** exponent) without overflowing.
+    """
+    if total is None:
+        return exponent
+    high, low = max(total, exponent), min(total, exponent)
+    return high + math.log2(1 + 2 ** (low - high))
+
+
+def subtract_log2(total, exponent):
+    """
+    log2(2 ** total - 2 ** exponent), None when nothing is left.
+    """
+    if total is None:
+        return None
+    rest = 1 - 2 ** (exponent - total)
+    if rest <= 1e-9:
+        return None
+    return total + math.log2(rest)
+
+
+def trending_log(pub_dates):
+    total = None
+    for pub_date in pub_dates:
+        total = add_log2(total, decay_exponent(pub_date))
+    return total
+
+
+def trending_score(trending, now=None):
+    """
+    Number of reviews weighted by their age at the moment now.
+    """
+    if trending is None:
+        return 0.0
+    return 2 ** (trending - decay_exponent(now or timezone.now()))
+
+
+def get_bayesian_rating(title_id):
+    totals = Title.objects.filter(pk=title_id).values_list(
+        'rating_sum', 'rating_count').first()
+    if totals is None:
+        return None
+    return bayesian_rating(*totals, get_mean_score())
+
+
+def record_review(review):
+    """
+    Add a new review to the ranking of its title.
+    """
+    with transaction.atomic():
+        ranking, created = TitleRanking.objects.select_for_update(
+        ).get_or_create(title_id=review.title_id)
+        if created:
+            refresh_title(review.title_id)
+            return
+        ranking.bayesian_rating = get_bayesian_rating(review.title_id)
+        ranking.trending = add_log2(ranking.trending,
+                                    decay_exponent(review.pub_date))
+        ranking.save(update_fields=['bayesian_rating', 'trending'])
+
+
+def remove_review(review, title_id=None):
+    """
+    Take a deleted review, or one moved away from title_id, out of the
+    ranking of the title by subtracting its decayed term.
+    """
+    title_id = title_id or review.title_id
+    with transaction.atomic():
+        ranking = TitleRanking.objects.select_for_update().filter(
+            title_id=title_id).first()
+        if ranking is None:
+            return
+        ranking.bayesian_rating = get_bayesian_rating(title_id)
+        ranking.trending = subtract_log2(ranking.trending,
+                                         decay_exponent(review.pub_date))
+        ranking.save(update_fields=['bayesian_rating', 'trending'])
+
+
+def change_score(title_id):
+    """
+    Update the Bayesian rating after a score edit, which leaves the
+    trending score as it is.
+    """
+    TitleRanking.objects.filter(title_id=title_id).update(
+        bayesian_rating=get_bayesian_rating(title_id))
+
+
+def refresh_title(title_id):
+    """
+    Recompute the ranking of one title from all of its reviews.
+    """
+    totals = Title.objects.filter(pk=title_id).values_list(
+        'rating_sum', 'rating_count').first()
+    if totals is None:
+        return
+    pub_dates = Review.objects.filter(title_id=title_id).values_list(
+        'pub_date', flat=True)
+    TitleRanking.objects.filter(title_id=title_id).update(
+        bayesian_rating=bayesian_rating(*totals, get_mean_score()),
+        trending=trending_log(pub_dates.order_by()),
+    )
+
+
+def rebuild():
+    """
+    Recompute the rankings of all titles, refreshing the mean score.
+    """
+    mean = compute_mean_score()
+    get_cache().set(MEAN_SCORE_KEY, mean, MEAN_SCORE_TIMEOUT)
+    reviews = Review.objects.order_by('title_id').values_list(
+        'title_id', 'pub_date')
+    trending = {
+        title_id: trending_log(pub_date for _, pub_date in rows)
+        for title_id, rows in groupby(reviews.iterator(),
+                                      key=lambda row: row[0])
+    }
+    rankings = [
+        TitleRanking(title_id=title_id,
+                     bayesian_rating=bayesian_rating(score_sum, score_count,
+                                                     mean),
+                     trending=trending.get(title_id))
+        for title_id, score_sum, score_count in Title.objects.values_list(
+            'pk', 'rating_sum', 'rating_count').iterator()
+    ]
+    existing = set(TitleRanking.objects.values_list('title_id', flat=True))
+    TitleRanking.objects.bulk_update(
+        [ranking for ranking in rankings if ranking.title_id in existing],
+        ['bayesian_rating', 'trending'], batch_size=BATCH_SIZE)
+    TitleRanking.objects.bulk_create(
+        [ranking for ranking in rankings if ranking.title_id not in existing],
+        ignore_conflicts=True)
+    return len(rankings)
@@ -0,0 +1,45 @@
+from django.contrib.postgres.search import SearchQuery, SearchRank, \
+    TrigramSimilarity
+from django.db import connections
+from django.db.models import Case, F, FloatField, Q, Value, When
+
+# Text search configuration used by the title search trigger and queries.
+SEARCH_CONFIG = 'russian'
+
+
+def search_titles(queryset, query):
+    """
+    Filter titles by a free text query and order them by relevance.
+    PostgreSQL matches the stored search_vector and pg_trgm similarity of the
+    name, both served by GIN indexes. Other databases fall back to
+    substring matching with a coarse rank (SQLite folds case for ASCII only).
+    The backend is picked by the database the queryset reads from.
+    """
+    query = query.strip()
+    if not query:
+        return queryset
+    if connections[queryset.db].vendor == 'postgresql':
+        return _search_postgresql(queryset, query)
+    return _search_fallback(queryset, query)
+
+
+def _search_postgresql(queryset, query):
+    search_query = SearchQuery(query, config=SEARCH_CONFIG)
+    return queryset.filter(
+        Q(search_vector=search_query) | Q(name__trigram_similar=query)
+    ).annotate(
+        search_rank=SearchRank(F('search_vector'), search_query)
+        + TrigramSimilarity('name', query)
+    ).order_by('-search_rank', 'pk')
+
+
+def _search_fallback(queryset, query):
+    return queryset.filter(
+        Q(name__icontains=query) | Q(description__icontains=query)
+    ).annotate(search_rank=Case(
+        When(name__iexact=query, then=Value(1.0)),
+        When(name__istartswith=query, then=Value(0.75)),
+        When(name__icontains=query, then=Value(0.5)),
+        default=Value(0.25),
+        output_field=FloatField(),
+    )).order_by('-search_rank', 'pk')
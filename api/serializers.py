@@ -1,6 +1,7 @@
 from rest_framework import serializers
 
-from .models import Comment, Review, Title, Category, Genre
+from .models import Comment, Review, Title, TitleStats, Category, Genre
+from .stats import histogram
 
 
 class GenreSerializer(serializers.ModelSerializer):
@@ -27,6 +28,18 @@ class GenreField(serializers.SlugRelatedField):
         return serializer.data
 
 
+class TitleStatsSerializer(serializers.ModelSerializer):
+    histogram = serializers.SerializerMethodField()
+
+    class Meta:
+        model = TitleStats
+        fields = ('review_count', 'comment_count', 'histogram',
+                  'last_review_at')
+
+    def get_histogram(self, stats):
+        return histogram(stats)
+
+
 class TitleSerializer(serializers.ModelSerializer):
     category = CategoryField(slug_field='slug',
                              queryset=Category.objects.all(),
@@ -40,6 +53,17 @@ class TitleSerializer(serializers.ModelSerializer):
         fields = ('id', 'name', 'year', 'rating', 'description', 'genre',
                   'category')
 
+    def to_representation(self, instance):
+        """
+        Embed the statistics of the title when the view asks for them.
+        """
+        data = super().to_representation(instance)
+        if self.context.get('include_stats'):
+            stats = getattr(instance, 'stats', None)
+            data['stats'] = (TitleStatsSerializer(stats).data
+                             if stats is not None else None)
+        return data
+
 
 class CommentSerializer(serializers.ModelSerializer):
     author = serializers.SlugRelatedField(
@@ -51,7 +75,7 @@ class CommentSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Comment
-        fields = '__all__'
+        exclude = ('updated_at', )
 
 
 class ReviewSerializer(serializers.ModelSerializer):
@@ -68,4 +92,4 @@ class ReviewSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Review
-        fields = '__all__'
+        exclude = ('updated_at', )
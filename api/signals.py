@@ -0,0 +1,154 @@
+from django.db.models import F
+from django.db.models.functions import NullIf
+from django.db.models.signals import m2m_changed, post_delete, post_save, \
+    pre_delete
+from django.dispatch import receiver
+
+from users.models import User
+
+from . import ranking, stats
+from .activity import remove_comments, remove_title_activity, \
+    update_activity_count
+from .cache import invalidate
+from .models import Category, Comment, Genre, Review, Title, TitleRanking, \
+    TitleStats, is_deleting_title
+
+
+def update_title_rating(title_id, score_delta, count_delta):
+    """
+    Apply a review score change to the stored rating of a title.
+    The average is recomputed in the same UPDATE from the new sum and count,
+    so concurrent writers never see a stale aggregate.
+    """
+    if not score_delta and not count_delta:
+        return
+    new_sum = F('rating_sum') + score_delta
+    new_count = F('rating_count') + count_delta
+    Title.objects.filter(pk=title_id).update(
+        rating_sum=new_sum,
+        rating_count=new_count,
+        rating=new_sum / NullIf(new_count, 0),
+    )
+
+
+@receiver(post_save, sender=Review)
+def review_saved(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    if created:
+        update_title_rating(instance.title_id, instance.score, 1)
+        update_activity_count(instance.author_id, 'review_count', 1)
+        ranking.record_review(instance)
+        stats.record_review(instance)
+    else:
+        loaded_score = getattr(instance, '_loaded_score', None)
+        loaded_title_id = getattr(instance, '_loaded_title_id', None)
+        if loaded_score is None or loaded_title_id is None:
+            return
+        if loaded_title_id != instance.title_id:
+            update_title_rating(loaded_title_id, -loaded_score, -1)
+            update_title_rating(instance.title_id, instance.score, 1)
+            ranking.remove_review(instance, loaded_title_id)
+            ranking.record_review(instance)
+            stats.refresh_title(loaded_title_id)
+            stats.refresh_title(instance.title_id)
+        elif instance.score != loaded_score:
+            update_title_rating(instance.title_id,
+                                instance.score - loaded_score, 0)
+            ranking.change_score(instance.title_id)
+            stats.change_score(instance, loaded_score)
+    instance._loaded_score = instance.score
+    instance._loaded_title_id = instance.title_id
+
+
+@receiver(pre_delete, sender=Review)
+def review_deleting(sender, instance, **kwargs):
+    if is_deleting_title(instance.title_id):
+        return
+    # post_delete is sent even when a concurrent delete removed the row
+    # first, so only count reviews that are still there once locked, with
+    # the score and title they are stored with.
+    stored = instance.lock_stored()
+    instance._deleted_before = stored is None
+    if stored is None:
+        return
+    instance.score, instance.title_id = stored
+    # Comments are deleted in batches without signals, count them here.
+    remove_comments(Comment.objects.filter(review=instance))
+
+
+@receiver(post_delete, sender=Review)
+def review_deleted(sender, instance, **kwargs):
+    if (is_deleting_title(instance.title_id)
+            or getattr(instance, '_deleted_before', False)):
+        return
+    update_title_rating(instance.title_id, -instance.score, -1)
+    update_activity_count(instance.author_id, 'review_count', -1)
+    ranking.remove_review(instance)
+    stats.remove_review(instance)
+
+
+@receiver(post_save, sender=Comment)
+def comment_saved(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    if created:
+        update_activity_count(instance.author_id, 'comment_count', 1)
+        stats.record_comment(instance.review_id, 1)
+    else:
+        loaded_review_id = getattr(instance, '_loaded_review_id', None)
+        if loaded_review_id not in (None, instance.review_id):
+            stats.record_comment(loaded_review_id, -1)
+            stats.record_comment(instance.review_id, 1)
+    instance._loaded_review_id = instance.review_id
+
+
+@receiver(pre_delete, sender=Title)
+def title_deleting(sender, instance, **kwargs):
+    if is_deleting_title(instance.pk):
+        remove_title_activity(instance)
+
+
+@receiver(pre_delete, sender=User)
+def user_deleting(sender, instance, **kwargs):
+    # Comments on the user's own reviews are counted by review_deleting.
+    remove_comments(Comment.objects.filter(author=instance).exclude(
+        review__author=instance))
+
+
+@receiver(post_save, sender=Title)
+def title_created(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        # Titles from fixtures, their reviews are counted by
+        # refresh_rankings and rebuild_title_stats.
+        TitleRanking.objects.get_or_create(title=instance)
+        TitleStats.objects.get_or_create(title=instance)
+    elif created:
+        TitleRanking.objects.create(title=instance)
+        TitleStats.objects.create(title=instance)
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def category_changed(sender, **kwargs):
+    invalidate('category')
+
+
+@receiver(post_save, sender=Genre)
+@receiver(post_delete, sender=Genre)
+def genre_changed(sender, **kwargs):
+    invalidate('genre')
+
+
+@receiver(post_save, sender=Title)
+@receiver(post_delete, sender=Title)
+@receiver(m2m_changed, sender=Title.genre.through)
+@receiver(post_save, sender=Review)
+@receiver(post_delete, sender=Review)
+def title_changed(sender, **kwargs):
+    invalidate('title')
+
+
+@receiver(post_save, sender=Comment)
+def comment_changed(sender, **kwargs):
+    invalidate('comment')
@@ -0,0 +1,145 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from django.db import connection, connections, transaction
+from django.db.models import Count, DateTimeField, F, Max, OuterRef, Q, \
+    Subquery, Value
+from django.db.models.functions import Coalesce, Greatest
+
+from .models import Comment, Review, Title, TitleStats
+
+SCORES = range(1, 11)
+CHUNK_SIZE = 1000
+
+
+def score_field(score):
+    if score in SCORES:
+        return f'score_{score}'
+    return None
+
+
+def between(field, first, last):
+    return {f'{field}__gte': first, f'{field}__lte': last}
+
+
+def histogram(stats):
+    return {str(score): getattr(stats, score_field(score))
+            for score in SCORES}
+
+
+def record_review(review):
+    """
+    Add a new review to the statistics of its title.
+    """
+    pub_date = Value(review.pub_date, output_field=DateTimeField())
+    changes = {'review_count': F('review_count') + 1,
+               'last_review_at': Greatest(Coalesce('last_review_at',
+                                                   pub_date), pub_date)}
+    field = score_field(review.score)
+    if field is not None:
+        changes[field] = F(field) + 1
+    if not TitleStats.objects.filter(title_id=review.title_id).update(
+            **changes):
+        refresh_title(review.title_id)
+
+
+def change_score(review, old_score):
+    """
+    Move a review between histogram bins after its score was changed.
+    """
+    changes = {}
+    for score, delta in ((old_score, -1), (review.score, 1)):
+        field = score_field(score)
+        if field is not None:
+            changes[field] = F(field) + delta
+    if changes:
+        TitleStats.objects.filter(title_id=review.title_id).update(**changes)
+
+
+def remove_review(review):
+    """
+    Remove a deleted review from the statistics of its title. The latest
+    review time is taken again from the remaining reviews.
+    """
+    changes = {'review_count': F('review_count') - 1,
+               'last_review_at': Subquery(Review.objects.filter(
+                   title_id=OuterRef('title_id')).order_by(
+                   '-pub_date').values('pub_date')[:1])}
+    field = score_field(review.score)
+    if field is not None:
+        changes[field] = F(field) - 1
+    TitleStats.objects.filter(title_id=review.title_id).update(**changes)
+
+
+def record_comment(review_id, delta):
+    """
+    Apply a comment write to the statistics of the title of the review.
+    """
+    TitleStats.objects.filter(title_id=Subquery(Review.objects.filter(
+        pk=review_id).values('title_id'))).update(
+        comment_count=F('comment_count') + delta)
+
+
+def rebuild_chunk(first, last):
+    """
+    Recompute the statistics of the titles with primary keys from first to
+    last. The rows are locked before reading the reviews, so a concurrent
+    write either is counted here or updates the row after it is rebuilt.
+    """
+    with transaction.atomic():
+        existing = set(TitleStats.objects.select_for_update().filter(
+            **between('pk', first, last)).values_list('pk', flat=True))
+        reviews = Review.objects.filter(
+            **between('title', first, last)).order_by().values(
+            'title_id').annotate(
+            review_count=Count('pk'), last_review_at=Max('pub_date'),
+            **{score_field(score): Count('pk', filter=Q(score=score))
+               for score in SCORES})
+        totals = {row.pop('title_id'): row for row in reviews}
+        comments = dict(Comment.objects.filter(
+            **between('review__title', first, last)).order_by().values_list(
+            'review__title_id').annotate(Count('pk')))
+        stats = [
+            TitleStats(title_id=pk, comment_count=comments.get(pk, 0),
+                       **totals.get(pk, {}))
+            for pk in Title.objects.filter(
+                pk__range=(first, last)).values_list('pk', flat=True)
+        ]
+        TitleStats.objects.bulk_update(
+            [row for row in stats if row.title_id in existing],
+            ['review_count', 'comment_count', 'last_review_at',
+             *(score_field(score) for score in SCORES)])
+        TitleStats.objects.bulk_create(
+            [row for row in stats if row.title_id not in existing],
+            ignore_conflicts=True)
+    return len(stats)
+
+
+def refresh_title(title_id):
+    return rebuild_chunk(title_id, title_id)
+
+
+def rebuild_chunk_in_thread(first, last):
+    try:
+        return rebuild_chunk(first, last)
+    finally:
+        connections.close_all()
+
+
+def rebuild(workers=1, chunk_size=CHUNK_SIZE):
+    """
+    Recompute the statistics of all titles in chunks of chunk_size titles,
+    with as many chunks in flight as workers, each on its own connection.
+    The chunks run one by one in the current thread inside a transaction,
+    whose changes other connections would not see, and on databases that
+    cannot lock rows, like SQLite with its single writer.
+    """
+    pks = list(Title.objects.order_by('pk').values_list('pk', flat=True))
+    chunks = [(pks[start], pks[min(start + chunk_size, len(pks)) - 1])
+              for start in range(0, len(pks), chunk_size)]
+    if (workers <= 1 or connection.in_atomic_block
+            or not connection.features.has_select_for_update):
+        return sum(rebuild_chunk(*chunk) for chunk in chunks)
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(rebuild_chunk_in_thread, *chunk)
+                   for chunk in chunks]
+        return sum(future.result() for future in futures)
@@ -1,9 +1,9 @@
 from rest_framework.routers import DefaultRouter
-from django.urls import path, include
+from django.urls import path, include, re_path
 
 from .views import ReviewRetrieveUpdateDestroyAPIView, CategoryViewSet, \
     GenreViewSet, TitleViewSet, CommentRetrieveUpdateDestroyAPIView, \
-    ReviewListCreateSet, CommentListCreateSet
+    ReviewListCreateSet, CommentListCreateSet, ExportView
 
 router_v1 = DefaultRouter()
 router_v1.register(r'categories', CategoryViewSet, basename='category')
@@ -11,7 +11,7 @@ router_v1.register(r'genres', GenreViewSet, basename='genre')
 router_v1.register(r'titles', TitleViewSet, basename='title')
 router_v1.register(r'titles/(?P<title_id>\d+)/reviews',
                    ReviewListCreateSet,
-                   basename='comments')
+                   basename='reviews')
 router_v1.register(
     r'titles/(?P<title_id>\d+)/reviews/(?P<review_id>\d+)/comments',
     CommentListCreateSet,
@@ -29,5 +29,8 @@ urlpatterns += [
         'v1/titles/<int:title_id>/reviews/<int:review_id>/'
         'comments/<int:comment_id>/',
         CommentRetrieveUpdateDestroyAPIView.as_view(),
-        name='review'),
+        name='comment'),
+    re_path(r'^v1/export/(?P<resource>reviews|comments)/$',
+            ExportView.as_view(),
+            name='export'),
 ]
@@ -1,26 +1,86 @@
-from django.db.models import Avg
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import Prefetch
+from django.http import StreamingHttpResponse
 from django.shortcuts import get_object_or_404
 
 from django_filters.rest_framework import DjangoFilterBackend
 
-from rest_framework import filters, status, viewsets, mixins
+from rest_framework import filters, generics, status, viewsets, mixins
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
 from rest_framework.permissions import IsAuthenticatedOrReadOnly, \
     IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.generics import RetrieveUpdateDestroyAPIView
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import BrowsableAPIRenderer
+from rest_framework.views import APIView
 
-from .models import Category, Genre, Title, Review
+from api_yamdb.throttling import AnonReadThrottle, WriteThrottle
+from users.permissions import IsAdminPermissions
+
+from .bulk import SlugBulkWriter, TitleBulkWriter
+from .cache import CachedResponseMixin
+from .conditional import VERSION_FIELD, ConditionalObjectMixin, list_etag, \
+    not_modified, not_modified_response
+from .export import CONTENT_TYPES, FORMATS, ExportError, get_rows, stream
+
+from .models import Category, Comment, Genre, Title, TitleStats, Review
 
 from .permissions import IsAdmin, IsAnon, IsModerator, IsAdminOrReadOnly, \
     RetrieveUpdateDestroyPermission, MyCustomPermissionClass
 
 from .filters import TitlesFilter
 
+from .lean import COMMENT_LIST, REVIEW_LIST
+
+from .pagination import FeedPagination
+
+from .parsers import NDJSONParser
+
+from .renderers import FastJSONRenderer
+
 from .serializers import CategorySerializer, GenreSerializer, \
-    ReviewSerializer, CommentSerializer, TitleSerializer
+    ReviewSerializer, CommentSerializer, TitleSerializer, \
+    TitleStatsSerializer
+
+
+class BulkWriteMixin:
+    """
+    POST (create) or PATCH (update) a JSON array or NDJSON stream of objects
+    to <resource>/bulk/. Every item gets its own result, so valid items are
+    written even when others fail.
+    """
+    def get_bulk_writer(self):
+        raise NotImplementedError
+
+    @action(methods=['post', 'patch'], detail=False,
+            parser_classes=[JSONParser, NDJSONParser])
+    def bulk(self, request):
+        items = request.data
+        if not isinstance(items, list):
+            raise ValidationError('Ожидается список объектов.')
+        if len(items) > settings.BULK_MAX_ITEMS:
+            raise ValidationError(
+                f'Не больше {settings.BULK_MAX_ITEMS} объектов за запрос.')
+        results = self.get_bulk_writer().write(
+            items, partial=request.method == 'PATCH')
+        failed = sum(result['status'] == 'error' for result in results)
+        if not results or failed == len(results):
+            response_status = status.HTTP_400_BAD_REQUEST
+        elif failed:
+            response_status = status.HTTP_207_MULTI_STATUS
+        elif request.method == 'POST':
+            response_status = status.HTTP_201_CREATED
+        else:
+            response_status = status.HTTP_200_OK
+        return Response({'results': results}, status=response_status)
 
 
-class CategoryViewSet(viewsets.ModelViewSet):
+class CategoryViewSet(BulkWriteMixin, CachedResponseMixin,
+                      viewsets.ModelViewSet):
+    cache_resource = 'category'
     permission_classes = (
         MyCustomPermissionClass,
         IsAuthenticatedOrReadOnly,
@@ -34,6 +94,9 @@ class CategoryViewSet(viewsets.ModelViewSet):
         categories = Category.objects.all()
         return categories
 
+    def get_bulk_writer(self):
+        return SlugBulkWriter(Category, 'category')
+
     def retrieve(self, request, *args, **kwargs):
         return Response(status=status.HTTP_405_METHOD_NOT_ALLOWED)
 
@@ -41,7 +104,9 @@ class CategoryViewSet(viewsets.ModelViewSet):
         return Response(status=status.HTTP_405_METHOD_NOT_ALLOWED)
 
 
-class GenreViewSet(viewsets.ModelViewSet):
+class GenreViewSet(BulkWriteMixin, CachedResponseMixin,
+                   viewsets.ModelViewSet):
+    cache_resource = 'genre'
     permission_classes = (
         MyCustomPermissionClass,
         IsAuthenticatedOrReadOnly,
@@ -55,6 +120,9 @@ class GenreViewSet(viewsets.ModelViewSet):
         genres = Genre.objects.all()
         return genres
 
+    def get_bulk_writer(self):
+        return SlugBulkWriter(Genre, 'genre')
+
     def retrieve(self, request, *args, **kwargs):
         return Response(status=status.HTTP_405_METHOD_NOT_ALLOWED)
 
@@ -62,95 +130,240 @@ class GenreViewSet(viewsets.ModelViewSet):
         return Response(status=status.HTTP_405_METHOD_NOT_ALLOWED)
 
 
-class TitleViewSet(viewsets.ModelViewSet):
-    queryset = Title.objects.all().annotate(ratings=Avg('reviews__score'))
+class TitleViewSet(BulkWriteMixin, CachedResponseMixin,
+                   viewsets.ModelViewSet):
     serializer_class = TitleSerializer
     permission_classes = [IsAdminOrReadOnly]
     filter_backends = [DjangoFilterBackend]
     filterset_class = TitlesFilter
 
+    @property
+    def cache_resource(self):
+        # Embedded statistics change with comments too.
+        return 'title-stats' if self.include_stats() else 'title'
+
+    def include_stats(self):
+        return self.request.query_params.get('stats') in ('1', 'true')
 
-class ReviewListCreateSet(mixins.ListModelMixin, mixins.CreateModelMixin,
+    def get_queryset(self):
+        titles = Title.objects.select_related('category').prefetch_related(
+            Prefetch('genre', queryset=Genre.objects.order_by('pk')))
+        if self.include_stats():
+            titles = titles.select_related('stats')
+        return titles.order_by('pk')
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context['include_stats'] = self.include_stats()
+        return context
+
+    def get_bulk_writer(self):
+        return TitleBulkWriter()
+
+    @action(detail=True)
+    def stats(self, request, pk=None):
+        """
+        Review statistics of the title. Every title gets its row when it is
+        created, so a missing row is served as empty statistics.
+        """
+        title = generics.get_object_or_404(
+            Title.objects.select_related('stats'), pk=pk)
+        try:
+            title_stats = title.stats
+        except TitleStats.DoesNotExist:
+            title_stats = TitleStats(title=title)
+        return Response(TitleStatsSerializer(title_stats).data)
+
+    @action(detail=False)
+    def top(self, request):
+        return self.cached_response(request, self.ranked_list,
+                                    'bayesian_rating')
+
+    @action(detail=False)
+    def trending(self, request):
+        return self.cached_response(request, self.ranked_list, 'trending')
+
+    def ranked_list(self, request, field):
+        """
+        Filtered titles ordered by a precomputed TitleRanking field.
+        """
+        queryset = self.filter_queryset(self.get_queryset()).filter(
+            **{f'ranking__{field}__isnull': False}).order_by(
+                f'-ranking__{field}', 'pk')
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            serializer = self.get_serializer(page, many=True)
+            return self.get_paginated_response(serializer.data)
+        serializer = self.get_serializer(queryset, many=True)
+        return Response(serializer.data)
+
+    def get_paginated_response(self, data):
+        response = super().get_paginated_response(data)
+        if self.request.query_params.get('facets') in ('1', 'true'):
+            filterset = self.filterset_class(
+                self.request.query_params, queryset=self.get_queryset(),
+                request=self.request)
+            response.data['facets'] = filterset.facet_counts()
+        return response
+
+
+class NestedResourceMixin:
+    """
+    Resolve the title -> review -> comment chain of nested URLs with one
+    joined query and keep the result on the request, so get_queryset,
+    perform_create, permission checks and serializers share it.
+    """
+    def get_nested(self):
+        if not hasattr(self.request, 'nested_resources'):
+            self.request.nested_resources = {}
+        return self.request.nested_resources
+
+    def get_title(self):
+        nested = self.get_nested()
+        if 'title' not in nested:
+            nested['title'] = get_object_or_404(Title,
+                                                pk=self.kwargs['title_id'])
+        return nested['title']
+
+    def get_review(self):
+        nested = self.get_nested()
+        if 'review' not in nested:
+            review = get_object_or_404(
+                Review.objects.select_related('title', 'author'),
+                pk=self.kwargs['review_id'],
+                title_id=self.kwargs['title_id'])
+            nested['review'] = review
+            nested['title'] = review.title
+        return nested['review']
+
+    def get_comment(self):
+        nested = self.get_nested()
+        if 'comment' not in nested:
+            comment = get_object_or_404(
+                Comment.objects.select_related('review__title', 'author'),
+                pk=self.kwargs['comment_id'],
+                review_id=self.kwargs['review_id'],
+                review__title_id=self.kwargs['title_id'])
+            nested['comment'] = comment
+            nested['review'] = comment.review
+            nested['title'] = comment.review.title
+        return nested['comment']
+
+
+class LeanListMixin:
+    """
+    List from values() rows with a LeanListSerializer instead of model
+    instances and serializer_class, when LEAN_LIST_SERIALIZERS is on.
+    Pages carry an ETag and If-None-Match is answered with 304 before
+    serializing.
+    """
+    lean_serializer = None
+    renderer_classes = [FastJSONRenderer, BrowsableAPIRenderer]
+
+    def serialize_rows(self, rows):
+        if settings.LEAN_LIST_SERIALIZERS:
+            return self.lean_serializer.to_representation(rows)
+        return self.get_serializer(rows, many=True).data
+
+    def list(self, request, *args, **kwargs):
+        rows = self.filter_queryset(self.get_queryset())
+        if settings.LEAN_LIST_SERIALIZERS:
+            rows = self.lean_serializer.get_rows(rows, VERSION_FIELD)
+        page = self.paginate_queryset(rows)
+        if page is None:
+            return Response(self.serialize_rows(rows))
+        # The pagination metadata is known before the page is serialized.
+        etag = list_etag(page, self.get_paginated_response([]).data)
+        if not_modified(request, etag):
+            return not_modified_response(etag)
+        response = self.get_paginated_response(self.serialize_rows(page))
+        response['ETag'] = etag
+        return response
+
+
+class ReviewListCreateSet(NestedResourceMixin, LeanListMixin,
+                          mixins.ListModelMixin, mixins.CreateModelMixin,
                           viewsets.GenericViewSet):
+    throttle_classes = [AnonReadThrottle, WriteThrottle]
     permission_classes = [IsAnon | IsAdmin | IsModerator | IsAuthenticated]
     serializer_class = ReviewSerializer
+    lean_serializer = REVIEW_LIST
+    pagination_class = FeedPagination
 
     def perform_create(self, serializer):
         author = self.request.user
         text = self.request.data.get('text')
-
-        title_id = self.kwargs.get('title_id')
-        title = get_object_or_404(Title, id=title_id)
-
-        reviews = Review.objects.filter(author=author, title=title)
-        if reviews.count() > 0:
-            return True
-
-        serializer.save(title=title, author=author, text=text)
+        try:
+            serializer.save(title=self.get_title(), author=author, text=text)
+        except IntegrityError:
+            raise ValidationError(
+                {'detail': 'Вы уже оставили отзыв на это произведение.'})
 
     def get_queryset(self):
-        title_id = self.kwargs.get('title_id')
-        title = get_object_or_404(Title, id=title_id)
-        queryset = title.reviews.all()
-        return queryset
-
-    def create(self, request, *args, **kwargs):
-        serializer = self.get_serializer(data=request.data)
-        serializer.is_valid(raise_exception=True)
-        not_create_success = self.perform_create(serializer)
-        headers = self.get_success_headers(serializer.data)
-
-        if not_create_success:
-            return Response(serializer.data,
-                            status=status.HTTP_400_BAD_REQUEST,
-                            headers=headers)
-        else:
-            return Response(serializer.data,
-                            status=status.HTTP_201_CREATED,
-                            headers=headers)
-
-
-class ReviewRetrieveUpdateDestroyAPIView(RetrieveUpdateDestroyAPIView):
+        return self.get_title().reviews.select_related('author')
+
+    @action(methods=['put'], detail=False, url_path='mine')
+    def upsert(self, request, *args, **kwargs):
+        """
+        Create or replace the review of the current user on the title.
+        A concurrent insert that wins the unique constraint turns the
+        retry into an update.
+        """
+        title = self.get_title()
+        for _ in range(2):
+            try:
+                with transaction.atomic():
+                    review = Review.objects.select_for_update().filter(
+                        title=title, author=request.user).first()
+                    serializer = self.get_serializer(review,
+                                                     data=request.data)
+                    serializer.is_valid(raise_exception=True)
+                    serializer.save(title=title, author=request.user)
+            except IntegrityError:
+                continue
+            if review is None:
+                return Response(serializer.data,
+                                status=status.HTTP_201_CREATED)
+            return Response(serializer.data, status=status.HTTP_200_OK)
+        raise ValidationError(
+            {'detail': 'Не удалось сохранить отзыв, повторите запрос.'})
+
+
+class ReviewRetrieveUpdateDestroyAPIView(NestedResourceMixin,
+                                         ConditionalObjectMixin,
+                                         RetrieveUpdateDestroyAPIView):
+    throttle_classes = [AnonReadThrottle, WriteThrottle]
     serializer_class = ReviewSerializer
     permission_classes = [
         RetrieveUpdateDestroyPermission,
     ]
 
     def get_object(self):
-        obj = get_object_or_404(self.get_queryset(),
-                                pk=self.kwargs['review_id'])
+        obj = self.get_review()
         self.check_object_permissions(self.request, obj)
         return obj
 
     def get_queryset(self):
-        title_id = self.kwargs.get('title_id')
-        title = get_object_or_404(Title, id=title_id)
-        queryset = title.reviews.all()
-        return queryset
+        return Review.objects.select_related('title', 'author').filter(
+            title_id=self.kwargs['title_id'])
 
 
-class CommentListCreateSet(mixins.ListModelMixin, mixins.CreateModelMixin,
+class CommentListCreateSet(NestedResourceMixin, LeanListMixin,
+                           mixins.ListModelMixin, mixins.CreateModelMixin,
                            viewsets.GenericViewSet):
+    throttle_classes = [AnonReadThrottle, WriteThrottle]
     permission_classes = [IsAnon | IsAdmin | IsModerator | IsAuthenticated]
     serializer_class = CommentSerializer
+    lean_serializer = COMMENT_LIST
+    pagination_class = FeedPagination
 
     def perform_create(self, serializer):
         author = self.request.user
         text = self.request.data.get('text')
-
-        title_id = self.kwargs.get('title_id')
-        review_id = self.kwargs.get('review_id')
-        title = get_object_or_404(Title, id=title_id)
-        review = get_object_or_404(title.reviews, id=review_id)
-        serializer.save(review=review, author=author, text=text)
+        serializer.save(review=self.get_review(), author=author, text=text)
 
     def get_queryset(self):
-        title_id = self.kwargs.get('title_id')
-        review_id = self.kwargs.get('review_id')
-        title = get_object_or_404(Title, id=title_id)
-        review = get_object_or_404(title.reviews.all(), id=review_id)
-        queryset = review.comments.all()
-        return queryset
+        return self.get_review().comments.select_related('author')
 
     def create(self, request, *args, **kwargs):
         serializer = self.get_serializer(data=request.data)
@@ -168,22 +381,53 @@ class CommentListCreateSet(mixins.ListModelMixin, mixins.CreateModelMixin,
                             headers=headers)
 
 
-class CommentRetrieveUpdateDestroyAPIView(RetrieveUpdateDestroyAPIView):
+class CommentRetrieveUpdateDestroyAPIView(NestedResourceMixin,
+                                          ConditionalObjectMixin,
+                                          RetrieveUpdateDestroyAPIView):
+    throttle_classes = [AnonReadThrottle, WriteThrottle]
     serializer_class = CommentSerializer
     permission_classes = [
         RetrieveUpdateDestroyPermission,
     ]
 
     def get_object(self):
-        obj = get_object_or_404(self.get_queryset(),
-                                pk=self.kwargs['comment_id'])
+        obj = self.get_comment()
         self.check_object_permissions(self.request, obj)
         return obj
 
     def get_queryset(self):
-        title_id = self.kwargs.get('title_id')
-        review_id = self.kwargs.get('review_id')
-        title = get_object_or_404(Title, id=title_id)
-        review = get_object_or_404(title.reviews.all(), id=review_id)
-        queryset = review.comments.all()
-        return queryset
+        return Comment.objects.select_related('review__title',
+                                              'author').filter(
+            review_id=self.kwargs['review_id'],
+            review__title_id=self.kwargs['title_id'])
+
+
+class ExportView(APIView):
+    """
+    [GET] Stream all reviews or comments as NDJSON or CSV (?output=csv) in
+    the format of data/review.csv and data/comments.csv. Filters: title,
+    author (username), since and until (pub_date).
+    """
+    permission_classes = [IsAdminPermissions]
+
+    def get(self, request, resource):
+        params = request.query_params
+        output = params.get('output', 'ndjson')
+        if output not in FORMATS:
+            raise ValidationError(
+                {'output': [f'Допустимые форматы: {", ".join(FORMATS)}.']})
+        try:
+            rows = get_rows(resource,
+                            title=params.get('title'),
+                            author=params.get('author'),
+                            since=params.get('since'),
+                            until=params.get('until'))
+        except ExportError as exc:
+            raise ValidationError(str(exc))
+        # The rows are read after the view returns, pick the database now.
+        rows = rows.using(rows.db)
+        response = StreamingHttpResponse(stream(resource, rows, output),
+                                         content_type=CONTENT_TYPES[output])
+        response['Content-Disposition'] = (
+            f'attachment; filename="{resource}.{output}"')
+        return response
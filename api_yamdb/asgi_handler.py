@@ -0,0 +1,160 @@
+import asyncio
+import contextvars
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core import signals
+from django.core.handlers.asgi import ASGIHandler
+from django.core.exceptions import RequestAborted
+from django.http import FileResponse
+from django.urls import Resolver404, resolve, set_script_prefix
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+# Chunks of a streaming response read ahead of a slow client.
+STREAM_QUEUE_SIZE = 8
+
+
+class PooledASGIHandler(ASGIHandler):
+    """
+    ASGI handler running the read-only catalog and review feeds in their own
+    bounded thread pool.
+
+    Django 3.0 has no async views, so the views stay synchronous. The event
+    loop reads request bodies and writes responses, so slow clients do not
+    hold a thread, while hot reads get ASGI_READ_THREADS threads (and as many
+    database connections) that writes and rare endpoints cannot starve.
+    """
+    def __init__(self):
+        super().__init__()
+        self.read_executor = ThreadPoolExecutor(
+            max_workers=settings.ASGI_READ_THREADS,
+            thread_name_prefix='asgi-read')
+        self.write_executor = ThreadPoolExecutor(
+            max_workers=settings.ASGI_WRITE_THREADS,
+            thread_name_prefix='asgi-write')
+
+    def get_executor(self, request):
+        if request.method not in SAFE_METHODS:
+            return self.write_executor
+        try:
+            match = resolve(request.path_info)
+        except Resolver404:
+            return self.write_executor
+        if match.url_name in settings.ASGI_READ_ROUTES:
+            return self.read_executor
+        return self.write_executor
+
+    async def run_in_executor(self, executor, func, *args):
+        loop = asyncio.get_event_loop()
+        context = contextvars.copy_context()
+        return await loop.run_in_executor(
+            executor, functools.partial(context.run, func, *args))
+
+    def handle(self, scope, request):
+        """
+        Run the view in a worker thread. request_started and, for complete
+        responses, request_finished are sent from that thread too, so the
+        database connections it used are checked, closed or returned to
+        their pool like under WSGI.
+        """
+        signals.request_started.send(sender=self.__class__, scope=scope)
+        response = self.get_response(request)
+        response._handler_class = self.__class__
+        if not response.streaming:
+            response.close()
+        return response
+
+    def stream(self, response, loop, queue, cancelled):
+        """
+        Iterate a streaming response in one worker thread, which owns the
+        database cursor it reads from, and hand chunks to the event loop.
+        """
+        try:
+            for part in response:
+                for chunk, _ in self.chunk_bytes(part):
+                    if cancelled.is_set():
+                        return
+                    asyncio.run_coroutine_threadsafe(
+                        queue.put(chunk), loop).result()
+        finally:
+            try:
+                response.close()
+            finally:
+                asyncio.run_coroutine_threadsafe(
+                    queue.put(None), loop).result()
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            raise ValueError(
+                'Django can only handle ASGI/HTTP connections, not %s.'
+                % scope['type'])
+        try:
+            body_file = await self.read_body(receive)
+        except RequestAborted:
+            return
+        set_script_prefix(self.get_script_prefix(scope))
+        request, error_response = self.create_request(scope, body_file)
+        if request is None:
+            await self.send_response(error_response, send)
+            return
+        executor = self.get_executor(request)
+        response = await self.run_in_executor(executor, self.handle, scope,
+                                              request)
+        if isinstance(response, FileResponse):
+            response.block_size = self.chunk_size
+        if response.streaming:
+            await self.send_streaming_response(response, send, executor)
+        else:
+            await self.send_response(response, send)
+
+    async def send_start(self, response, send):
+        headers = []
+        for header, value in response.items():
+            if isinstance(header, str):
+                header = header.encode('ascii')
+            if isinstance(value, str):
+                value = value.encode('latin1')
+            headers.append((bytes(header), bytes(value)))
+        for cookie in response.cookies.values():
+            headers.append((b'Set-Cookie',
+                            cookie.output(header='').encode('ascii').strip()))
+        await send({
+            'type': 'http.response.start',
+            'status': response.status_code,
+            'headers': headers,
+        })
+
+    async def send_response(self, response, send):
+        """
+        Send a complete response, which handle() has already closed.
+        """
+        await self.send_start(response, send)
+        for chunk, last in self.chunk_bytes(response.content):
+            await send({
+                'type': 'http.response.body',
+                'body': chunk,
+                'more_body': not last,
+            })
+
+    async def send_streaming_response(self, response, send, executor):
+        loop = asyncio.get_event_loop()
+        queue = asyncio.Queue(maxsize=STREAM_QUEUE_SIZE)
+        cancelled = threading.Event()
+        producer = asyncio.ensure_future(self.run_in_executor(
+            executor, self.stream, response, loop, queue, cancelled))
+        try:
+            await self.send_start(response, send)
+            while True:
+                chunk = await queue.get()
+                if chunk is None:
+                    break
+                await send({'type': 'http.response.body', 'body': chunk,
+                            'more_body': True})
+            await send({'type': 'http.response.body'})
+        finally:
+            cancelled.set()
+            while not queue.empty():
+                queue.get_nowait()
+            await producer
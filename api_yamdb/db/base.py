@@ -0,0 +1,91 @@
+import functools
+import time
+
+from api_yamdb.metrics import observe_connection_acquire
+
+from .pool import get_pool
+
+
+class ConnectionManagementMixin:
+    """
+    Database wrapper mixin adding what Django 3.0 lacks for persistent
+    connections:
+
+    * CONN_HEALTH_CHECKS: a reused connection is checked once per request
+      before its first query and replaced if the server dropped it;
+    * OPTIONS['pool'] = {'max_size': ..., 'timeout': ...}: connections are
+      taken from a per-process pool and returned to it on close, so threads
+      of one worker share max_size connections;
+    * the time spent getting a connection, including waiting for the pool,
+      is observed in yamdb_db_connection_acquire_seconds.
+    """
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.health_check_done = False
+
+    @property
+    def health_check_enabled(self):
+        return self.settings_dict.get('CONN_HEALTH_CHECKS', False)
+
+    @property
+    def pool(self):
+        options = self.settings_dict['OPTIONS'].get('pool')
+        if not options:
+            return None
+        return get_pool(self.alias, options)
+
+    def get_connection_params(self):
+        conn_params = super().get_connection_params()
+        conn_params.pop('pool', None)
+        return conn_params
+
+    def get_new_connection(self, conn_params):
+        pool = self.pool
+        if pool is None:
+            return super().get_new_connection(conn_params)
+        return pool.acquire(
+            functools.partial(super().get_new_connection, conn_params),
+            validate=self.validate_pooled_connection)
+
+    def validate_pooled_connection(self, connection):
+        if not self.health_check_enabled:
+            return True
+        try:
+            cursor = connection.cursor()
+            try:
+                cursor.execute('SELECT 1')
+            finally:
+                cursor.close()
+        except Exception:
+            return False
+        return True
+
+    def connect(self):
+        started = time.perf_counter()
+        super().connect()
+        self.health_check_done = True
+        observe_connection_acquire(self.alias, time.perf_counter() - started)
+
+    def _close(self):
+        pool = self.pool
+        if pool is None or self.connection is None:
+            return super()._close()
+        with self.wrap_database_errors:
+            pool.release(self.connection,
+                         reset=lambda connection: connection.rollback())
+
+    def close_if_unusable_or_obsolete(self):
+        super().close_if_unusable_or_obsolete()
+        self.health_check_done = False
+
+    def close_if_health_check_failed(self):
+        if (self.connection is None or not self.health_check_enabled
+                or self.health_check_done or self.in_atomic_block):
+            return
+        if not self.is_usable():
+            self.close()
+        self.health_check_done = True
+
+    def _cursor(self, name=None):
+        self.close_if_health_check_failed()
+        return super()._cursor(name)
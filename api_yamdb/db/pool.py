@@ -0,0 +1,105 @@
+import os
+import threading
+import time
+
+from django.db import OperationalError
+
+
+class PoolTimeout(OperationalError):
+    pass
+
+
+class ConnectionPool:
+    """
+    Thread-safe pool of at most max_size DB-API connections.
+
+    Connections are opened lazily by the factory passed to acquire() and
+    kept idle after release() until the next acquire().
+    """
+    def __init__(self, max_size, timeout):
+        self.max_size = max_size
+        self.timeout = timeout
+        self.idle = []
+        self.size = 0
+        self.condition = threading.Condition()
+
+    def acquire(self, factory, validate=None):
+        """
+        Return an idle connection that passes validate() or a new one from
+        factory(). Validation runs outside the lock, so a health check
+        round-trip does not hold up the other threads.
+        """
+        deadline = time.monotonic() + self.timeout
+        while True:
+            with self.condition:
+                while not self.idle and self.size >= self.max_size:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0 or not self.condition.wait(remaining):
+                        raise PoolTimeout(
+                            f'No database connection available in '
+                            f'{self.timeout}s, all {self.max_size} are in '
+                            f'use.')
+                if not self.idle:
+                    self.size += 1
+                    break
+                connection = self.idle.pop()
+            if validate is None or validate(connection):
+                return connection
+            self.discard(connection)
+            with self.condition:
+                self.size -= 1
+                self.condition.notify()
+        try:
+            return factory()
+        except Exception:
+            with self.condition:
+                self.size -= 1
+                self.condition.notify()
+            raise
+
+    def release(self, connection, reset=None):
+        try:
+            if reset is not None:
+                reset(connection)
+        except Exception:
+            self.discard(connection)
+            with self.condition:
+                self.size -= 1
+                self.condition.notify()
+            return
+        with self.condition:
+            self.idle.append(connection)
+            self.condition.notify()
+
+    def discard(self, connection):
+        try:
+            connection.close()
+        except Exception:
+            pass
+
+    def close(self):
+        with self.condition:
+            idle, self.idle = self.idle, []
+            self.size -= len(idle)
+        for connection in idle:
+            self.discard(connection)
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(alias, options):
+    """
+    Return the pool of a database alias in the current process. Pools are
+    not shared with forked workers, which get their own on first use.
+    """
+    pid = os.getpid()
+    with _pools_lock:
+        pid_and_pool = _pools.get(alias)
+        if pid_and_pool is None or pid_and_pool[0] != pid:
+            pid_and_pool = (pid, ConnectionPool(
+                max_size=options['max_size'],
+                timeout=options.get('timeout', 10)))
+            _pools[alias] = pid_and_pool
+        return pid_and_pool[1]
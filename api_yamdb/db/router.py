@@ -0,0 +1,72 @@
+import random
+import threading
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+PIN_COOKIE = 'pin_primary'
+
+_state = threading.local()
+
+
+@contextmanager
+def reading_from_replicas(enabled=True):
+    """
+    Let queries in the block read from DATABASE_REPLICAS. Code outside such
+    a block (commands, workers, signals) always reads the primary.
+    """
+    previous = getattr(_state, 'enabled', False)
+    _state.enabled = enabled
+    try:
+        yield
+    finally:
+        _state.enabled = previous
+
+
+class ReplicaRouter:
+    """
+    Send reads to a random replica while reading_from_replicas() is on and
+    everything else to the primary.
+    """
+    def db_for_read(self, model, **hints):
+        replicas = settings.DATABASE_REPLICAS
+        if not replicas or not getattr(_state, 'enabled', False):
+            return DEFAULT_DB_ALIAS
+        instance = hints.get('instance')
+        if instance is not None and instance._state.db:
+            # Related objects follow the database the instance came from.
+            return instance._state.db
+        if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        return random.choice(replicas)
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db not in settings.DATABASE_REPLICAS
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Serve safe requests from replicas. After a successful write the client
+    gets a short-lived cookie pinning its reads to the primary, so it sees
+    its own changes before they reach the replicas.
+    """
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        safe = request.method in SAFE_METHODS
+        with reading_from_replicas(safe and PIN_COOKIE not in request.COOKIES):
+            response = self.get_response(request)
+        if (not safe and settings.DATABASE_REPLICAS
+                and response.status_code < 400):
+            response.set_cookie(PIN_COOKIE, '1', httponly=True,
+                                max_age=settings.DATABASE_REPLICA_PIN_SECONDS)
+        return response
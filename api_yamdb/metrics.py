@@ -0,0 +1,112 @@
+import os
+import time
+from contextlib import ExitStack
+
+from django.db import connections
+from django.http import HttpResponse
+
+from prometheus_client import CONTENT_TYPE_LATEST, CollectorRegistry, \
+    Counter, Histogram, REGISTRY, generate_latest, multiprocess
+
+MULTIPROCESS_DIR_ENV = 'prometheus_multiproc_dir'
+
+REQUESTS = Counter('yamdb_http_requests_total',
+                   'HTTP requests by route, method and status.',
+                   ['route', 'method', 'status'])
+LATENCY = Histogram('yamdb_http_request_duration_seconds',
+                    'HTTP request latency by route.', ['route', 'method'])
+QUERIES = Histogram('yamdb_db_queries_per_request',
+                    'Database queries run by one request.', ['route'],
+                    buckets=(0, 1, 2, 3, 5, 10, 20, 50, 100, 200, 500))
+PAGE_DEPTH = Histogram('yamdb_pagination_depth',
+                       'Requested page number of paginated lists.',
+                       ['route'],
+                       buckets=(1, 2, 5, 10, 20, 50, 100, 500, 1000))
+CACHE_REQUESTS = Counter('yamdb_response_cache_requests_total',
+                         'Response cache lookups by resource and result.',
+                         ['resource', 'result'])
+CONNECTION_ACQUIRE = Histogram(
+    'yamdb_db_connection_acquire_seconds',
+    'Time to open or take from the pool a database connection.', ['alias'],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25,
+             0.5, 1, 2.5, 5, 10))
+THROTTLED = Counter('yamdb_throttled_requests_total',
+                    'Requests rejected by rate limits by scope.', ['scope'])
+
+
+def record_cache_lookup(resource, hit):
+    CACHE_REQUESTS.labels(resource, 'hit' if hit else 'miss').inc()
+
+
+def observe_connection_acquire(alias, seconds):
+    CONNECTION_ACQUIRE.labels(alias).observe(seconds)
+
+
+def record_throttled(scope):
+    THROTTLED.labels(scope).inc()
+
+
+class QueryCounter:
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+def get_route(request):
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return 'unmatched'
+    return match.url_name or match.view_name or 'unnamed'
+
+
+def get_page_number(request):
+    try:
+        return int(request.GET.get('page', 1))
+    except ValueError:
+        return None
+
+
+class MetricsMiddleware:
+    """
+    Count requests and observe latency, query count and page depth per route.
+    """
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        counter = QueryCounter()
+        started = time.perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(counter))
+            response = self.get_response(request)
+        duration = time.perf_counter() - started
+
+        route = get_route(request)
+        if route == 'metrics':
+            return response
+        REQUESTS.labels(route, request.method, response.status_code).inc()
+        LATENCY.labels(route, request.method).observe(duration)
+        QUERIES.labels(route).observe(counter.count)
+        if route.endswith('-list') and request.method == 'GET':
+            page = get_page_number(request)
+            if page is not None:
+                PAGE_DEPTH.labels(route).observe(page)
+        return response
+
+
+def metrics_view(request):
+    """
+    Expose metrics in the Prometheus text format. Under gunicorn the values
+    of all workers are merged from prometheus_multiproc_dir.
+    """
+    if MULTIPROCESS_DIR_ENV in os.environ:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return HttpResponse(generate_latest(registry),
+                        content_type=CONTENT_TYPE_LATEST)
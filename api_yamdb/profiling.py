@@ -0,0 +1,180 @@
+import json
+import logging
+import random
+import threading
+import time
+from collections import Counter
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+from rest_framework import serializers
+
+logger = logging.getLogger('api_yamdb.profiling')
+
+DEFAULTS = {
+    'ENABLED': False,
+    'SAMPLE_RATE': 0.01,
+    'SLOW_REQUEST_MS': 500,
+    'DUPLICATE_QUERY_THRESHOLD': 3,
+    'SERVER_TIMING': True,
+}
+
+_local = threading.local()
+
+
+def get_setting(name):
+    return getattr(settings, 'PROFILING', {}).get(name, DEFAULTS[name])
+
+
+class RequestProfile:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.view_started = None
+        self.view_ms = 0.0
+        self.serializer_ms = 0.0
+        self.serializer_depth = 0
+        self.sql_ms = 0.0
+        self.queries = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.sql_ms += (time.perf_counter() - started) * 1000
+            self.queries[sql] += 1
+
+    def duplicates(self, threshold):
+        return {sql: count for sql, count in self.queries.most_common()
+                if count >= threshold}
+
+
+def _timed_representation(method):
+    def to_representation(self, *args, **kwargs):
+        profile = getattr(_local, 'profile', None)
+        if profile is None:
+            return method(self, *args, **kwargs)
+        profile.serializer_depth += 1
+        started = time.perf_counter()
+        try:
+            return method(self, *args, **kwargs)
+        finally:
+            profile.serializer_depth -= 1
+            if not profile.serializer_depth:
+                profile.serializer_ms += (time.perf_counter()
+                                          - started) * 1000
+
+    to_representation.profiled = True
+    return to_representation
+
+
+def install_serializer_timing():
+    for serializer_class in (serializers.Serializer,
+                             serializers.ListSerializer):
+        method = serializer_class.to_representation
+        if not getattr(method, 'profiled', False):
+            serializer_class.to_representation = _timed_representation(
+                method)
+
+
+class ProfilingMiddleware:
+    """
+    Opt-in per-request profiling, enabled with PROFILING['ENABLED'].
+    A PROFILING['SAMPLE_RATE'] share of requests records view, serializer
+    and SQL time, query count, repeated queries and response size. They are
+    reported in the Server-Timing header and the api_yamdb.profiling log.
+    Other requests only pay for a wall clock check against the slow request
+    threshold.
+    """
+    def __init__(self, get_response):
+        if not get_setting('ENABLED'):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.sample_rate = get_setting('SAMPLE_RATE')
+        self.slow_request_ms = get_setting('SLOW_REQUEST_MS')
+        self.duplicate_threshold = get_setting('DUPLICATE_QUERY_THRESHOLD')
+        self.server_timing = get_setting('SERVER_TIMING')
+        install_serializer_timing()
+
+    def __call__(self, request):
+        if random.random() >= self.sample_rate:
+            started = time.perf_counter()
+            response = self.get_response(request)
+            wall_ms = (time.perf_counter() - started) * 1000
+            if wall_ms >= self.slow_request_ms:
+                logger.warning(json.dumps({
+                    'event': 'slow_request',
+                    'method': request.method,
+                    'path': request.path,
+                    'status': response.status_code,
+                    'wall_ms': round(wall_ms, 2),
+                    'sampled': False,
+                }))
+            return response
+
+        profile = RequestProfile()
+        request.profile = profile
+        _local.profile = profile
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(profile))
+                response = self.get_response(request)
+        finally:
+            _local.profile = None
+        self.report(request, response, profile)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        profile = getattr(request, 'profile', None)
+        if profile is not None:
+            profile.view_started = time.perf_counter()
+
+    def process_template_response(self, request, response):
+        self.finish_view(request)
+        return response
+
+    def finish_view(self, request):
+        profile = getattr(request, 'profile', None)
+        if profile is not None and profile.view_started is not None:
+            profile.view_ms = (time.perf_counter()
+                               - profile.view_started) * 1000
+            profile.view_started = None
+
+    def report(self, request, response, profile):
+        self.finish_view(request)
+        wall_ms = (time.perf_counter() - profile.started) * 1000
+        query_count = sum(profile.queries.values())
+        duplicates = profile.duplicates(self.duplicate_threshold)
+        size = (None if response.streaming else len(response.content))
+        if self.server_timing:
+            response['Server-Timing'] = ', '.join([
+                f'total;dur={wall_ms:.2f}',
+                f'view;dur={profile.view_ms:.2f}',
+                f'serializer;dur={profile.serializer_ms:.2f}',
+                f'db;dur={profile.sql_ms:.2f};desc="{query_count} queries"',
+            ])
+        record = {
+            'event': 'request_profile',
+            'method': request.method,
+            'path': request.path,
+            'status': response.status_code,
+            'wall_ms': round(wall_ms, 2),
+            'view_ms': round(profile.view_ms, 2),
+            'serializer_ms': round(profile.serializer_ms, 2),
+            'sql_ms': round(profile.sql_ms, 2),
+            'sql_count': query_count,
+            'duplicate_queries': [
+                {'sql': sql, 'count': count}
+                for sql, count in duplicates.items()
+            ],
+            'response_bytes': size,
+            'sampled': True,
+        }
+        if duplicates or wall_ms >= self.slow_request_ms:
+            logger.warning(json.dumps(record))
+        else:
+            logger.info(json.dumps(record))
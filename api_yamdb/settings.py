@@ -16,6 +16,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     'rest_framework',
     'django_filters',
     'users',
@@ -24,6 +25,10 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'api_yamdb.metrics.MetricsMiddleware',
+    'api_yamdb.profiling.ProfilingMiddleware',
+    'api_yamdb.db.router.ReplicaRoutingMiddleware',
+    'api_yamdb.throttling.RateLimitHeadersMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -54,17 +59,73 @@ TEMPLATES = [
 
 WSGI_APPLICATION = 'api_yamdb.wsgi.application'
 
+ASGI_APPLICATION = 'api_yamdb.asgi.application'
+
+# Routes served from the read thread pool in ASGI mode.
+ASGI_READ_ROUTES = {
+    'category-list',
+    'genre-list',
+    'title-list',
+    'title-detail',
+    'title-top',
+    'title-trending',
+    'reviews-list',
+    'comments-list',
+}
+
+ASGI_READ_THREADS = int(os.environ.get('ASGI_READ_THREADS', 16))
+
+ASGI_WRITE_THREADS = int(os.environ.get('ASGI_WRITE_THREADS', 4))
+
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.postgresql',
+        # PostgreSQL backend with health checks, an optional connection pool
+        # and connection metrics, see api_yamdb/db/base.py.
+        'ENGINE': 'api_yamdb.db.postgresql',
         'NAME': os.environ.get('DB_NAME'),
         'USER': os.environ.get('POSTGRES_USER'),
         'PASSWORD': os.environ.get('POSTGRES_PASSWORD'),
         'HOST': os.environ.get('DB_HOST'),
         'PORT': os.environ.get('DB_PORT'),
+        'CONN_MAX_AGE': int(os.environ.get('DB_CONN_MAX_AGE', 60)),
+        'CONN_HEALTH_CHECKS': os.environ.get(
+            'DB_CONN_HEALTH_CHECKS', 'True') == 'True',
+        # PgBouncer in transaction mode cannot keep named cursors open.
+        'DISABLE_SERVER_SIDE_CURSORS': os.environ.get(
+            'DB_PGBOUNCER', 'False') == 'True',
+        'OPTIONS': {},
     }
 }
 
+DB_POOL_SIZE = int(os.environ.get('DB_POOL_SIZE', 0))
+
+if DB_POOL_SIZE:
+    DATABASES['default']['OPTIONS']['pool'] = {
+        'max_size': DB_POOL_SIZE,
+        'timeout': float(os.environ.get('DB_POOL_TIMEOUT', 10)),
+    }
+
+# Read replicas of the default database, DB_REPLICA_HOSTS=host[:port],...
+DATABASE_REPLICAS = []
+
+for number, address in enumerate(
+        filter(None, os.environ.get('DB_REPLICA_HOSTS', '').split(',')), 1):
+    host, _, port = address.strip().partition(':')
+    DATABASES[f'replica{number}'] = {
+        **DATABASES['default'],
+        'HOST': host,
+        'PORT': port or DATABASES['default']['PORT'],
+        'OPTIONS': dict(DATABASES['default']['OPTIONS']),
+        'TEST': {'MIRROR': 'default'},
+    }
+    DATABASE_REPLICAS.append(f'replica{number}')
+
+DATABASE_ROUTERS = ['api_yamdb.db.router.ReplicaRouter']
+
+# Seconds reads of a client stay on the primary after its last write.
+DATABASE_REPLICA_PIN_SECONDS = int(
+    os.environ.get('DB_REPLICA_PIN_SECONDS', 10))
+
 # DATABASES = {
 #     'default': {
 #         'ENGINE': 'django.db.backends.sqlite3',
@@ -72,6 +133,40 @@ DATABASES = {
 #     }
 # }
 
+CACHES = {
+    'default': {
+        'BACKEND': os.environ.get(
+            'CACHE_BACKEND',
+            'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.environ.get('CACHE_LOCATION', 'yamdb'),
+        'TIMEOUT': 300,
+        'OPTIONS': {
+            'MAX_ENTRIES': 1000,
+        },
+    },
+    'throttle': {
+        'BACKEND': os.environ.get(
+            'THROTTLE_CACHE_BACKEND',
+            'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.environ.get('THROTTLE_CACHE_LOCATION',
+                                   'yamdb-throttle'),
+        'OPTIONS': {
+            'MAX_ENTRIES': 10000,
+        },
+    },
+}
+
+RESPONSE_CACHE_ALIAS = 'default'
+
+# Shared store of the rate limit buckets, see api_yamdb/throttling.py.
+# Use a cache shared by all workers (and RedisBucketStore with django-redis)
+# for limits to hold across workers.
+THROTTLE_STORE = os.environ.get('THROTTLE_STORE',
+                                'api_yamdb.throttling.CacheBucketStore')
+THROTTLE_CACHE_ALIAS = 'throttle'
+
+RESPONSE_CACHE_TIMEOUT = int(os.environ.get('RESPONSE_CACHE_TIMEOUT', 300))
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         'NAME':
@@ -107,7 +202,7 @@ STATIC_ROOT = os.path.join(BASE_DIR, 'static/')
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'users.authentication.StatelessJWTAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.AllowAny',
@@ -118,12 +213,86 @@ REST_FRAMEWORK = {
     'DEFAULT_PAGINATION_CLASS':
     'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE':
-    100
+    100,
+    'DEFAULT_THROTTLE_CLASSES': [
+        'api_yamdb.throttling.AnonReadThrottle',
+    ],
+    # Token bucket rates per scope, an empty value turns a scope off.
+    'DEFAULT_THROTTLE_RATES': {
+        'auth': os.environ.get('THROTTLE_AUTH_RATE', '10/min') or None,
+        'write': os.environ.get('THROTTLE_WRITE_RATE', '60/min') or None,
+        'anon_read': os.environ.get('THROTTLE_ANON_READ_RATE',
+                                    '600/min') or None,
+    },
+    # Proxies in front of the app whose X-Forwarded-For is trusted.
+    'NUM_PROXIES': int(os.environ.get('NUM_PROXIES', 1)),
+}
+PROFILING = {
+    'ENABLED': os.environ.get('PROFILING_ENABLED', 'False') == 'True',
+    'SAMPLE_RATE': float(os.environ.get('PROFILING_SAMPLE_RATE', 0.01)),
+    'SLOW_REQUEST_MS': float(os.environ.get('PROFILING_SLOW_REQUEST_MS',
+                                            500)),
+    'DUPLICATE_QUERY_THRESHOLD': 3,
+    'SERVER_TIMING': True,
+}
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+        },
+    },
+    'loggers': {
+        'api_yamdb.profiling': {
+            'handlers': ['console'],
+            'level': 'INFO',
+        },
+    },
 }
+
 SIMPLE_JWT = {'ACCESS_TOKEN_LIFETIME': datetime.timedelta(days=60)}
 
+# How long the auth fingerprint of a user is trusted by a worker. Bounds how
+# late other workers see role changes when the cache is not shared.
+AUTH_FINGERPRINT_TIMEOUT = int(os.environ.get('AUTH_FINGERPRINT_TIMEOUT', 60))
+
+# Largest number of objects accepted by one request to a bulk endpoint.
+BULK_MAX_ITEMS = int(os.environ.get('BULK_MAX_ITEMS', 1000))
+
+# Serialize review and comment lists from values() rows, see api/lean.py.
+LEAN_LIST_SERIALIZERS = os.environ.get('LEAN_LIST_SERIALIZERS',
+                                       'True') == 'True'
+
+# Rows fetched from the database cursor and written per chunk by exports.
+EXPORT_CHUNK_SIZE = int(os.environ.get('EXPORT_CHUNK_SIZE', 2000))
+
+# Reviews a title needs before its own average outweighs the mean score of
+# all titles in /titles/top/.
+TOP_TITLES_MIN_REVIEWS = int(os.environ.get('TOP_TITLES_MIN_REVIEWS', 5))
+
+# Hours after which a review counts half in /titles/trending/.
+TRENDING_HALF_LIFE_HOURS = float(
+    os.environ.get('TRENDING_HALF_LIFE_HOURS', 72))
+
 AUTH_USER_MODEL = 'users.User'
 
 EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
 
 EMAIL_FILE_PATH = os.path.join(BASE_DIR, 'sent_emails')
+
+# 'thread' flushes the outbox from a background thread of every worker,
+# 'command' leaves it to `manage.py send_emails --loop`.
+EMAIL_OUTBOX_WORKER = os.environ.get('EMAIL_OUTBOX_WORKER', 'thread')
+
+EMAIL_OUTBOX_BATCH_SIZE = 100
+
+EMAIL_OUTBOX_MAX_ATTEMPTS = 5
+
+EMAIL_OUTBOX_RETRY_DELAY = 30
+
+EMAIL_OUTBOX_POLL_INTERVAL = 10
+
+# Seconds a claimed email is left to its worker before it is sent again.
+EMAIL_OUTBOX_CLAIM_TIMEOUT = 300
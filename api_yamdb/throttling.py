@@ -0,0 +1,209 @@
+import math
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.module_loading import import_string
+
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle
+
+from .metrics import record_throttled
+
+KEY = 'throttle:{}:{}'
+
+PERIODS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+# Takes a token from the bucket in one step on the redis server. The state
+# is the time at which the bucket is full again.
+TAKE_SCRIPT = """
+local now = tonumber(ARGV[1])
+local capacity = tonumber(ARGV[2])
+local interval = tonumber(ARGV[3])
+local full_at = math.max(tonumber(redis.call('GET', KEYS[1]) or 0), now)
+if full_at - now > (capacity - 1) * interval then
+    return {0, tostring(full_at)}
+end
+full_at = full_at + interval
+redis.call('SET', KEYS[1], tostring(full_at), 'PX',
+           math.ceil((full_at - now) * 1000))
+return {1, tostring(full_at)}
+"""
+
+
+def parse_rate(rate):
+    """
+    Parse a rate like '10/min' into the bucket capacity and the seconds
+    in which an empty bucket fills up again.
+    """
+    count, period = rate.split('/')
+    return int(count), PERIODS[period[0]]
+
+
+def get_store():
+    return import_string(settings.THROTTLE_STORE)(
+        settings.THROTTLE_CACHE_ALIAS)
+
+
+class CacheBucketStore:
+    """
+    Token buckets in a Django cache. A bucket is read and written under a
+    lock taken with cache.add(), which is atomic in local memory, memcached
+    and redis caches. A request that finds the lock taken by a concurrent
+    request of the same client retries it for at most lock_wait seconds,
+    enough for a lock left by a crashed worker to expire. Only a request
+    that still cannot take it is rejected, so a burst can neither slip past
+    the limit nor hold worker threads for long.
+    """
+    lock_timeout = 1
+    lock_wait = 1
+    lock_poll = 0.005
+
+    def __init__(self, alias):
+        self.cache = caches[alias]
+
+    def lock(self, key):
+        deadline = time.monotonic() + self.lock_wait
+        while not self.cache.add(key, 1, timeout=self.lock_timeout):
+            if time.monotonic() >= deadline:
+                return False
+            time.sleep(self.lock_poll)
+        return True
+
+    def take(self, key, capacity, interval, now):
+        """
+        Take a token from the bucket. Return whether there was one and the
+        time at which the bucket is full again.
+        """
+        lock = f'{key}:lock'
+        if not self.lock(lock):
+            return False, now + capacity * interval
+        try:
+            full_at = max(self.cache.get(key, now), now)
+            if full_at - now > (capacity - 1) * interval:
+                return False, full_at
+            full_at += interval
+            self.cache.set(key, full_at, timeout=math.ceil(full_at - now))
+            return True, full_at
+        finally:
+            self.cache.delete(lock)
+
+
+class RedisBucketStore(CacheBucketStore):
+    """
+    Token buckets in the redis server of a django-redis cache, updated by
+    a Lua script without locks.
+    """
+    def __init__(self, alias):
+        super().__init__(alias)
+        self.script = self.cache.client.get_client(
+            write=True).register_script(TAKE_SCRIPT)
+
+    def take(self, key, capacity, interval, now):
+        allowed, full_at = self.script(keys=[self.cache.make_key(key)],
+                                       args=[now, capacity, interval])
+        return bool(allowed), float(full_at)
+
+
+class TokenBucketThrottle(BaseThrottle):
+    """
+    Throttle requests of a scope with a token bucket per client.
+    The bucket holds as many tokens as the scope rate allows per period
+    and refills evenly, so short bursts pass and steady floods do not.
+    A scope without a rate in DEFAULT_THROTTLE_RATES is not throttled.
+    """
+    scope = None
+
+    def __init__(self):
+        self.rate = api_settings.DEFAULT_THROTTLE_RATES.get(self.scope)
+        self.wait_seconds = None
+
+    def get_client_key(self, request, view):
+        """
+        Return the key of the client bucket or None to skip the request.
+        """
+        raise NotImplementedError('.get_client_key() must be overridden')
+
+    def allow_request(self, request, view):
+        if self.rate is None:
+            return True
+        client = self.get_client_key(request, view)
+        if client is None:
+            return True
+        capacity, period = parse_rate(self.rate)
+        interval = period / capacity
+        now = time.time()
+        allowed, full_at = get_store().take(KEY.format(self.scope, client),
+                                            capacity, interval, now)
+        used = math.ceil(round((full_at - now) / interval, 6))
+        remaining = max(capacity - used, 0)
+        set_rate_limit(request, capacity, remaining, full_at - now)
+        if not allowed:
+            self.wait_seconds = full_at - now - (capacity - 1) * interval
+            record_throttled(self.scope)
+        return allowed
+
+    def wait(self):
+        return self.wait_seconds
+
+
+class AuthThrottle(TokenBucketThrottle):
+    """Signup and token requests per IP address."""
+    scope = 'auth'
+
+    def get_client_key(self, request, view):
+        return self.get_ident(request)
+
+
+class WriteThrottle(TokenBucketThrottle):
+    """Writes per user, or per IP address of anonymous clients."""
+    scope = 'write'
+
+    def get_client_key(self, request, view):
+        if request.method in SAFE_METHODS:
+            return None
+        if request.user and request.user.is_authenticated:
+            return f'user-{request.user.pk}'
+        return self.get_ident(request)
+
+
+class AnonReadThrottle(TokenBucketThrottle):
+    """Reads of anonymous clients per IP address."""
+    scope = 'anon_read'
+
+    def get_client_key(self, request, view):
+        if request.method not in SAFE_METHODS or (
+                request.user and request.user.is_authenticated):
+            return None
+        return self.get_ident(request)
+
+
+def set_rate_limit(request, limit, remaining, reset):
+    """
+    Keep the state of the most exhausted bucket of the request for the
+    rate limit headers.
+    """
+    request = request._request
+    current = getattr(request, 'rate_limit', None)
+    if current is None or remaining < current[1]:
+        request.rate_limit = (limit, remaining, reset)
+
+
+class RateLimitHeadersMiddleware:
+    """
+    Add X-RateLimit-Limit, X-RateLimit-Remaining and X-RateLimit-Reset
+    (seconds until the bucket is full) to throttled endpoints' responses.
+    """
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        rate_limit = getattr(request, 'rate_limit', None)
+        if rate_limit is not None:
+            limit, remaining, reset = rate_limit
+            response['X-RateLimit-Limit'] = str(limit)
+            response['X-RateLimit-Remaining'] = str(remaining)
+            response['X-RateLimit-Reset'] = str(math.ceil(reset))
+        return response
@@ -0,0 +1,52 @@
+"""
+Compare two benchmark result files written by benchmarks.run.
+
+    python -m benchmarks.compare base.json head.json --threshold 0.2
+
+Exits with status 1 if an endpoint got slower than the threshold
+or runs more queries than before.
+"""
+import argparse
+import json
+import sys
+
+
+def compare(base, head, threshold):
+    regressions = []
+    for name, result in head['results'].items():
+        if name not in base['results']:
+            continue
+        before = base['results'][name]
+        p50_before = before['latency_ms']['p50']
+        p50_after = result['latency_ms']['p50']
+        change = (p50_after - p50_before) / p50_before if p50_before else 0
+        queries_before = before['queries']['max']
+        queries_after = result['queries']['max']
+        print(f'{name:<15} p50 {p50_before:8.2f} -> {p50_after:8.2f} ms '
+              f'({change:+.0%})  queries {queries_before} -> '
+              f'{queries_after}')
+        if change > threshold:
+            regressions.append(f'{name}: p50 latency {change:+.0%}')
+        if queries_after > queries_before:
+            regressions.append(f'{name}: {queries_after - queries_before} '
+                               f'more queries')
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('base')
+    parser.add_argument('head')
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help='Allowed relative p50 latency growth.')
+    options = parser.parse_args(argv)
+    with open(options.base) as base, open(options.head) as head:
+        regressions = compare(json.load(base), json.load(head),
+                              options.threshold)
+    for regression in regressions:
+        print(f'REGRESSION {regression}', file=sys.stderr)
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,105 @@
+import io
+import random
+
+from django.contrib.auth.hashers import make_password
+from django.core.management import call_command
+from django.db import connection
+
+from api.models import Category, Comment, Genre, Review, Title
+from users.models import User
+
+BATCH_SIZE = 2000
+
+
+def bulk_create(model, objs):
+    """
+    Django 3.0 lets an explicit batch_size override the backend limit,
+    which SQLite rejects for wide batches; cap it at what the backend takes.
+    """
+    fields = [field for field in model._meta.concrete_fields
+              if not field.primary_key]
+    batch_size = min(BATCH_SIZE,
+                     connection.ops.bulk_batch_size(fields, []) or BATCH_SIZE)
+    return model.objects.bulk_create(objs, batch_size=batch_size)
+
+
+def zipf_counts(total, buckets, exponent, rng):
+    """
+    Split total items over buckets with Zipf-distributed popularity.
+    The bucket order is shuffled so popular titles are not the first ids.
+    """
+    weights = [1 / rank ** exponent for rank in range(1, buckets + 1)]
+    scale = total / sum(weights)
+    counts = [int(weight * scale) for weight in weights]
+    for index in range(total - sum(counts)):
+        counts[index % buckets] += 1
+    rng.shuffle(counts)
+    return counts
+
+
+def generate(titles=100, reviews_per_title=20, comments_per_review=1,
+             genres=10, categories=3, exponent=1.1, seed=0):
+    """
+    Fill the database with a synthetic catalog following api.models and
+    users.models. Returns the ids useful for benchmarking hot endpoints.
+    """
+    rng = random.Random(seed)
+    review_counts = zipf_counts(titles * reviews_per_title, titles,
+                                exponent, rng)
+    password = make_password(None)
+    bulk_create(User, (
+        User(username=f'bench{i}',
+             email=f'bench{i}@yamdb.fake',
+             password=password) for i in range(max(review_counts) or 1)))
+    users = list(
+        User.objects.filter(username__startswith='bench').order_by('pk'))
+
+    Category.objects.bulk_create(
+        Category(name=f'Категория {i}', slug=f'category-{i}')
+        for i in range(categories))
+    category_ids = list(Category.objects.values_list('pk', flat=True))
+    Genre.objects.bulk_create(
+        Genre(name=f'Жанр {i}', slug=f'genre-{i}') for i in range(genres))
+    genre_ids = list(Genre.objects.values_list('pk', flat=True))
+
+    bulk_create(Title, (
+        Title(name=f'Произведение {i}',
+              year=rng.randint(1900, 2020),
+              description=f'Описание произведения {i}',
+              category_id=rng.choice(category_ids))
+        for i in range(titles)))
+    title_ids = list(Title.objects.order_by('pk').values_list('pk',
+                                                              flat=True))
+    bulk_create(Title.genre.through, (
+        Title.genre.through(title_id=title_id, genre_id=genre_id)
+        for title_id in title_ids
+        for genre_id in rng.sample(genre_ids, min(2, len(genre_ids)))))
+
+    bulk_create(Review, (
+        Review(title_id=title_id,
+               author=author,
+               text=f'Отзыв {author.pk} на {title_id}',
+               score=rng.randint(1, 10))
+        for title_id, count in zip(title_ids, review_counts)
+        for author in users[:count]))
+    popular_title_id = title_ids[review_counts.index(max(review_counts))]
+    review_ids = list(
+        Review.objects.filter(title_id=popular_title_id).values_list(
+            'pk', flat=True))
+    bulk_create(Comment, (
+        Comment(review_id=review_id,
+                author=rng.choice(users),
+                text=f'Комментарий {i}')
+        for review_id in review_ids
+        for i in range(comments_per_review)))
+    call_command('rebuild_ratings', stdout=io.StringIO())
+    call_command('rebuild_user_counts', stdout=io.StringIO())
+    call_command('refresh_rankings', stdout=io.StringIO())
+    call_command('rebuild_title_stats', stdout=io.StringIO())
+
+    return {
+        'title_id': popular_title_id,
+        'review_id': review_ids[0] if review_ids else None,
+        'genre_slug': 'genre-0',
+        'user_email': users[0].email,
+    }
@@ -0,0 +1,192 @@
+"""
+Benchmark the hot API endpoints on a synthetic dataset.
+
+    python -m benchmarks.run --titles 1000 --reviews-per-title 50 \
+        --output bench.json
+
+Uses the settings from DJANGO_SETTINGS_MODULE (tests.settings_qa by default)
+and runs against a freshly created test database.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def git_revision():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', 'HEAD'],
+                                       cwd=ROOT_DIR,
+                                       stderr=subprocess.DEVNULL).decode(
+                                       ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def get_endpoints(ids):
+    from django.contrib.auth.tokens import default_token_generator
+
+    from users.models import User
+
+    user = User.objects.get(email=ids['user_email'])
+    title_id, review_id = ids['title_id'], ids['review_id']
+    return [
+        ('title-list', 'get', '/api/v1/titles/', None),
+        ('title-filter', 'get',
+         f'/api/v1/titles/?genre={ids["genre_slug"]}', None),
+        ('title-search', 'get', '/api/v1/titles/?q=Произведение', None),
+        ('title-top', 'get', '/api/v1/titles/top/', None),
+        ('title-trending', 'get', '/api/v1/titles/trending/', None),
+        ('reviews-list', 'get', f'/api/v1/titles/{title_id}/reviews/', None),
+        ('comments-list', 'get',
+         f'/api/v1/titles/{title_id}/reviews/{review_id}/comments/', None),
+        ('get_token', 'post', '/api/v1/auth/token/', {
+            'email': user.email,
+            'confirmation_code': default_token_generator.make_token(user),
+        }),
+    ]
+
+
+def measure(client, method, path, data, requests, warmup, warm_cache):
+    from django.core.cache import cache
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    call = getattr(client, method)
+    for _ in range(warmup):
+        call(path, data)
+    timings, queries, sizes = [], [], []
+    started = time.perf_counter()
+    for _ in range(requests):
+        if not warm_cache:
+            cache.clear()
+        with CaptureQueriesContext(connection) as context:
+            request_started = time.perf_counter()
+            response = call(path, data)
+            timings.append(time.perf_counter() - request_started)
+        if response.status_code >= 400:
+            raise RuntimeError(f'{method.upper()} {path} returned '
+                               f'{response.status_code}')
+        queries.append(len(context.captured_queries))
+        sizes.append(len(response.content))
+    elapsed = time.perf_counter() - started
+    return {
+        'requests': requests,
+        'latency_ms': {
+            'mean': statistics.mean(timings) * 1000,
+            'p50': percentile(timings, 0.5) * 1000,
+            'p95': percentile(timings, 0.95) * 1000,
+            'max': max(timings) * 1000,
+        },
+        'throughput_rps': requests / elapsed,
+        'queries': {
+            'mean': statistics.mean(queries),
+            'max': max(queries),
+        },
+        'response_bytes': statistics.mean(sizes),
+    }
+
+
+def run(options):
+    import django
+    from django.conf import settings
+    from django.db import connection
+    from django.test import Client
+    from django.test.utils import setup_test_environment, \
+        teardown_test_environment
+
+    django.setup()
+    setup_test_environment(debug=False)
+    old_name = connection.settings_dict['NAME']
+    connection.creation.create_test_db(verbosity=0, autoclobber=True)
+    try:
+        from .datasets import generate
+
+        generate_started = time.perf_counter()
+        ids = generate(titles=options.titles,
+                       reviews_per_title=options.reviews_per_title,
+                       comments_per_review=options.comments_per_review,
+                       exponent=options.zipf,
+                       seed=options.seed)
+        generate_seconds = time.perf_counter() - generate_started
+
+        client = Client()
+        results = {}
+        for name, method, path, data in get_endpoints(ids):
+            if options.only and name not in options.only:
+                continue
+            results[name] = measure(client, method, path, data,
+                                    options.requests, options.warmup,
+                                    options.warm_cache)
+            print(f'{name:<15} p50 {results[name]["latency_ms"]["p50"]:8.2f}'
+                  f' ms  {results[name]["throughput_rps"]:8.1f} rps  '
+                  f'{results[name]["queries"]["max"]:3d} queries',
+                  file=sys.stderr)
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        teardown_test_environment()
+
+    return {
+        'meta': {
+            'revision': git_revision(),
+            'timestamp': datetime.now(timezone.utc).isoformat(),
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'database': settings.DATABASES['default']['ENGINE'],
+            'generate_seconds': generate_seconds,
+            'parameters': {
+                'titles': options.titles,
+                'reviews_per_title': options.reviews_per_title,
+                'comments_per_review': options.comments_per_review,
+                'zipf': options.zipf,
+                'seed': options.seed,
+                'requests': options.requests,
+                'warm_cache': options.warm_cache,
+            },
+        },
+        'results': results,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--titles', type=int, default=200)
+    parser.add_argument('--reviews-per-title', type=int, default=20)
+    parser.add_argument('--comments-per-review', type=int, default=2)
+    parser.add_argument('--zipf', type=float, default=1.1,
+                        help='Exponent of the title popularity distribution.')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--requests', type=int, default=50)
+    parser.add_argument('--warmup', type=int, default=5)
+    parser.add_argument('--warm-cache', action='store_true',
+                        help='Keep the response cache between requests.')
+    parser.add_argument('--only', nargs='*', help='Endpoint names to run.')
+    parser.add_argument('--output', help='Write JSON results to this file.')
+    options = parser.parse_args(argv)
+
+    sys.path.insert(0, ROOT_DIR)
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'tests.settings_qa')
+    report = run(options)
+    content = json.dumps(report, indent=2, ensure_ascii=False)
+    if options.output:
+        with open(options.output, 'w') as output:
+            output.write(content)
+    else:
+        print(content)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,122 @@
+"""
+Compare the serializer and the lean path of review and comment lists.
+
+    python -m benchmarks.serializers --rows 1000 --repeat 20
+
+Both paths load the same rows from a freshly created test database and
+render them to bytes; the run fails if the bytes differ.
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def get_paths(rows):
+    from rest_framework.renderers import JSONRenderer
+
+    from api.lean import COMMENT_LIST, REVIEW_LIST
+    from api.models import Comment, Review
+    from api.renderers import FastJSONRenderer
+    from api.serializers import CommentSerializer, ReviewSerializer
+
+    reviews = Review.objects.order_by('-pub_date', '-id')
+    comments = Comment.objects.order_by('-pub_date', '-id')
+    return {
+        'reviews': (
+            lambda: JSONRenderer().render(ReviewSerializer(
+                reviews.select_related('author', 'title')[:rows],
+                many=True).data),
+            lambda: FastJSONRenderer().render(REVIEW_LIST.to_representation(
+                REVIEW_LIST.get_rows(reviews)[:rows])),
+        ),
+        'comments': (
+            lambda: JSONRenderer().render(CommentSerializer(
+                comments.select_related('author')[:rows], many=True).data),
+            lambda: FastJSONRenderer().render(
+                COMMENT_LIST.to_representation(
+                    COMMENT_LIST.get_rows(comments)[:rows])),
+        ),
+    }
+
+
+def timed(path, repeat):
+    content = path()
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        path()
+        timings.append(time.perf_counter() - started)
+    return content, statistics.median(timings) * 1000
+
+
+def run(options):
+    import django
+    from django.db import connection
+    from django.test.utils import setup_test_environment, \
+        teardown_test_environment
+
+    django.setup()
+    setup_test_environment(debug=False)
+    old_name = connection.settings_dict['NAME']
+    connection.creation.create_test_db(verbosity=0, autoclobber=True)
+    try:
+        from api.renderers import orjson
+        from .datasets import generate
+
+        generate(titles=options.titles,
+                 reviews_per_title=options.reviews_per_title,
+                 comments_per_review=options.comments_per_review,
+                 seed=options.seed)
+        results = {}
+        for name, (serializer, lean) in get_paths(options.rows).items():
+            expected, serializer_ms = timed(serializer, options.repeat)
+            content, lean_ms = timed(lean, options.repeat)
+            if content != expected:
+                raise RuntimeError(f'{name}: lean output differs from the '
+                                   f'serializer output')
+            results[name] = {
+                'rows': len(json.loads(content)),
+                'bytes': len(content),
+                'serializer_ms': serializer_ms,
+                'lean_ms': lean_ms,
+                'speedup': serializer_ms / lean_ms,
+            }
+            print(f'{name:<10} serializer {serializer_ms:8.2f} ms  '
+                  f'lean {lean_ms:8.2f} ms  '
+                  f'x{results[name]["speedup"]:.1f}', file=sys.stderr)
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        teardown_test_environment()
+    return {'orjson': orjson is not None, 'results': results}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--titles', type=int, default=50)
+    parser.add_argument('--reviews-per-title', type=int, default=40)
+    parser.add_argument('--comments-per-review', type=int, default=1)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--rows', type=int, default=1000,
+                        help='Rows rendered per list.')
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--output', help='Write JSON results to this file.')
+    options = parser.parse_args(argv)
+
+    sys.path.insert(0, ROOT_DIR)
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'tests.settings_qa')
+    report = run(options)
+    content = json.dumps(report, indent=2)
+    if options.output:
+        with open(options.output, 'w') as output:
+            output.write(content)
+    else:
+        print(content)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,187 @@
+"""
+Compare WSGI (sync gunicorn workers) and ASGI (uvicorn workers) serving
+under many concurrent fast clients plus slow clients trickling requests.
+
+    python -m benchmarks.serving --prepare --output serving.json
+
+Uses the database of DJANGO_SETTINGS_MODULE (tests.settings_qa by default);
+--prepare migrates it and fills it with a synthetic dataset.
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+from .run import ROOT_DIR, git_revision, percentile
+
+MODES = {
+    'wsgi': ['api_yamdb.wsgi:application'],
+    'asgi': ['api_yamdb.asgi:application', '-k',
+             'uvicorn.workers.UvicornH11Worker'],
+}
+
+
+def prepare(options):
+    import django
+    from django.core.management import call_command
+
+    django.setup()
+    from .datasets import generate
+
+    call_command('migrate', verbosity=0)
+    generate(titles=options.titles, reviews_per_title=20)
+
+
+def start_server(mode, options):
+    command = [sys.executable, '-m', 'gunicorn.app.wsgiapp', *MODES[mode],
+               '--bind', f'127.0.0.1:{options.port}',
+               '--workers', str(options.workers),
+               '--log-level', 'warning']
+    server = subprocess.Popen(command, cwd=ROOT_DIR)
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline and server.poll() is None:
+        try:
+            asyncio.run(fetch(options.port, '/api/v1/titles/'))
+            return server
+        except OSError:
+            time.sleep(0.2)
+    server.terminate()
+    raise RuntimeError(f'{mode} server did not start')
+
+
+async def fetch(port, path):
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    writer.write(f'GET {path} HTTP/1.1\r\nHost: localhost\r\n'
+                 f'Connection: close\r\n\r\n'.encode())
+    await writer.drain()
+    response = await reader.read()
+    writer.close()
+    return int(response.split(b' ', 2)[1])
+
+
+async def slow_client(port, path, delay, stop):
+    """
+    Send the request one byte at a time and read the response slowly.
+    """
+    while not stop.is_set():
+        try:
+            reader, writer = await asyncio.open_connection('127.0.0.1', port)
+            request = (f'GET {path} HTTP/1.1\r\nHost: localhost\r\n'
+                       f'Connection: close\r\n\r\n').encode()
+            for byte in request:
+                writer.write(bytes([byte]))
+                await writer.drain()
+                await asyncio.sleep(delay)
+            while await reader.read(1024):
+                await asyncio.sleep(delay)
+            writer.close()
+        except OSError:
+            await asyncio.sleep(delay)
+
+
+async def fast_client(port, path, stop, timings, errors):
+    while not stop.is_set():
+        started = time.perf_counter()
+        try:
+            status = await fetch(port, path)
+        except OSError:
+            errors.append('connection')
+            continue
+        if status != 200:
+            errors.append(status)
+        timings.append(time.perf_counter() - started)
+
+
+async def load(options):
+    stop = asyncio.Event()
+    timings, errors = [], []
+    tasks = [
+        asyncio.ensure_future(slow_client(options.port, options.path,
+                                          options.slow_delay, stop))
+        for _ in range(options.slow_clients)
+    ]
+    tasks += [
+        asyncio.ensure_future(fast_client(options.port, options.path, stop,
+                                          timings, errors))
+        for _ in range(options.concurrency)
+    ]
+    await asyncio.sleep(options.duration)
+    stop.set()
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    return timings, errors
+
+
+def measure(mode, options):
+    server = start_server(mode, options)
+    try:
+        timings, errors = asyncio.run(load(options))
+    finally:
+        server.terminate()
+        server.wait()
+    if not timings:
+        return {'requests': 0, 'errors': len(errors)}
+    return {
+        'requests': len(timings),
+        'errors': len(errors),
+        'throughput_rps': len(timings) / options.duration,
+        'latency_ms': {
+            'mean': statistics.mean(timings) * 1000,
+            'p50': percentile(timings, 0.5) * 1000,
+            'p95': percentile(timings, 0.95) * 1000,
+            'p99': percentile(timings, 0.99) * 1000,
+        },
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--prepare', action='store_true')
+    parser.add_argument('--titles', type=int, default=200)
+    parser.add_argument('--modes', nargs='*', default=list(MODES))
+    parser.add_argument('--path', default='/api/v1/titles/')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--workers', type=int, default=2)
+    parser.add_argument('--concurrency', type=int, default=50)
+    parser.add_argument('--slow-clients', type=int, default=50)
+    parser.add_argument('--slow-delay', type=float, default=0.05,
+                        help='Seconds between bytes sent by slow clients.')
+    parser.add_argument('--duration', type=float, default=10)
+    parser.add_argument('--output', help='Write JSON results to this file.')
+    options = parser.parse_args(argv)
+
+    sys.path.insert(0, ROOT_DIR)
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'tests.settings_qa')
+    if options.prepare:
+        prepare(options)
+
+    results = {}
+    for mode in options.modes:
+        results[mode] = measure(mode, options)
+        print(f'{mode}: {json.dumps(results[mode])}', file=sys.stderr)
+    report = {
+        'meta': {
+            'revision': git_revision(),
+            'parameters': {
+                name: getattr(options, name)
+                for name in ('path', 'workers', 'concurrency',
+                             'slow_clients', 'slow_delay', 'duration')
+            },
+        },
+        'results': results,
+    }
+    content = json.dumps(report, indent=2)
+    if options.output:
+        with open(options.output, 'w') as output:
+            output.write(content)
+    else:
+        print(content)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,45 @@
+import pytest
+
+
+@pytest.fixture
+def category():
+    from api.models import Category
+
+    return Category.objects.create(name='Фильм', slug='movie')
+
+
+@pytest.fixture
+def genres():
+    from api.models import Genre
+
+    return [
+        Genre.objects.create(name='Драма', slug='drama'),
+        Genre.objects.create(name='Комедия', slug='comedy'),
+    ]
+
+
+@pytest.fixture
+def title(category, genres):
+    from api.models import Title
+
+    title = Title.objects.create(name='Побег из Шоушенка',
+                                 year=1994,
+                                 category=category)
+    title.genre.set(genres)
+    return title
+
+
+@pytest.fixture
+def review(title, user):
+    from api.models import Review
+
+    return Review.objects.create(title=title, author=user,
+                                 text='Отличный фильм', score=9)
+
+
+@pytest.fixture
+def comment(review, another_user):
+    from api.models import Comment
+
+    return Comment.objects.create(review=review, author=another_user,
+                                  text='Согласен')
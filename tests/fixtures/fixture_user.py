@@ -0,0 +1,41 @@
+import pytest
+
+
+@pytest.fixture
+def user(django_user_model):
+    return django_user_model.objects.create_user(username='TestUser',
+                                                 email='testuser@yamdb.fake',
+                                                 password='1234567')
+
+
+@pytest.fixture
+def another_user(django_user_model):
+    return django_user_model.objects.create_user(username='TestUser2',
+                                                 email='testuser2@yamdb.fake',
+                                                 password='1234567')
+
+
+@pytest.fixture
+def admin(django_user_model):
+    return django_user_model.objects.create_user(username='TestAdmin',
+                                                 email='testadmin@yamdb.fake',
+                                                 password='1234567',
+                                                 role='admin')
+
+
+@pytest.fixture
+def user_client(user):
+    from rest_framework.test import APIClient
+
+    client = APIClient()
+    client.force_authenticate(user=user)
+    return client
+
+
+@pytest.fixture
+def admin_client(admin):
+    from rest_framework.test import APIClient
+
+    client = APIClient()
+    client.force_authenticate(user=admin)
+    return client
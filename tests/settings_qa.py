@@ -6,3 +6,22 @@ DATABASES = {
         'NAME': os.path.join(BASE_DIR, 'db.sqlite3'),
     }
 }
+DATABASES['default']['TEST'] = {
+    'NAME': os.path.join(BASE_DIR, 'test_db.sqlite3'),
+}
+# Replica alias for routing tests, enabled through DATABASE_REPLICAS.
+DATABASES['replica'] = {
+    'ENGINE': 'django.db.backends.sqlite3',
+    'NAME': os.path.join(BASE_DIR, 'db_replica.sqlite3'),
+    'TEST': {'MIRROR': 'default'},
+}
+DATABASE_REPLICAS = []
+
+EMAIL_OUTBOX_WORKER = 'command'
+
+# Rate limits are turned on by the tests of throttling only.
+REST_FRAMEWORK = {
+    **REST_FRAMEWORK,
+    'DEFAULT_THROTTLE_RATES': dict.fromkeys(
+        REST_FRAMEWORK['DEFAULT_THROTTLE_RATES']),
+}
@@ -0,0 +1,78 @@
+import json
+import threading
+
+import pytest
+from asgiref.sync import async_to_sync
+from asgiref.testing import ApplicationCommunicator
+from django.core import signals
+from django.test import RequestFactory
+
+from api_yamdb.asgi_handler import PooledASGIHandler
+
+
+@async_to_sync
+async def call(application, method, path, headers=()):
+    communicator = ApplicationCommunicator(application, {
+        'type': 'http',
+        'method': method,
+        'path': path,
+        'query_string': b'',
+        'headers': [(b'host', b'testserver'), *headers],
+    })
+    await communicator.send_input({'type': 'http.request'})
+    start = await communicator.receive_output(10)
+    body = b''
+    while True:
+        message = await communicator.receive_output(10)
+        body += message.get('body', b'')
+        if not message.get('more_body'):
+            break
+    return start['status'], body
+
+
+@pytest.mark.django_db(transaction=True)
+class TestPooledASGIHandler:
+    def test_routes_to_executors(self, title):
+        handler = PooledASGIHandler()
+        factory = RequestFactory()
+        assert handler.get_executor(
+            factory.get('/api/v1/titles/')) is handler.read_executor, \
+            'Проверьте, что список произведений обслуживает пул чтения'
+        assert handler.get_executor(
+            factory.get(f'/api/v1/titles/{title.pk}/reviews/')
+        ) is handler.read_executor
+        assert handler.get_executor(
+            factory.post('/api/v1/titles/')) is handler.write_executor, \
+            'Проверьте, что запись обслуживает отдельный пул'
+        assert handler.get_executor(
+            factory.get('/api/v1/users/me/')) is handler.write_executor
+        assert handler.get_executor(
+            factory.get('/unknown/')) is handler.write_executor
+
+    def test_serves_requests(self, title):
+        handler = PooledASGIHandler()
+        status, body = call(handler, 'GET', '/api/v1/titles/')
+        assert status == 200
+        assert json.loads(body)['results'][0]['name'] == title.name
+        status, _ = call(handler, 'POST', '/api/v1/titles/')
+        assert status == 401, \
+            'Проверьте, что запросы на запись обрабатываются в ASGI режиме'
+
+    def test_request_signals_run_in_worker_thread(self, title):
+        threads = []
+
+        def record(**kwargs):
+            threads.append(threading.current_thread().name)
+
+        signals.request_started.connect(record)
+        signals.request_finished.connect(record)
+        try:
+            status, _ = call(PooledASGIHandler(), 'GET', '/api/v1/titles/')
+        finally:
+            signals.request_started.disconnect(record)
+            signals.request_finished.disconnect(record)
+        assert status == 200
+        assert len(threads) == 2 and all(
+            name.startswith('asgi-read') for name in threads), \
+            'Проверьте, что сигналы запроса отправляются из потока, ' \
+            'выполнившего view'
@@ -0,0 +1,22 @@
+import random
+
+import pytest
+
+from api.models import Review, Title
+from benchmarks.datasets import generate, zipf_counts
+
+
+class TestBenchmarkDatasets:
+    def test_zipf_counts(self):
+        counts = zipf_counts(1000, 10, 1.1, random.Random(0))
+        assert sum(counts) == 1000
+        assert max(counts) > 5 * min(counts), \
+            'Проверьте, что популярность произведений распределена по Ципфу'
+
+    @pytest.mark.django_db
+    def test_generate(self):
+        ids = generate(titles=10, reviews_per_title=5, comments_per_review=1)
+        assert Title.objects.count() == 10
+        assert Review.objects.count() == 50
+        title = Title.objects.get(pk=ids['title_id'])
+        assert title.rating_count == title.reviews.count() > 5
@@ -0,0 +1,134 @@
+import json
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+
+@pytest.mark.django_db
+class TestBulkWrite:
+    @pytest.fixture
+    def superuser_client(self, django_user_model):
+        from rest_framework.test import APIClient
+
+        superuser = django_user_model.objects.create_superuser(
+            username='root', email='root@yamdb.fake', password='1234567')
+        client = APIClient()
+        client.force_authenticate(user=superuser)
+        return client
+
+    def test_bulk_create_titles(self, admin_client, category, genres):
+        from api.models import Title, TitleRanking
+
+        items = [
+            {'name': 'Первое', 'year': 2000, 'genre': ['drama', 'comedy'],
+             'category': 'movie'},
+            {'name': 'Второе', 'genre': ['drama']},
+            {'name': 'Третье', 'genre': ['unknown'], 'category': 'movie'},
+            {'year': 'не год', 'genre': []},
+        ]
+        with CaptureQueriesContext(connection) as queries:
+            response = admin_client.post('/api/v1/titles/bulk/', items,
+                                         format='json')
+        assert response.status_code == 207, \
+            'Проверьте, что при частичных ошибках возвращается статус 207'
+        results = response.data['results']
+        assert [result['status'] for result in results] == [
+            'created', 'created', 'error', 'error']
+        assert results[2]['errors'] == {
+            'genre': ['Object with slug=unknown does not exist.']}, \
+            'Проверьте, что ошибки сообщаются для каждого объекта'
+        assert set(results[3]['errors']) == {'name', 'year'}
+        assert results[0]['data']['category'] == {'name': 'Фильм',
+                                                  'slug': 'movie'}
+        assert [genre['slug'] for genre in results[0]['data']['genre']] == [
+            'drama', 'comedy']
+
+        title = Title.objects.get(name='Первое')
+        assert set(title.genre.values_list('slug', flat=True)) == {
+            'drama', 'comedy'}
+        assert TitleRanking.objects.filter(title=title).exists()
+        genre_lookups = [query for query in queries.captured_queries
+                         if '"api_genre"."slug" IN' in query['sql']]
+        assert len(genre_lookups) == 1, \
+            'Проверьте, что жанры всех объектов ищутся одним запросом'
+        links = [query for query in queries.captured_queries
+                 if query['sql'].startswith('INSERT INTO "api_title_genre"')]
+        assert len(links) == 1, \
+            'Проверьте, что связи с жанрами вставляются одним запросом'
+
+    def test_bulk_update_titles(self, admin_client, title):
+        response = admin_client.patch('/api/v1/titles/bulk/', [
+            {'id': title.pk, 'name': 'Новое имя', 'genre': ['comedy']},
+            {'id': 0, 'name': 'Нет такого'},
+            {'name': 'Без id'},
+        ], format='json')
+        assert response.status_code == 207
+        results = response.data['results']
+        assert results[0]['data']['name'] == 'Новое имя'
+        assert [genre['slug'] for genre in results[0]['data']['genre']] == [
+            'comedy']
+        assert results[1]['errors'] == {'id': ['Объект не найден.']}
+        assert 'id' in results[2]['errors']
+        title.refresh_from_db()
+        assert title.name == 'Новое имя'
+        assert title.category.slug == 'movie', \
+            'Проверьте, что обновляются только переданные поля'
+
+    def test_bulk_update_rejects_repeated_ids(self, admin_client, title):
+        response = admin_client.patch('/api/v1/titles/bulk/', [
+            {'id': title.pk, 'genre': ['comedy']},
+            {'id': title.pk, 'genre': ['drama']},
+        ], format='json')
+        assert response.status_code == 207
+        results = response.data['results']
+        assert results[0]['status'] == 'updated'
+        assert results[1]['errors'] == {
+            'id': ['Объект уже указан в этом пакете.']}, \
+            'Проверьте, что повтор id в пакете отклоняется'
+        assert list(title.genre.values_list('slug', flat=True)) == \
+            ['comedy']
+
+    def test_bulk_genres_ndjson(self, superuser_client, genres):
+        from api.models import Genre
+
+        body = '\n'.join(json.dumps(item) for item in [
+            {'name': 'Ужасы', 'slug': 'horror'},
+            {'name': 'Драма', 'slug': 'drama'},
+            {'name': 'Ужасы', 'slug': 'horror'},
+        ])
+        with CaptureQueriesContext(connection) as queries:
+            response = superuser_client.post(
+                '/api/v1/genres/bulk/', body,
+                content_type='application/x-ndjson')
+        assert response.status_code == 207
+        assert [result['status'] for result in response.data['results']] == [
+            'created', 'error', 'error'], \
+            'Проверьте проверку уникальности slug в запросе и в базе'
+        assert Genre.objects.filter(slug='horror').count() == 1
+        inserts = [query for query in queries.captured_queries
+                   if query['sql'].startswith('INSERT INTO "api_genre"')]
+        assert len(inserts) == 1
+
+        response = superuser_client.patch(
+            '/api/v1/genres/bulk/', [{'slug': 'horror', 'name': 'Хоррор'}],
+            format='json')
+        assert response.status_code == 200
+        assert Genre.objects.get(slug='horror').name == 'Хоррор'
+
+    def test_bulk_requires_admin(self, user_client, client):
+        assert user_client.post('/api/v1/titles/bulk/', [],
+                                format='json').status_code == 403
+        assert client.post('/api/v1/genres/bulk/', [],
+                           content_type='application/json').status_code \
+            == 401
+
+    def test_bulk_rejects_bad_payload(self, admin_client):
+        response = admin_client.post('/api/v1/titles/bulk/',
+                                     {'name': 'Одно'}, format='json')
+        assert response.status_code == 400
+        response = admin_client.post(
+            '/api/v1/titles/bulk/', '{"name": 1}\n{oops',
+            content_type='application/x-ndjson')
+        assert response.status_code == 400
+        assert 'line 2' in response.data['detail']
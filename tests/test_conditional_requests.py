@@ -0,0 +1,65 @@
+import pytest
+
+from api.models import Comment, Review
+
+
+@pytest.mark.django_db
+class TestConditionalRequests:
+    def url(self, review):
+        return f'/api/v1/titles/{review.title_id}/reviews/{review.pk}/'
+
+    def test_review_etag(self, client, review,
+                         django_assert_max_num_queries):
+        response = client.get(self.url(review))
+        assert response.status_code == 200
+        etag = response['ETag']
+        assert etag.startswith('"'), 'Проверьте, что ETag сильный'
+        assert 'updated_at' not in response.json()
+        with django_assert_max_num_queries(1):
+            response = client.get(self.url(review),
+                                  HTTP_IF_NONE_MATCH=f'W/{etag}')
+        assert response.status_code == 304, \
+            'Проверьте, что If-None-Match возвращает 304'
+        assert response['ETag'] == etag
+        Review.objects.get(pk=review.pk).save()
+        response = client.get(self.url(review), HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200, \
+            'Проверьте, что ETag меняется при изменении отзыва'
+
+    def test_if_match_on_patch_and_delete(self, user_client, review):
+        etag = user_client.get(self.url(review))['ETag']
+        response = user_client.patch(self.url(review), {'text': 'Новый'},
+                                     HTTP_IF_MATCH=etag)
+        assert response.status_code == 200
+        new_etag = response['ETag']
+        assert new_etag != etag
+        response = user_client.patch(self.url(review), {'text': 'Старый'},
+                                     HTTP_IF_MATCH=etag)
+        assert response.status_code == 412, \
+            'Проверьте, что PATCH с устаревшим If-Match отклоняется'
+        assert Review.objects.get(pk=review.pk).text == 'Новый'
+        response = user_client.delete(self.url(review), HTTP_IF_MATCH=etag)
+        assert response.status_code == 412
+        response = user_client.delete(self.url(review),
+                                      HTTP_IF_MATCH=new_etag)
+        assert response.status_code == 204, \
+            'Проверьте, что DELETE с актуальным If-Match проходит'
+
+    def test_comment_list_etag(self, client, review, comment):
+        url = f'{self.url(review)}comments/'
+        for params in ({}, {'pagination': 'cursor'}):
+            response = client.get(url, params)
+            etag = response['ETag']
+            response = client.get(url, params, HTTP_IF_NONE_MATCH=etag)
+            assert response.status_code == 304, \
+                'Проверьте, что список комментариев поддерживает ETag'
+            Comment.objects.get(pk=comment.pk).save()
+            response = client.get(url, params, HTTP_IF_NONE_MATCH=etag)
+            assert response.status_code == 200, \
+                'Проверьте, что ETag страницы зависит от версий строк'
+            assert response['ETag'] != etag
+        etag = response['ETag']
+        Comment.objects.create(review=review, author=review.author,
+                               text='Ещё')
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200
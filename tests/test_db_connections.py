@@ -0,0 +1,132 @@
+import threading
+
+import pytest
+from django.db.backends.sqlite3 import base as sqlite3
+from django.db.utils import ConnectionHandler, load_backend
+from prometheus_client import REGISTRY
+
+from api_yamdb import settings as project_settings
+from api_yamdb.db.base import ConnectionManagementMixin
+from api_yamdb.db.pool import ConnectionPool, PoolTimeout, get_pool
+
+
+class DatabaseWrapper(ConnectionManagementMixin, sqlite3.DatabaseWrapper):
+    pass
+
+
+def make_wrapper(alias, path, **settings):
+    handler = ConnectionHandler({'default': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': str(path / 'db.sqlite3'),
+        **settings,
+    }})
+    handler.ensure_defaults('default')
+    return DatabaseWrapper(handler.databases['default'], alias)
+
+
+def acquired(alias):
+    return REGISTRY.get_sample_value(
+        'yamdb_db_connection_acquire_seconds_count', {'alias': alias}) or 0
+
+
+class Connection:
+    def __init__(self):
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+class TestConnectionPool:
+    def test_limits_connections(self):
+        pool = ConnectionPool(max_size=1, timeout=0.01)
+        connection = pool.acquire(Connection)
+        with pytest.raises(PoolTimeout):
+            pool.acquire(Connection)
+        pool.release(connection)
+        assert pool.acquire(Connection) is connection, \
+            'Проверьте, что соединения из пула используются повторно'
+
+    def test_discards_broken_connections(self):
+        pool = ConnectionPool(max_size=1, timeout=0.01)
+        connection = pool.acquire(Connection)
+        pool.release(connection)
+        fresh = pool.acquire(Connection, validate=lambda connection: False)
+        assert fresh is not connection
+        assert connection.closed, \
+            'Проверьте, что неработающие соединения закрываются'
+
+        def fail(connection):
+            raise RuntimeError
+        pool.release(fresh, reset=fail)
+        assert fresh.closed and pool.size == 0
+
+    def test_validates_outside_lock(self):
+        pool = ConnectionPool(max_size=2, timeout=0.01)
+        connection = pool.acquire(Connection)
+        pool.release(connection)
+        locked = []
+
+        def try_lock():
+            if pool.condition.acquire(timeout=1):
+                locked.append(True)
+                pool.condition.release()
+
+        def validate(connection):
+            thread = threading.Thread(target=try_lock)
+            thread.start()
+            thread.join()
+            return True
+
+        assert pool.acquire(Connection, validate=validate) is connection
+        assert locked == [True], \
+            'Проверьте, что проверка соединения не держит блокировку пула'
+
+
+class TestConnectionManagement:
+    @pytest.fixture(autouse=True)
+    def unblock_db(self, django_db_blocker):
+        with django_db_blocker.unblock():
+            yield
+
+    def test_default_database_is_postgresql(self):
+        backend = load_backend(
+            project_settings.DATABASES['default']['ENGINE'])
+        assert backend.DatabaseWrapper.vendor == 'postgresql', \
+            'Проверьте, что используете базу данных PostgreSql'
+        assert issubclass(backend.DatabaseWrapper,
+                          ConnectionManagementMixin), \
+            'Проверьте, что соединения с базой проверяются и берутся из пула'
+
+    def test_pooled_connections(self, tmp_path):
+        options = {'pool': {'max_size': 1, 'timeout': 0.01}}
+        first = make_wrapper('pooled', tmp_path, OPTIONS=options)
+        second = make_wrapper('pooled', tmp_path, OPTIONS=options)
+        before = acquired('pooled')
+        first.ensure_connection()
+        raw = first.connection
+        with pytest.raises(PoolTimeout):
+            second.ensure_connection()
+        first.close()
+        second.ensure_connection()
+        assert second.connection is raw, \
+            'Проверьте, что закрытое соединение возвращается в пул'
+        assert acquired('pooled') - before == 2, \
+            'Проверьте, что время получения соединения попадает в метрику'
+        second.close()
+        get_pool('pooled', options['pool']).close()
+
+    @pytest.mark.parametrize('health_checks', [True, False])
+    def test_health_checks(self, tmp_path, health_checks):
+        wrapper = make_wrapper('checked', tmp_path, CONN_MAX_AGE=60,
+                               CONN_HEALTH_CHECKS=health_checks)
+        wrapper.ensure_connection()
+        raw = wrapper.connection
+        wrapper.is_usable = lambda: False
+        wrapper.close_if_unusable_or_obsolete()
+        assert wrapper.connection is raw, \
+            'Проверьте, что постоянное соединение не закрывается без запросов'
+        wrapper.cursor().close()
+        assert (wrapper.connection is not raw) == health_checks, \
+            'Проверьте, что разорванное соединение заменяется перед запросом'
+        wrapper.close()
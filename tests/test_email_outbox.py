@@ -0,0 +1,134 @@
+import io
+from datetime import timedelta
+
+import pytest
+from django.core import mail
+from django.core.mail.backends.locmem import EmailBackend
+from django.core.management import call_command
+from django.db import connection
+from django.utils import timezone
+
+from users import outbox
+from users.management.commands import send_emails
+from users.models import EmailOutbox
+
+
+class FailingBackend(EmailBackend):
+    def send_messages(self, messages):
+        raise ConnectionError('SMTP is down')
+
+
+class ClosedBackend(EmailBackend):
+    def open(self):
+        raise ConnectionError('SMTP refused the connection')
+
+
+class StopLoop(BaseException):
+    pass
+
+
+@pytest.mark.django_db
+class TestEmailOutbox:
+    def test_signup_queues_email(self, client):
+        response = client.post('/api/v1/auth/email/', {
+            'email': 'new@yamdb.fake',
+            'username': 'newbie',
+        })
+        assert response.status_code == 200
+        assert len(mail.outbox) == 0, \
+            'Проверьте, что письмо не отправляется внутри запроса'
+        message = EmailOutbox.objects.get()
+        assert message.recipient == 'new@yamdb.fake'
+        assert 'confirmation_code' in message.body
+
+        assert outbox.send_pending() == 1
+        assert len(mail.outbox) == 1
+        assert mail.outbox[0].to == ['new@yamdb.fake']
+        assert EmailOutbox.objects.get().sent_at is not None
+        assert outbox.send_pending() == 0
+
+    def test_batches_share_connection(self, monkeypatch):
+        for i in range(5):
+            outbox.enqueue('subject', 'body', 'from@yamdb.fake',
+                           f'to{i}@yamdb.fake')
+        opened = []
+        get_connection = mail.get_connection
+
+        def counting_get_connection(*args, **kwargs):
+            opened.append(1)
+            return get_connection(*args, **kwargs)
+
+        monkeypatch.setattr(mail, 'get_connection', counting_get_connection)
+        assert outbox.send_pending(batch_size=3) == 3
+        assert outbox.send_pending(batch_size=3) == 2
+        assert len(opened) == 2, \
+            'Проверьте, что пачка писем отправляется через одно соединение'
+
+    def test_failed_email_is_retried_with_backoff(self, settings):
+        message = outbox.enqueue('subject', 'body', 'from@yamdb.fake',
+                                 'to@yamdb.fake')
+        settings.EMAIL_BACKEND = 'tests.test_email_outbox.FailingBackend'
+        assert outbox.send_pending() == 0
+        message.refresh_from_db()
+        assert message.attempts == 1
+        assert message.sent_at is None
+        assert 'SMTP is down' in message.last_error
+        assert message.next_attempt_at > timezone.now(), \
+            'Проверьте, что повторная отправка откладывается'
+
+        settings.EMAIL_BACKEND = 'django.core.mail.backends.locmem.' \
+                                 'EmailBackend'
+        assert outbox.send_pending() == 0
+        EmailOutbox.objects.update(next_attempt_at=timezone.now()
+                                   - timedelta(seconds=1))
+        assert outbox.send_pending() == 1
+        assert len(mail.outbox) == 1
+
+    def test_emails_are_sent_outside_transaction(self, monkeypatch):
+        message = outbox.enqueue('subject', 'body', 'from@yamdb.fake',
+                                 'to@yamdb.fake')
+        depth = len(connection.savepoint_ids)
+        seen = []
+
+        def send_messages(backend, messages):
+            seen.append(len(connection.savepoint_ids))
+            claimed = EmailOutbox.objects.get(pk=message.pk)
+            assert claimed.attempts == 1
+            assert claimed.next_attempt_at > timezone.now(), \
+                'Проверьте, что письмо помечается как отправляемое'
+            assert outbox.claim(10) == []
+            return len(messages)
+
+        monkeypatch.setattr(EmailBackend, 'send_messages', send_messages)
+        assert outbox.send_pending() == 1
+        assert seen == [depth], \
+            'Проверьте, что письма отправляются вне транзакции'
+        assert EmailOutbox.objects.get().sent_at is not None
+
+    def test_backend_connection_failure(self, settings):
+        outbox.enqueue('subject', 'body', 'from@yamdb.fake', 'to@yamdb.fake')
+        settings.EMAIL_BACKEND = 'tests.test_email_outbox.ClosedBackend'
+        assert outbox.send_pending() == 0
+        message = EmailOutbox.objects.get()
+        assert 'refused' in message.last_error, \
+            'Проверьте, что ошибка соединения откладывает письмо'
+        assert message.attempts == 1
+
+    def test_loop_survives_errors(self, monkeypatch):
+        results = [ConnectionError('SMTP is down'),
+                   ConnectionError('SMTP is down'), 1, StopLoop()]
+        sleeps = []
+
+        def fake_send_pending(batch_size):
+            result = results.pop(0)
+            if isinstance(result, BaseException):
+                raise result
+            return result
+
+        monkeypatch.setattr(send_emails, 'send_pending', fake_send_pending)
+        monkeypatch.setattr(send_emails.time, 'sleep', sleeps.append)
+        with pytest.raises(StopLoop):
+            call_command('send_emails', '--loop', '--interval', '1',
+                         stdout=io.StringIO())
+        assert sleeps == [2, 4], \
+            'Проверьте, что send_emails --loop переживает ошибки с паузой'
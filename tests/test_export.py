@@ -0,0 +1,108 @@
+import csv
+import io
+import json
+import os
+
+import pytest
+from django.conf import settings
+from django.core.management import call_command
+
+from tests.test_asgi import call
+from users.tokens import UserClaimsAccessToken
+
+
+def read(response):
+    return b''.join(response.streaming_content).decode()
+
+
+@pytest.mark.django_db
+class TestExport:
+    def test_reviews_csv_matches_data_files(self, admin_client):
+        call_command('import_csv', stdout=io.StringIO())
+        response = admin_client.get('/api/v1/export/reviews/',
+                                    {'output': 'csv'})
+        assert response.status_code == 200
+        assert response.streaming, \
+            'Проверьте, что выгрузка отдается потоком'
+        assert response['Content-Type'].startswith('text/csv')
+        exported = list(csv.DictReader(io.StringIO(read(response))))
+        with open(os.path.join(settings.BASE_DIR, 'data', 'review.csv'),
+                  encoding='utf-8') as data:
+            rows = {row['id']: row for row in csv.DictReader(data)}
+        assert len(exported) == 73
+        for row in exported:
+            assert row == rows[row['id']], \
+                'Проверьте, что формат выгрузки совпадает с data/review.csv'
+
+    def test_comments_ndjson_filters(self, admin_client, comment, review,
+                                     another_user):
+        from api.models import Comment
+
+        Comment.objects.create(review=review, author=review.author,
+                               text='Спасибо')
+        response = admin_client.get('/api/v1/export/comments/', {
+            'title': review.title_id,
+            'author': another_user.username,
+            'since': '2000-01-01',
+        })
+        assert response.status_code == 200
+        lines = read(response).splitlines()
+        assert [json.loads(line) for line in lines] == [{
+            'id': comment.pk,
+            'review_id': review.pk,
+            'text': 'Согласен',
+            'author': another_user.pk,
+            'pub_date': comment.pub_date.isoformat(
+                timespec='milliseconds').replace('+00:00', 'Z'),
+        }], 'Проверьте фильтры выгрузки по произведению и автору'
+        response = admin_client.get('/api/v1/export/comments/',
+                                    {'until': '2000-01-01'})
+        assert read(response) == ''
+
+    def test_streams_in_chunks(self, admin_client, review, comment,
+                               settings):
+        from api.models import Comment
+
+        for number in range(4):
+            Comment.objects.create(review=review, author=review.author,
+                                   text=f'Комментарий {number}')
+        settings.EXPORT_CHUNK_SIZE = 2
+        response = admin_client.get('/api/v1/export/comments/')
+        chunks = list(response.streaming_content)
+        assert len(chunks) == 3, \
+            'Проверьте, что строки выгружаются порциями EXPORT_CHUNK_SIZE'
+
+    def test_permissions_and_validation(self, client, user_client,
+                                        admin_client):
+        assert client.get('/api/v1/export/reviews/').status_code == 401
+        assert user_client.get('/api/v1/export/reviews/').status_code == 403
+        for params in ({'output': 'xml'}, {'title': 'abc'},
+                       {'since': '2020-13-01'}):
+            response = admin_client.get('/api/v1/export/reviews/', params)
+            assert response.status_code == 400, \
+                'Проверьте проверку параметров выгрузки'
+
+    def test_export_command(self, review, tmp_path):
+        path = tmp_path / 'reviews.csv'
+        call_command('export', 'reviews', '--format', 'csv',
+                     '--output', str(path))
+        rows = list(csv.reader(path.open(encoding='utf-8')))
+        assert rows[0] == ['id', 'title_id', 'text', 'author', 'score',
+                           'pub_date']
+        assert rows[1][:5] == [str(review.pk), str(review.title_id),
+                               review.text, str(review.author_id),
+                               str(review.score)]
+
+
+@pytest.mark.django_db(transaction=True)
+def test_asgi_streams_export(admin, review):
+    from api_yamdb.asgi_handler import PooledASGIHandler
+
+    token = UserClaimsAccessToken.for_user(admin)
+    status, body = call(PooledASGIHandler(), 'GET',
+                        '/api/v1/export/reviews/',
+                        headers=[(b'authorization',
+                                  f'Bearer {token}'.encode())])
+    assert status == 200
+    assert json.loads(body)['text'] == review.text, \
+        'Проверьте, что выгрузка потоком работает в режиме ASGI'
@@ -0,0 +1,45 @@
+import pytest
+
+from api.models import Review
+from api.pagination import PubDateCursorPagination
+
+
+@pytest.fixture
+def reviews(title, django_user_model):
+    authors = [
+        django_user_model.objects.create_user(username=f'author{i}',
+                                              email=f'author{i}@yamdb.fake')
+        for i in range(5)
+    ]
+    return [
+        Review.objects.create(title=title, author=author,
+                              text=f'text {i}', score=5)
+        for i, author in enumerate(authors)
+    ]
+
+
+@pytest.mark.django_db
+class TestFeedPagination:
+    def test_page_number_mode_is_default(self, client, title, reviews):
+        response = client.get(f'/api/v1/titles/{title.pk}/reviews/')
+        assert response.status_code == 200
+        data = response.json()
+        assert data['count'] == len(reviews), \
+            'Проверьте, что постраничная пагинация осталась по умолчанию'
+
+    def test_cursor_mode_walks_feed(self, client, title, reviews,
+                                    monkeypatch):
+        monkeypatch.setattr(PubDateCursorPagination, 'page_size', 2)
+        url = f'/api/v1/titles/{title.pk}/reviews/?pagination=cursor'
+        seen = []
+        while url:
+            response = client.get(url)
+            assert response.status_code == 200
+            data = response.json()
+            assert 'count' not in data, \
+                'Проверьте, что в режиме курсора не считается COUNT(*)'
+            seen.extend(review['id'] for review in data['results'])
+            url = data['next']
+        expected = sorted(reviews, key=lambda r: (r.pub_date, r.pk),
+                          reverse=True)
+        assert seen == [review.pk for review in expected]
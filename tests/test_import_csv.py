@@ -0,0 +1,52 @@
+import csv
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+from api.management.commands import import_csv
+from api.models import Comment, Genre, Review, Title
+from users.models import User
+
+
+@pytest.mark.django_db
+class TestImportCsv:
+    def test_import_csv(self):
+        out = StringIO()
+        call_command('import_csv', '--batch-size', '10', stdout=out)
+
+        assert User.objects.count() == 5
+        assert Genre.objects.count() == 15
+        assert Title.objects.count() == 32
+        assert Title.genre.through.objects.count() == 42
+        assert Review.objects.count() == 73, \
+            'Проверьте, что повторные отзывы автора пропускаются'
+        assert Comment.objects.count() == 5
+        assert 'rows/s' in out.getvalue(), \
+            'Проверьте, что import_csv сообщает скорость загрузки'
+
+        review = Review.objects.get(pk=1)
+        assert (review.title_id, review.author_id, review.score) == \
+            (1, 100, 10)
+        assert review.pub_date.year == 2019, \
+            'Проверьте, что import_csv сохраняет pub_date из файла'
+        assert User.objects.get(pk=101).role == 'admin'
+
+        title = Title.objects.get(pk=1)
+        assert title.rating_count == title.reviews.count(), \
+            'Проверьте, что после импорта пересчитываются рейтинги'
+
+    def test_copy_buffer_keeps_nulls_unquoted(self):
+        title = Title(pk=7, name='Без "категории"', description='',
+                      year=None, category_id=None, rating=None)
+        buffer = import_csv.Command().copy_buffer(Title, [title]).getvalue()
+        names = [field.attname for field in Title._meta.concrete_fields]
+        row = dict(zip(names, buffer.rstrip('\n').split(',')))
+        for name in ('year', 'category_id', 'rating', 'search_vector'):
+            assert row[name] == '', \
+                'Проверьте, что NULL пишется для COPY пустым полем без кавычек'
+        assert row['description'] == '""', \
+            'Проверьте, что пустая строка не загружается как NULL'
+        assert row['name'] == '"Без ""категории"""'
+        assert next(csv.reader(StringIO(buffer)))[names.index('name')] == \
+            title.name
@@ -0,0 +1,70 @@
+import pytest
+from django.contrib.auth.tokens import default_token_generator
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from users.tokens import UserClaimsAccessToken
+
+
+def auth_header(user):
+    token = UserClaimsAccessToken.for_user(user)
+    return {'HTTP_AUTHORIZATION': f'Bearer {token}'}
+
+
+def user_queries(context):
+    return [query['sql'] for query in context.captured_queries
+            if 'FROM "users_user"' in query['sql']]
+
+
+@pytest.mark.django_db
+class TestStatelessJWTAuthentication:
+    def test_token_endpoint_issues_claims(self, client, user):
+        response = client.post('/api/v1/auth/token/', {
+            'email': user.email,
+            'confirmation_code': default_token_generator.make_token(user),
+        })
+        assert response.status_code == 200
+        token = UserClaimsAccessToken(response.json()['token'])
+        assert (token['username'], token['role']) == (user.username, 'user')
+
+    def test_authenticated_request_skips_user_query(self, client, admin,
+                                                    category):
+        headers = auth_header(admin)
+        with CaptureQueriesContext(connection) as context:
+            response = client.post('/api/v1/titles/',
+                                   {'name': 'Новое', 'year': 2020,
+                                    'category': category.slug},
+                                   **headers)
+        assert response.status_code == 201, response.content
+        assert user_queries(context) == [], \
+            'Проверьте, что пользователь не загружается из базы на запрос'
+
+    def test_role_change_is_applied_to_old_tokens(self, client, user,
+                                                  category):
+        headers = auth_header(user)
+        data = {'name': 'Новое', 'year': 2020, 'category': category.slug}
+        assert client.post('/api/v1/titles/', data,
+                           **headers).status_code == 403
+
+        user.role = 'admin'
+        user.save()
+        assert client.post('/api/v1/titles/', data,
+                           **headers).status_code == 201, \
+            'Проверьте, что смена роли учитывается для выданных токенов'
+
+    def test_cache_miss_falls_back_to_database(self, client, user):
+        headers = auth_header(user)
+        cache.clear()
+        with CaptureQueriesContext(connection) as context:
+            response = client.get('/api/v1/users/me/', **headers)
+        assert response.status_code == 200
+        assert response.json()['email'] == user.email
+        assert len(user_queries(context)) == 2
+
+    def test_deleted_user_is_rejected(self, client, user):
+        headers = auth_header(user)
+        user.delete()
+        response = client.get('/api/v1/users/me/', **headers)
+        assert response.status_code == 401, \
+            'Проверьте, что токен удалённого пользователя не принимается'
@@ -0,0 +1,97 @@
+import json
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.renderers import JSONRenderer
+
+from api import renderers
+from api.models import Comment, Review
+from api.renderers import FastJSONRenderer
+
+
+class StubOrjson:
+    """Compact UTF-8 output without escapes, like orjson.dumps()."""
+    OPT_PASSTHROUGH_DATETIME = 1
+
+    def __init__(self):
+        self.calls = 0
+
+    def dumps(self, data, default=None, option=0):
+        self.calls += 1
+        return json.dumps(data, default=default, ensure_ascii=False,
+                          separators=(',', ':')).encode()
+
+
+@pytest.fixture
+def feed(title, review, django_user_model):
+    authors = [
+        django_user_model.objects.create_user(username=f'reader{i}',
+                                              email=f'reader{i}@yamdb.fake')
+        for i in range(4)
+    ]
+    for i, author in enumerate(authors):
+        Review.objects.create(title=title, author=author,
+                              text=f'Отзыв {i} "цитата"', score=i + 1)
+        Comment.objects.create(review=review, author=author,
+                               text=f'Комментарий {i}')
+    return title, review
+
+
+@pytest.fixture(params=['orjson', 'stub'])
+def orjson(request, monkeypatch):
+    if request.param == 'orjson':
+        module = pytest.importorskip('orjson')
+    else:
+        module = StubOrjson()
+    monkeypatch.setattr(renderers, 'orjson', module)
+    return module
+
+
+@pytest.mark.django_db
+class TestLeanSerializers:
+    @pytest.mark.parametrize('params', [{}, {'pagination': 'cursor'}])
+    @pytest.mark.parametrize('resource', ['reviews', 'comments'])
+    def test_output_is_byte_identical(self, client, feed, settings,
+                                      resource, params):
+        title, review = feed
+        url = f'/api/v1/titles/{title.pk}/reviews/'
+        if resource == 'comments':
+            url = f'{url}{review.pk}/comments/'
+        settings.LEAN_LIST_SERIALIZERS = False
+        expected = client.get(url, params)
+        settings.LEAN_LIST_SERIALIZERS = True
+        response = client.get(url, params)
+        assert response.status_code == expected.status_code == 200
+        assert response.content == expected.content, \
+            'Проверьте, что быстрый путь отдает те же байты, что и сериализатор'
+        assert response['Content-Type'] == expected['Content-Type']
+
+    def test_rows_are_loaded_in_one_query(self, client, feed, settings):
+        title, _ = feed
+        settings.LEAN_LIST_SERIALIZERS = True
+        url = f'/api/v1/titles/{title.pk}/reviews/?pagination=cursor'
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get(url)
+        assert response.status_code == 200
+        assert len(response.json()['results']) == 5
+        selects = [q['sql'] for q in queries.captured_queries
+                   if 'api_review' in q['sql']]
+        assert len(selects) == 1, \
+            'Проверьте, что авторы и произведения берутся одним запросом'
+
+    def test_renderer_matches_json_renderer(self):
+        data = {'text': 'a b c "д"', 'items': [1, None, True]}
+        assert FastJSONRenderer().render(data) == \
+            super(FastJSONRenderer, FastJSONRenderer()).render(data)
+
+    def test_orjson_output_matches_json_renderer(self, orjson):
+        data = {'text': 'Отзыв\u2028строка\u2029 "д" ü', 'score': 7,
+                'items': [1, None, True]}
+        content = FastJSONRenderer().render(data)
+        assert content == JSONRenderer().render(data), \
+            'Проверьте, что orjson отдает те же байты, что и JSONRenderer'
+        assert b'\\u2028' in content and b'\\u2029' in content
+        if isinstance(orjson, StubOrjson):
+            assert orjson.calls == 1, \
+                'Проверьте, что при установленном orjson рендерит он'
@@ -0,0 +1,39 @@
+import pytest
+
+
+def get_sample(content, name, **labels):
+    prefix = name + '{' + ','.join(
+        f'{key}="{value}"' for key, value in sorted(labels.items())) + '}'
+    for line in content.splitlines():
+        if line.startswith(prefix + ' '):
+            return float(line.split(' ')[-1])
+    return 0.0
+
+
+@pytest.mark.django_db
+class TestMetrics:
+    def test_metrics_endpoint(self, client, title):
+        before = client.get('/metrics').content.decode()
+        client.get('/api/v1/titles/')
+        client.get('/api/v1/titles/')
+        client.get(f'/api/v1/titles/{title.pk}/reviews/', {'page': 1})
+        response = client.get('/metrics')
+        assert response.status_code == 200
+        content = response.content.decode()
+
+        labels = {'route': 'title-list', 'method': 'GET', 'status': '200'}
+        assert (get_sample(content, 'yamdb_http_requests_total', **labels)
+                - get_sample(before, 'yamdb_http_requests_total', **labels)
+                == 2), 'Проверьте, что запросы считаются по имени маршрута'
+        assert get_sample(content,
+                          'yamdb_http_request_duration_seconds_count',
+                          route='reviews-list', method='GET') > 0
+        assert get_sample(content, 'yamdb_db_queries_per_request_count',
+                          route='reviews-list') > 0
+        assert get_sample(content, 'yamdb_pagination_depth_count',
+                          route='reviews-list') > 0
+        for result in ('hit', 'miss'):
+            assert get_sample(content,
+                              'yamdb_response_cache_requests_total',
+                              resource='title', result=result) > 0, \
+                'Проверьте, что считаются попадания и промахи кэша'
@@ -0,0 +1,61 @@
+import pytest
+
+from api.models import Comment, Review, Title
+
+
+@pytest.mark.django_db
+class TestNestedResources:
+    def test_review_detail_single_query(self, client, review,
+                                        django_assert_num_queries):
+        url = f'/api/v1/titles/{review.title_id}/reviews/{review.pk}/'
+        with django_assert_num_queries(1):
+            response = client.get(url)
+        assert response.status_code == 200
+        assert response.json()['author'] == review.author.username
+
+    def test_comment_detail_single_query(self, client, comment,
+                                         django_assert_num_queries):
+        review = comment.review
+        url = (f'/api/v1/titles/{review.title_id}/reviews/{review.pk}/'
+               f'comments/{comment.pk}/')
+        with django_assert_num_queries(1):
+            response = client.get(url)
+        assert response.status_code == 200
+        assert response.json()['text'] == comment.text
+
+    def test_lists_do_not_query_per_row(self, client, review, comment,
+                                        another_user,
+                                        django_assert_num_queries):
+        Review.objects.create(title=review.title, author=another_user,
+                              text='text', score=3)
+        Comment.objects.create(review=review, author=review.author,
+                               text='text')
+        base = f'/api/v1/titles/{review.title_id}/reviews/'
+        with django_assert_num_queries(3):
+            assert client.get(base).status_code == 200
+        with django_assert_num_queries(3):
+            assert client.get(f'{base}{review.pk}/comments/'
+                              ).status_code == 200
+
+    def test_mismatched_chain_is_not_found(self, client, comment, category):
+        other_title = Title.objects.create(name='Другое', category=category)
+        review = comment.review
+        urls = [
+            f'/api/v1/titles/{other_title.pk}/reviews/{review.pk}/',
+            f'/api/v1/titles/{other_title.pk}/reviews/{review.pk}/comments/',
+            f'/api/v1/titles/{other_title.pk}/reviews/{review.pk}/'
+            f'comments/{comment.pk}/',
+        ]
+        for url in urls:
+            assert client.get(url).status_code == 404, \
+                f'Проверьте, что {url} проверяет всю цепочку вложенности'
+
+    def test_comment_create_resolves_review_once(self, user_client, review,
+                                                 django_assert_max_num_queries):
+        url = (f'/api/v1/titles/{review.title_id}/reviews/{review.pk}/'
+               f'comments/')
+        # Review lookup, insert, the comment counts of the author and title.
+        with django_assert_max_num_queries(4):
+            response = user_client.post(url, {'text': 'Новый'})
+        assert response.status_code == 201
+        assert Comment.objects.filter(review=review, text='Новый').exists()
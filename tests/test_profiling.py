@@ -0,0 +1,46 @@
+import json
+import logging
+
+import pytest
+
+from api_yamdb.profiling import RequestProfile
+
+
+@pytest.fixture
+def profiling(settings):
+    settings.PROFILING = {
+        'ENABLED': True,
+        'SAMPLE_RATE': 1.0,
+        'SLOW_REQUEST_MS': 10000,
+        'DUPLICATE_QUERY_THRESHOLD': 3,
+    }
+
+
+class TestProfiling:
+    def test_duplicate_query_detector(self):
+        profile = RequestProfile()
+        profile.queries.update(['SELECT a'] * 5 + ['SELECT b'] * 2)
+        assert profile.duplicates(3) == {'SELECT a': 5}
+
+    @pytest.mark.django_db
+    def test_sampled_request_is_profiled(self, client, profiling, title,
+                                         caplog):
+        caplog.set_level(logging.INFO, logger='api_yamdb.profiling')
+        response = client.get('/api/v1/titles/')
+        assert response.status_code == 200
+
+        timing = response['Server-Timing']
+        for metric in ('total', 'view', 'serializer', 'db'):
+            assert f'{metric};dur=' in timing, \
+                f'Проверьте, что Server-Timing содержит метрику {metric}'
+
+        record = json.loads(caplog.records[-1].getMessage())
+        assert record['path'] == '/api/v1/titles/'
+        assert record['sql_count'] > 0
+        assert record['serializer_ms'] > 0
+        assert record['response_bytes'] == len(response.content)
+
+    @pytest.mark.django_db
+    def test_disabled_by_default(self, client, title):
+        response = client.get('/api/v1/titles/')
+        assert not response.has_header('Server-Timing')
@@ -0,0 +1,53 @@
+import pytest
+
+from api.models import Review, Title
+
+TITLE_LIST_QUERY_BUDGET = 4
+TITLE_DETAIL_QUERY_BUDGET = 2
+
+
+@pytest.fixture
+def make_titles(category, genres, user):
+    def make(count):
+        Title.objects.bulk_create(
+            Title(name=f'Произведение {i}', year=2000, category=category)
+            for i in range(count))
+        titles = Title.objects.order_by('pk')
+        for title in titles:
+            title.genre.set(genres)
+            Review.objects.create(title=title, author=user,
+                                  text='text', score=5)
+        return list(titles)
+    return make
+
+
+@pytest.mark.django_db
+class TestTitleQueryBudget:
+    @pytest.mark.parametrize('count', [1, 10, 50])
+    def test_title_list_query_budget(self, client, make_titles, count,
+                                     django_assert_max_num_queries):
+        make_titles(count)
+        with django_assert_max_num_queries(TITLE_LIST_QUERY_BUDGET):
+            response = client.get('/api/v1/titles/')
+        assert response.status_code == 200
+        results = response.json()['results']
+        assert len(results) == count
+        assert results[0]['category'] == {'name': 'Фильм', 'slug': 'movie'}
+        assert len(results[0]['genre']) == 2
+
+    @pytest.mark.parametrize('count', [1, 10])
+    def test_filtered_title_list_query_budget(self, client, make_titles,
+                                              count,
+                                              django_assert_max_num_queries):
+        make_titles(count)
+        with django_assert_max_num_queries(TITLE_LIST_QUERY_BUDGET):
+            response = client.get('/api/v1/titles/', {'genre': 'drama'})
+        assert response.status_code == 200
+
+    def test_title_detail_query_budget(self, client, make_titles,
+                                       django_assert_max_num_queries):
+        title = make_titles(3)[0]
+        with django_assert_max_num_queries(TITLE_DETAIL_QUERY_BUDGET):
+            response = client.get(f'/api/v1/titles/{title.pk}/')
+        assert response.status_code == 200
+        assert response.json()['rating'] == 5
@@ -0,0 +1,90 @@
+import pytest
+from django.core.cache import cache
+from django.db import connections, transaction
+from django.test.utils import CaptureQueriesContext
+
+from api.cache import CHANGED_KEY
+from api.models import Genre, Title
+from api_yamdb.db.router import PIN_COOKIE, ReplicaRouter, \
+    reading_from_replicas
+
+
+class CaptureAliases:
+    def __enter__(self):
+        self.captures = {
+            alias: CaptureQueriesContext(connections[alias])
+            for alias in ('default', 'replica')
+        }
+        for capture in self.captures.values():
+            capture.__enter__()
+        return self
+
+    def __exit__(self, *args):
+        for capture in self.captures.values():
+            capture.__exit__(*args)
+
+    def count(self, alias):
+        return len(self.captures[alias])
+
+
+@pytest.mark.django_db(transaction=True)
+class TestReadReplicas:
+    @pytest.fixture(autouse=True)
+    def replicas(self, settings):
+        settings.DATABASE_REPLICAS = ['replica']
+
+    def test_reads_from_replica(self, client, title):
+        with CaptureAliases() as queries:
+            response = client.get(f'/api/v1/titles/{title.pk}/reviews/')
+        assert response.status_code == 200
+        assert queries.count('replica') > 0, \
+            'Проверьте, что GET запросы читают из реплики'
+        assert queries.count('default') == 0
+
+    def test_writes_pin_to_primary(self, user_client, title):
+        with CaptureAliases() as queries:
+            response = user_client.post(
+                f'/api/v1/titles/{title.pk}/reviews/',
+                data={'text': 'Отзыв', 'score': 7})
+        assert response.status_code == 201
+        assert queries.count('replica') == 0, \
+            'Проверьте, что запросы на запись идут в основную базу'
+        assert PIN_COOKIE in response.cookies, \
+            'Проверьте, что после записи клиент закрепляется за основной базой'
+
+        with CaptureAliases() as queries:
+            response = user_client.get(f'/api/v1/titles/{title.pk}/reviews/')
+        assert response.data['count'] == 1
+        assert queries.count('replica') == 0, \
+            'Проверьте, что клиент видит свои изменения сразу после записи'
+
+        del user_client.cookies[PIN_COOKIE]
+        with CaptureAliases() as queries:
+            user_client.get(f'/api/v1/titles/{title.pk}/reviews/')
+        assert queries.count('replica') > 0
+
+    def test_cache_is_filled_from_primary_after_writes(self, client):
+        Genre.objects.create(name='Драма', slug='drama')
+        with CaptureAliases() as queries:
+            response = client.get('/api/v1/genres/')
+        assert response.json()['count'] == 1
+        assert queries.count('replica') == 0, \
+            'Проверьте, что после записи кэш заполняется из основной базы'
+
+        cache.delete(CHANGED_KEY.format('genre'))
+        with CaptureAliases() as queries:
+            client.get('/api/v1/genres/', {'page': 1})
+        assert queries.count('replica') > 0, \
+            'Проверьте, что без недавних записей кэш заполняется из реплики'
+
+    def test_primary_outside_requests_and_transactions(self, title):
+        router = ReplicaRouter()
+        assert router.db_for_read(Title) == 'default', \
+            'Проверьте, что вне запросов чтение идет из основной базы'
+        with reading_from_replicas():
+            assert router.db_for_read(Title) == 'replica'
+            assert router.db_for_read(Title, instance=title) == 'default'
+            with transaction.atomic():
+                assert router.db_for_read(Title) == 'default', \
+                    'Проверьте, что внутри транзакции чтение идет из основной базы'
+        assert router.db_for_write(Title) == 'default'
@@ -0,0 +1,53 @@
+import pytest
+
+from api.models import Review
+
+
+@pytest.mark.django_db
+class TestResponseCache:
+    def test_repeated_list_is_served_from_cache(self, client, title,
+                                                django_assert_num_queries):
+        first = client.get('/api/v1/titles/')
+        assert first.status_code == 200
+        with django_assert_num_queries(0):
+            second = client.get('/api/v1/titles/')
+        assert second.json() == first.json(), \
+            'Проверьте, что повторный запрос отдаётся из кэша'
+
+    def test_conditional_get(self, client, title):
+        response = client.get('/api/v1/genres/')
+        etag = response['ETag']
+        assert etag and response.has_header('Last-Modified')
+
+        response = client.get('/api/v1/genres/', HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 304, \
+            'Проверьте, что совпадающий ETag возвращает 304'
+        response = client.get('/api/v1/genres/',
+                              HTTP_IF_NONE_MATCH='"stale"')
+        assert response.status_code == 200
+
+    def test_query_string_is_normalized(self, client, title,
+                                        django_assert_num_queries):
+        client.get('/api/v1/titles/', {'year': 1994, 'genre': 'drama'})
+        with django_assert_num_queries(0):
+            client.get('/api/v1/titles/?genre=drama&year=1994')
+
+    def test_writes_invalidate_dependent_responses(self, client, title,
+                                                   category, user):
+        response = client.get(f'/api/v1/titles/{title.pk}/')
+        assert response.json()['rating'] is None
+
+        Review.objects.create(title=title, author=user, text='text', score=7)
+        response = client.get(f'/api/v1/titles/{title.pk}/')
+        assert response.json()['rating'] == 7, \
+            'Проверьте, что новый отзыв сбрасывает кэш произведения'
+
+        category.name = 'Кино'
+        category.save()
+        response = client.get(f'/api/v1/titles/{title.pk}/')
+        assert response.json()['category']['name'] == 'Кино', \
+            'Проверьте, что изменение категории сбрасывает кэш произведений'
+
+        title.genre.clear()
+        response = client.get(f'/api/v1/titles/{title.pk}/')
+        assert response.json()['genre'] == []
@@ -0,0 +1,76 @@
+import threading
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from api.models import Review, Title
+
+
+@pytest.mark.django_db
+class TestReviewUniqueness:
+    def test_second_review_is_rejected(self, user_client, title):
+        url = f'/api/v1/titles/{title.pk}/reviews/'
+        data = {'text': 'Отлично', 'score': 9}
+        response = user_client.post(url, data)
+        assert response.status_code == 201
+
+        with CaptureQueriesContext(connection) as context:
+            response = user_client.post(url, data)
+        assert response.status_code == 400, \
+            'Проверьте, что второй отзыв автора на произведение отклоняется'
+        review_queries = [query['sql'] for query in context.captured_queries
+                          if 'api_review' in query['sql']]
+        assert len(review_queries) == 1 and \
+            review_queries[0].startswith('INSERT'), \
+            'Проверьте, что уникальность проверяется одним INSERT'
+        assert Review.objects.filter(title=title).count() == 1
+        assert Title.objects.get(pk=title.pk).rating_count == 1
+
+    def test_upsert_replaces_review(self, user_client, title):
+        url = f'/api/v1/titles/{title.pk}/reviews/mine/'
+        response = user_client.put(url, {'text': 'Неплохо', 'score': 6})
+        assert response.status_code == 201
+        response = user_client.put(url, {'text': 'Шедевр', 'score': 10})
+        assert response.status_code == 200, \
+            'Проверьте, что PUT заменяет существующий отзыв автора'
+
+        review = Review.objects.get(title=title)
+        assert (review.text, review.score) == ('Шедевр', 10)
+        title = Title.objects.get(pk=title.pk)
+        assert (title.rating_count, title.rating) == (1, 10)
+
+    def test_upsert_requires_authentication(self, client, title):
+        url = f'/api/v1/titles/{title.pk}/reviews/mine/'
+        response = client.put(url, {'text': 'text', 'score': 5},
+                              content_type='application/json')
+        assert response.status_code == 401
+
+
+@pytest.mark.django_db(transaction=True)
+def test_parallel_creates_store_one_review(user, title):
+    url = f'/api/v1/titles/{title.pk}/reviews/'
+    barrier = threading.Barrier(8)
+    statuses = []
+
+    def post():
+        client = APIClient()
+        client.force_authenticate(user=user)
+        barrier.wait()
+        try:
+            response = client.post(url, {'text': 'text', 'score': 7})
+            statuses.append(response.status_code)
+        finally:
+            connection.close()
+
+    threads = [threading.Thread(target=post) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sorted(statuses) == [201] + [400] * 7, \
+        'Проверьте, что параллельные запросы создают один отзыв'
+    assert Review.objects.filter(title=title, author=user).count() == 1
+    assert Title.objects.get(pk=title.pk).rating_count == 1
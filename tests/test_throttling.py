@@ -0,0 +1,123 @@
+import threading
+
+import pytest
+from django.core.cache import caches
+
+from api_yamdb.throttling import CacheBucketStore
+
+
+@pytest.fixture
+def rates(settings):
+    def set_rates(**rates):
+        settings.REST_FRAMEWORK = {
+            **settings.REST_FRAMEWORK,
+            'DEFAULT_THROTTLE_RATES': {
+                'auth': None, 'write': None, 'anon_read': None, **rates},
+        }
+    caches[settings.THROTTLE_CACHE_ALIAS].clear()
+    yield set_rates
+    caches[settings.THROTTLE_CACHE_ALIAS].clear()
+
+
+class TestCacheBucketStore:
+    def test_bucket_refills_evenly(self):
+        store = CacheBucketStore('throttle')
+        store.cache.clear()
+        taken = [store.take('bucket', 3, 10, 1000)[0] for _ in range(4)]
+        assert taken == [True, True, True, False], \
+            'Проверьте, что из корзины можно взять не больше ее объема'
+        assert store.take('bucket', 3, 10, 1005) == (False, 1030)
+        assert store.take('bucket', 3, 10, 1010) == (True, 1040), \
+            'Проверьте, что корзина пополняется по одному токену за интервал'
+
+    def test_contended_bucket_waits_for_lock(self):
+        store = CacheBucketStore('throttle')
+        store.cache.clear()
+        store.cache.add('bucket:lock', 1)
+        release = threading.Timer(0.05, store.cache.delete, ['bucket:lock'])
+        release.start()
+        try:
+            assert store.take('bucket', 3, 10, 1000) == (True, 1010), \
+                'Проверьте, что запрос дожидается блокировки корзины'
+        finally:
+            release.cancel()
+
+    def test_stuck_lock_fails_closed(self):
+        store = CacheBucketStore('throttle')
+        store.cache.clear()
+        store.lock_wait = 0.05
+        store.cache.add('bucket:lock', 1)
+        assert store.take('bucket', 3, 10, 1000) == (False, 1030), \
+            'Проверьте, что запрос без блокировки корзины отклоняется'
+        store.cache.delete('bucket:lock')
+        assert store.take('bucket', 3, 10, 1000) == (True, 1010)
+
+
+@pytest.mark.django_db
+class TestThrottling:
+    def test_auth_endpoints_share_ip_bucket(self, client, rates):
+        rates(auth='2/min')
+        data = {'email': 'spam@yamdb.fake', 'username': 'spam'}
+        first = client.post('/api/v1/auth/email/', data)
+        assert first.status_code == 200
+        assert first['X-RateLimit-Limit'] == '2'
+        assert first['X-RateLimit-Remaining'] == '1'
+        assert client.post('/api/v1/auth/token/', {}).status_code == 400
+        response = client.post('/api/v1/auth/email/', data)
+        assert response.status_code == 429, \
+            'Проверьте, что запросы кода ограничены по IP-адресу'
+        assert response['Retry-After'] == '30'
+        assert response['X-RateLimit-Remaining'] == '0'
+        other = client.post('/api/v1/auth/email/', data,
+                            REMOTE_ADDR='10.0.0.2')
+        assert other.status_code == 200, \
+            'Проверьте, что у каждого IP-адреса своя корзина'
+
+    def test_contended_request_is_not_rejected(self, client, rates,
+                                               settings):
+        rates(auth='2/min')
+        cache = caches[settings.THROTTLE_CACHE_ALIAS]
+        cache.add('throttle:auth:127.0.0.1:lock', 1)
+        release = threading.Timer(0.05, cache.delete,
+                                  ['throttle:auth:127.0.0.1:lock'])
+        release.start()
+        try:
+            response = client.post('/api/v1/auth/email/', {})
+        finally:
+            release.cancel()
+        assert response.status_code == 400, \
+            'Проверьте, что запрос к непустой корзине не отклоняется, ' \
+            'пока корзина занята другим запросом'
+        assert response['X-RateLimit-Remaining'] == '1'
+
+    def test_writes_are_limited_per_user(self, user_client, admin_client,
+                                         title, rates):
+        rates(write='1/min')
+        url = f'/api/v1/titles/{title.pk}/reviews/'
+        assert user_client.post(url, {'text': 'a', 'score': 5}).status_code \
+            == 201
+        response = user_client.post(url, {'text': 'b', 'score': 5})
+        assert response.status_code == 429, \
+            'Проверьте, что запись отзывов ограничена для пользователя'
+        assert user_client.get(url).status_code == 200, \
+            'Проверьте, что чтение не тратит токены записи'
+        assert admin_client.post(url, {'text': 'c', 'score': 4}).status_code \
+            == 201
+
+    def test_anonymous_reads(self, client, user_client, rates):
+        rates(anon_read='1/min')
+        assert client.get('/api/v1/titles/').status_code == 200
+        assert client.get('/api/v1/categories/').status_code == 429, \
+            'Проверьте, что анонимное чтение каталога ограничено'
+        response = user_client.get('/api/v1/titles/')
+        assert response.status_code == 200
+        assert 'X-RateLimit-Limit' not in response, \
+            'Проверьте, что чтение пользователей не ограничено'
+
+    def test_forwarded_for_from_proxy(self, client, rates):
+        rates(anon_read='1/min')
+        for address in ('1.1.1.1', '2.2.2.2'):
+            response = client.get('/api/v1/genres/',
+                                  HTTP_X_FORWARDED_FOR=address)
+            assert response.status_code == 200, \
+                'Проверьте, что клиент за прокси определяется по X-Forwarded-For'
@@ -0,0 +1,57 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+
+@pytest.mark.django_db
+class TestTitleFacets:
+    @pytest.fixture
+    def titles(self, title, category, genres):
+        from api.models import Category, Title
+
+        book = Category.objects.create(name='Книга', slug='book')
+        second = Title.objects.create(name='Зеленая миля', year=1999,
+                                      category=category)
+        second.genre.set(genres[:1])
+        third = Title.objects.create(name='Мастер и Маргарита', year=1967,
+                                     category=book)
+        third.genre.set(genres[:1])
+        Title.objects.create(name='Без года', category=book)
+        return [title, second, third]
+
+    def test_facet_counts(self, client, titles):
+        response = client.get('/api/v1/titles/', {'facets': 'true'})
+        assert response.status_code == 200
+        facets = response.data['facets']
+        assert facets['genre'] == [
+            {'slug': 'comedy', 'name': 'Комедия', 'count': 1},
+            {'slug': 'drama', 'name': 'Драма', 'count': 3},
+        ], 'Проверьте подсчет произведений по жанрам'
+        assert facets['category'] == [
+            {'slug': 'book', 'name': 'Книга', 'count': 2},
+            {'slug': 'movie', 'name': 'Фильм', 'count': 2},
+        ], 'Проверьте подсчет произведений по категориям'
+        assert facets['year'] == [
+            {'from': 1960, 'to': 1969, 'count': 1},
+            {'from': 1990, 'to': 1999, 'count': 2},
+        ], 'Проверьте подсчет произведений по десятилетиям'
+
+    def test_facets_follow_filters(self, client, titles):
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get('/api/v1/titles/',
+                                  {'facets': '1', 'category': 'movie'})
+        facets = response.data['facets']
+        assert facets['category'] == [
+            {'slug': 'movie', 'name': 'Фильм', 'count': 2}]
+        assert facets['genre'][0] == {'slug': 'comedy', 'name': 'Комедия',
+                                      'count': 1}
+        assert [year['count'] for year in facets['year']] == [2], \
+            'Проверьте, что фасеты считаются по отфильтрованным произведениям'
+        facet_queries = [query for query in queries.captured_queries
+                         if 'GROUP BY' in query['sql']]
+        assert len(facet_queries) == 1, \
+            'Проверьте, что фасеты считаются одним запросом'
+
+    def test_no_facets_by_default(self, client, titles):
+        response = client.get('/api/v1/titles/')
+        assert 'facets' not in response.data
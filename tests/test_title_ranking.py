@@ -0,0 +1,108 @@
+import io
+from datetime import timedelta
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from api import ranking
+
+
+@pytest.mark.django_db
+class TestTitleRanking:
+    @pytest.fixture
+    def titles(self, category, django_user_model):
+        from api.models import Review, Title
+
+        authors = [
+            django_user_model.objects.create_user(
+                username=f'critic{i}', email=f'critic{i}@yamdb.fake')
+            for i in range(6)
+        ]
+        classic = Title.objects.create(name='Классика', category=category)
+        newcomer = Title.objects.create(name='Новинка', category=category)
+        unrated = Title.objects.create(name='Без отзывов', category=category)
+        flop = Title.objects.create(name='Провал', category=category)
+        for author in authors:
+            Review.objects.create(title=classic, author=author, text='.',
+                                  score=8)
+            Review.objects.create(title=flop, author=author, text='.',
+                                  score=2)
+        Review.objects.create(title=newcomer, author=authors[0], text='.',
+                              score=10)
+        old = timezone.now() - timedelta(days=30)
+        Review.objects.exclude(title=newcomer).update(pub_date=old)
+        call_command('refresh_rankings', stdout=io.StringIO())
+        return classic, newcomer, unrated, flop
+
+    def test_top_uses_bayesian_rating(self, client, titles):
+        classic, newcomer, unrated, flop = titles
+        response = client.get('/api/v1/titles/top/')
+        assert response.status_code == 200
+        names = [title['name'] for title in response.data['results']]
+        assert names == [classic.name, newcomer.name, flop.name], \
+            'Проверьте, что одна высокая оценка не поднимает произведение ' \
+            'выше многих хороших'
+
+    def test_trending_prefers_recent_reviews(self, client, titles):
+        classic, newcomer, unrated, flop = titles
+        response = client.get('/api/v1/titles/trending/')
+        assert response.status_code == 200
+        names = [title['name'] for title in response.data['results']]
+        assert names == [newcomer.name, classic.name, flop.name], \
+            'Проверьте, что старые отзывы весят меньше свежих'
+
+    def test_ranking_updates_on_review_writes(self, client, titles, user):
+        from api.models import Review, TitleRanking
+
+        classic, newcomer, unrated, flop = titles
+        assert TitleRanking.objects.get(title=unrated).trending is None
+        client.get('/api/v1/titles/trending/')
+        Review.objects.create(title=unrated, author=user, text='.', score=5)
+        names = [title['name'] for title in
+                 client.get('/api/v1/titles/trending/').data['results']]
+        assert names[0] in (newcomer.name, unrated.name) and \
+            unrated.name in names, \
+            'Проверьте, что рейтинг обновляется при создании отзыва'
+
+        Review.objects.filter(title=newcomer).get().delete()
+        assert TitleRanking.objects.get(title=newcomer).trending is None, \
+            'Проверьте, что рейтинг обновляется при удалении отзыва'
+
+    def test_incremental_matches_rebuild(self, titles, user):
+        from api.models import Review, TitleRanking
+
+        classic, newcomer, unrated, flop = titles
+        Review.objects.create(title=newcomer, author=user, text='.', score=3)
+        incremental = TitleRanking.objects.get(title=newcomer)
+        ranking.rebuild()
+        rebuilt = TitleRanking.objects.get(title=newcomer)
+        assert incremental.trending == pytest.approx(rebuilt.trending), \
+            'Проверьте, что обновление по отзыву совпадает с пересчетом'
+
+    def test_edits_and_deletes_do_not_scan_reviews(self, titles):
+        from api.models import Review, TitleRanking
+
+        classic, newcomer, unrated, flop = titles
+        reviews = list(Review.objects.filter(title=classic))
+        reviews[0].score = 1
+        with CaptureQueriesContext(connection) as queries:
+            reviews[0].save()
+            reviews[1].delete()
+        assert not [query for query in queries.captured_queries
+                    if 'SELECT "api_review"."pub_date"' in query['sql']], \
+            'Проверьте, что правка и удаление отзыва не читают все отзывы'
+        incremental = TitleRanking.objects.get(title=classic)
+        ranking.rebuild()
+        rebuilt = TitleRanking.objects.get(title=classic)
+        assert incremental.trending == pytest.approx(rebuilt.trending), \
+            'Проверьте, что удаление вычитает вклад отзыва в trending'
+
+    def test_trending_score_decays(self):
+        now = timezone.now()
+        trending = ranking.trending_log([now, now])
+        assert ranking.trending_score(trending, now) == pytest.approx(2)
+        later = now + timedelta(hours=72)
+        assert ranking.trending_score(trending, later) == pytest.approx(1)
@@ -0,0 +1,86 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+from api.models import Review, Title
+
+
+@pytest.mark.django_db
+class TestTitleRating:
+    def refresh(self, title):
+        return Title.objects.get(pk=title.pk)
+
+    def test_rating_follows_review_writes(self, title, user, another_user):
+        assert self.refresh(title).rating is None, \
+            'Проверьте, что рейтинг произведения без отзывов равен None'
+
+        review = Review.objects.create(title=title, author=user,
+                                       text='text', score=9)
+        Review.objects.create(title=title, author=another_user,
+                              text='text', score=4)
+        title = self.refresh(title)
+        assert (title.rating_sum, title.rating_count, title.rating) == \
+            (13, 2, 6), 'Проверьте, что рейтинг пересчитывается при создании'
+
+        review = Review.objects.get(pk=review.pk)
+        review.score = 1
+        review.save()
+        title = self.refresh(title)
+        assert (title.rating_sum, title.rating_count, title.rating) == \
+            (5, 2, 2), 'Проверьте, что рейтинг пересчитывается при изменении'
+
+        review.delete()
+        title = self.refresh(title)
+        assert (title.rating_sum, title.rating_count, title.rating) == \
+            (4, 1, 4), 'Проверьте, что рейтинг пересчитывается при удалении'
+
+        Review.objects.all().delete()
+        assert self.refresh(title).rating is None
+
+    def test_rebuild_ratings_command(self, title, user, another_user):
+        Review.objects.bulk_create([
+            Review(title=title, author=user, text='text', score=10),
+            Review(title=title, author=another_user, text='text', score=7),
+        ])
+        assert self.refresh(title).rating_count == 0
+
+        call_command('rebuild_ratings', stdout=StringIO())
+        title = self.refresh(title)
+        assert (title.rating_sum, title.rating_count, title.rating) == \
+            (17, 2, 8), 'Проверьте, что rebuild_ratings пересчитывает рейтинг'
+
+    def test_title_list_runs_no_rating_queries(self, client, title, user,
+                                               django_assert_max_num_queries):
+        Review.objects.create(title=title, author=user, text='text', score=8)
+        with django_assert_max_num_queries(4):
+            response = client.get('/api/v1/titles/')
+        assert response.status_code == 200
+        assert response.json()['results'][0]['rating'] == 8
+
+    def test_stale_review_writes_apply_once(self, title, user, another_user):
+        review = Review.objects.create(title=title, author=user,
+                                       text='text', score=9)
+        Review.objects.create(title=title, author=another_user,
+                              text='text', score=4)
+        # Two requests that loaded the same review before either wrote it.
+        first = Review.objects.get(pk=review.pk)
+        second = Review.objects.get(pk=review.pk)
+        first.score = 1
+        first.save()
+        second.score = 3
+        second.save()
+        title = self.refresh(title)
+        assert (title.rating_sum, title.rating_count) == (7, 2), \
+            'Проверьте, что изменение оценки считается от сохранённой оценки'
+
+        first.delete()
+        second.delete()
+        title = self.refresh(title)
+        assert (title.rating_sum, title.rating_count) == (4, 1), \
+            'Проверьте, что повторное удаление отзыва не меняет рейтинг'
+        user.refresh_from_db()
+        assert user.review_count == 0, \
+            'Проверьте, что повторное удаление не меняет счётчик отзывов'
+        assert title.stats.review_count == 1, \
+            'Проверьте, что повторное удаление не меняет статистику'
@@ -0,0 +1,65 @@
+import pytest
+from django.db import connections
+
+from api import search
+from api.models import Category, Genre, Title
+
+
+@pytest.fixture
+def catalog(category, genres):
+    book = Category.objects.create(name='Книга', slug='book')
+    drama, comedy = genres
+    dramedy = Genre.objects.create(name='Драмеди', slug='drama-comedy')
+    titles = {
+        'shawshank': Title.objects.create(
+            name='Побег из Шоушенка', year=1994, category=category,
+            description='Тюремная драма'),
+        'escape': Title.objects.create(
+            name='Побег', year=2005, category=category),
+        'book': Title.objects.create(
+            name='Мастер и Маргарита', year=1967, category=book,
+            description='Побег от реальности'),
+    }
+    titles['shawshank'].genre.set([drama, comedy])
+    titles['escape'].genre.set([dramedy])
+    titles['book'].genre.set([drama])
+    return titles
+
+
+def result_ids(response):
+    assert response.status_code == 200
+    return [title['id'] for title in response.json()['results']]
+
+
+@pytest.mark.django_db
+class TestTitleSearch:
+    def test_q_orders_by_relevance(self, client, catalog):
+        ids = result_ids(client.get('/api/v1/titles/', {'q': 'Побег'}))
+        assert ids == [catalog['escape'].pk, catalog['shawshank'].pk,
+                       catalog['book'].pk], \
+            'Проверьте, что ?q= сортирует произведения по релевантности'
+
+    def test_q_without_matches(self, client, catalog):
+        assert result_ids(client.get('/api/v1/titles/', {'q': 'xyz'})) == []
+
+    def test_genre_filter_is_exact_and_distinct(self, client, catalog):
+        ids = result_ids(client.get('/api/v1/titles/', {'genre': 'drama'}))
+        assert sorted(ids) == sorted([catalog['shawshank'].pk,
+                                      catalog['book'].pk]), \
+            'Проверьте, что фильтр по жанру сравнивает slug целиком'
+
+    def test_category_filter_is_exact(self, client, catalog):
+        ids = result_ids(client.get('/api/v1/titles/', {'category': 'mov'}))
+        assert ids == []
+        ids = result_ids(client.get('/api/v1/titles/', {'category': 'book'}))
+        assert ids == [catalog['book'].pk]
+
+    def test_backend_follows_queryset_database(self, monkeypatch):
+        monkeypatch.setattr(connections['replica'], 'vendor', 'postgresql')
+        monkeypatch.setattr(search, '_search_postgresql',
+                            lambda queryset, query: 'postgresql')
+        assert search.search_titles(Title.objects.using('replica'),
+                                    'Побег') == 'postgresql', \
+            'Проверьте, что поиск выбирается по базе запроса'
+        assert search.search_titles(Title.objects.all(), 'Побег') != \
+            'postgresql'
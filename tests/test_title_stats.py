@@ -0,0 +1,104 @@
+import io
+
+import pytest
+from django.core.management import call_command
+
+from api.models import Comment, Review, Title, TitleStats
+
+
+@pytest.fixture
+def reviewed(title, review, django_user_model):
+    authors = [
+        django_user_model.objects.create_user(username=f'critic{i}',
+                                              email=f'critic{i}@yamdb.fake')
+        for i in range(3)
+    ]
+    reviews = [review] + [
+        Review.objects.create(title=title, author=author, text='text',
+                              score=score)
+        for author, score in zip(authors, (10, 10, 3))
+    ]
+    for author in authors:
+        Comment.objects.create(review=reviews[1], author=author, text='+')
+    return reviews
+
+
+def expected_stats(title):
+    reviews = list(Review.objects.filter(title=title))
+    return {
+        'review_count': len(reviews),
+        'comment_count': Comment.objects.filter(review__title=title).count(),
+        'histogram': {str(score): sum(review.score == score
+                                      for review in reviews)
+                      for score in range(1, 11)},
+        'last_review_at': max(review.pub_date for review in reviews
+                              ).isoformat().replace('+00:00', 'Z')
+        if reviews else None,
+    }
+
+
+@pytest.mark.django_db
+class TestTitleStats:
+    def test_stats_follow_writes(self, client, title, reviewed):
+        url = f'/api/v1/titles/{title.pk}/stats/'
+        response = client.get(url)
+        assert response.status_code == 200
+        data = response.json()
+        assert data == expected_stats(title), \
+            'Проверьте, что статистика обновляется при создании отзывов'
+        assert data['histogram']['10'] == 2
+        assert data['comment_count'] == 3
+
+        reviewed[3].score = 10
+        reviewed[3].save()
+        reviewed[2].delete()
+        comment = Comment.objects.create(review=reviewed[0],
+                                         author=reviewed[0].author, text='-')
+        comment = Comment.objects.get(pk=comment.pk)
+        comment.review = reviewed[3]
+        comment.save()
+        assert client.get(url).json() == expected_stats(title), \
+            'Проверьте, что статистика обновляется при изменении и удалении'
+        assert client.get('/api/v1/titles/0/stats/').status_code == 404
+
+    def test_stats_rows_exist_for_fixture_titles(self, client, category):
+        title = Title(name='Из фикстуры', year=2000, category=category)
+        title.save_base(raw=True)
+        assert TitleStats.objects.filter(title=title).exists(), \
+            'Проверьте, что строка статистики создается и для loaddata'
+        TitleStats.objects.filter(title=title).delete()
+        response = client.get(f'/api/v1/titles/{title.pk}/stats/')
+        assert response.status_code == 200
+        assert response.json()['review_count'] == 0
+        assert not TitleStats.objects.filter(title=title).exists(), \
+            'Проверьте, что GET не пересчитывает статистику'
+
+    def test_stats_of_invalid_title(self, client):
+        assert client.get('/api/v1/titles/abc/stats/').status_code == 404, \
+            'Проверьте, что нечисловой id произведения возвращает 404'
+
+    def test_embedded_stats(self, client, title, reviewed):
+        response = client.get('/api/v1/titles/')
+        assert 'stats' not in response.json()['results'][0]
+        response = client.get('/api/v1/titles/', {'stats': 'true'})
+        assert response.json()['results'][0]['stats'] == \
+            expected_stats(title), \
+            'Проверьте, что статистику можно встроить в список произведений'
+        Comment.objects.create(review=reviewed[0], author=reviewed[0].author,
+                               text='Новый')
+        response = client.get('/api/v1/titles/', {'stats': 'true'})
+        assert response.json()['results'][0]['stats']['comment_count'] == 4, \
+            'Проверьте, что кэш встроенной статистики сбрасывается'
+
+
+@pytest.mark.django_db(transaction=True)
+def test_rebuild_title_stats_in_parallel(title, reviewed, category):
+    empty = Title.objects.create(name='Пусто', year=2000, category=category)
+    TitleStats.objects.update(review_count=99, score_10=0)
+    TitleStats.objects.filter(title=empty).delete()
+    call_command('rebuild_title_stats', workers=2, chunk_size=1,
+                 stdout=io.StringIO())
+    stats = TitleStats.objects.get(title=title)
+    assert (stats.review_count, stats.score_10, stats.comment_count) == \
+        (4, 2, 3), 'Проверьте, что rebuild_title_stats пересчитывает статистику'
+    assert TitleStats.objects.get(title=empty).review_count == 0
@@ -0,0 +1,148 @@
+import io
+
+import pytest
+from django.core.management import call_command
+
+from api.models import Comment, Review, Title, TitleStats
+from api.pagination import PubDateCursorPagination
+from users.models import User
+
+
+@pytest.fixture
+def activity(user, another_user, category):
+    titles = [Title.objects.create(name=f'Произведение {i}', year=2000,
+                                   category=category) for i in range(3)]
+    reviews = [Review.objects.create(title=title, author=user,
+                                     text=f'Отзыв {i}', score=5)
+               for i, title in enumerate(titles)]
+    comments = [Comment.objects.create(review=reviews[0], author=author,
+                                       text='Комментарий')
+                for author in (user, another_user, another_user)]
+    return reviews, comments
+
+
+@pytest.mark.django_db
+class TestUserActivity:
+    def test_counts_are_maintained_on_write(self, user, another_user,
+                                            activity):
+        reviews, comments = activity
+        user.refresh_from_db()
+        another_user.refresh_from_db()
+        assert (user.review_count, user.comment_count) == (3, 1)
+        assert (another_user.review_count, another_user.comment_count) == \
+            (0, 2), 'Проверьте, что счетчики автора обновляются при записи'
+        reviews[0].delete()
+        user.refresh_from_db()
+        another_user.refresh_from_db()
+        assert (user.review_count, user.comment_count) == (2, 0)
+        assert another_user.comment_count == 0, \
+            'Проверьте, что счетчики уменьшаются при удалении'
+
+    def test_user_reviews_feed(self, client, user, activity,
+                               django_assert_max_num_queries, monkeypatch):
+        reviews, _ = activity
+        monkeypatch.setattr(PubDateCursorPagination, 'page_size', 2)
+        with django_assert_max_num_queries(2):
+            response = client.get(f'/api/v1/users/{user.username}/reviews/')
+        assert response.status_code == 200
+        data = response.json()
+        assert data['review_count'] == 3
+        assert data['comment_count'] == 1
+        assert [item['id'] for item in data['results']] == \
+            [reviews[2].pk, reviews[1].pk], \
+            'Проверьте, что отзывы пользователя идут от новых к старым'
+        assert data['results'][0]['author'] == user.username
+        data = client.get(data['next']).json()
+        assert [item['id'] for item in data['results']] == [reviews[0].pk]
+        assert data['next'] is None
+
+    def test_my_comments(self, client, user_client, another_user,
+                         activity):
+        _, comments = activity
+        response = user_client.get('/api/v1/users/me/comments/')
+        assert response.status_code == 200
+        assert [item['id'] for item in response.json()['results']] == \
+            [comments[0].pk], 'Проверьте /users/me/comments/'
+        assert client.get('/api/v1/users/me/comments/').status_code == 401
+        response = client.get(
+            f'/api/v1/users/{another_user.username}/comments/')
+        assert [item['id'] for item in response.json()['results']] == \
+            [comments[2].pk, comments[1].pk]
+        assert client.get('/api/v1/users/nobody/reviews/').status_code \
+            == 404
+
+    def test_rebuild_user_counts(self, user, activity):
+        user.__class__.objects.update(review_count=0, comment_count=7)
+        call_command('rebuild_user_counts', stdout=io.StringIO())
+        user.refresh_from_db()
+        assert (user.review_count, user.comment_count) == (3, 1), \
+            'Проверьте, что команда пересчитывает счетчики пользователей'
+
+
+@pytest.fixture
+def discussion(user, another_user, django_user_model, category):
+    title = Title.objects.create(name='Обсуждаемое', year=2000,
+                                 category=category)
+    review = Review.objects.create(title=title, author=user, text='Отзыв',
+                                   score=7)
+    other = Review.objects.create(title=title, author=another_user,
+                                  text='Другой', score=3)
+    commenters = [
+        django_user_model.objects.create_user(
+            username=f'reader{i}', email=f'reader{i}@yamdb.fake')
+        for i in range(10)
+    ]
+    Comment.objects.bulk_create([
+        Comment(review=review, author=commenters[i % 10], text=str(i))
+        for i in range(50)
+    ])
+    Comment.objects.create(review=other, author=user, text='Ответ')
+    call_command('rebuild_user_counts', stdout=io.StringIO())
+    call_command('rebuild_title_stats', stdout=io.StringIO())
+    return title, review, commenters
+
+
+@pytest.mark.django_db
+class TestCascadedDeletes:
+    def test_review_delete_with_comments(self, user, discussion,
+                                         django_assert_max_num_queries):
+        title, review, commenters = discussion
+        # Grouped bookkeeping, not one UPDATE per deleted comment, and the
+        # lock on the review row.
+        with django_assert_max_num_queries(14):
+            review.delete()
+        assert [reader.comment_count for reader in
+                User.objects.filter(pk__in=[c.pk for c in commenters])] == \
+            [0] * 10, 'Проверьте, что удаление отзыва уменьшает счетчики ' \
+            'комментаторов'
+        user.refresh_from_db()
+        assert (user.review_count, user.comment_count) == (0, 1)
+        stats = TitleStats.objects.get(title=title)
+        assert (stats.review_count, stats.comment_count) == (1, 1), \
+            'Проверьте, что удаление отзыва обновляет статистику'
+
+    def test_title_delete(self, user, another_user, discussion,
+                          django_assert_max_num_queries):
+        title, review, commenters = discussion
+        with django_assert_max_num_queries(14):
+            title.delete()
+        for author in (user, another_user, *commenters):
+            author.refresh_from_db()
+            assert (author.review_count, author.comment_count) == (0, 0), \
+                'Проверьте, что удаление произведения обновляет счетчики'
+
+    def test_comment_and_user_deletes(self, user, another_user, discussion):
+        title, review, commenters = discussion
+        Comment.objects.filter(author=commenters[0]).delete()
+        commenters[0].refresh_from_db()
+        assert commenters[0].comment_count == 0
+        assert TitleStats.objects.get(title=title).comment_count == 46, \
+            'Проверьте, что удаление комментариев обновляет статистику'
+        user.delete()
+        another_user.refresh_from_db()
+        stats = TitleStats.objects.get(title=title)
+        assert (stats.review_count, stats.comment_count) == (1, 0)
+        assert another_user.review_count == 1
+        commenters[1].refresh_from_db()
+        assert commenters[1].comment_count == 0, \
+            'Проверьте, что удаление пользователя обновляет счетчики'
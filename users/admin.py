@@ -1,6 +1,8 @@
 from django.contrib import admin
 from django.contrib.auth import get_user_model
 
+from .models import EmailOutbox
+
 User = get_user_model()
 
 
@@ -9,3 +11,12 @@ class UsersAdmin(admin.ModelAdmin):
 
 
 admin.site.register(User, UsersAdmin)
+
+
+class EmailOutboxAdmin(admin.ModelAdmin):
+    list_display = ('recipient', 'subject', 'created', 'attempts', 'sent_at')
+    list_filter = ('sent_at', )
+    search_fields = ('recipient', )
+
+
+admin.site.register(EmailOutbox, EmailOutboxAdmin)
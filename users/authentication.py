@@ -0,0 +1,47 @@
+from django.utils.translation import gettext_lazy as _
+
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.settings import api_settings
+
+from .models import User
+from .tokens import FINGERPRINT_CLAIM, REVOKED, USER_CLAIMS, \
+    get_cached_fingerprint, remember_fingerprint
+
+
+def build_lazy_user(user_id, claims):
+    """
+    Build a User instance from token claims. Every other field is deferred,
+    so Django loads it from the database only when code reads it.
+    """
+    values = dict(claims, id=user_id, is_active=True)
+    field_names = [field.attname for field in User._meta.concrete_fields
+                   if field.attname in values]
+    return User.from_db('default', field_names,
+                        [values[name] for name in field_names])
+
+
+class StatelessJWTAuthentication(JWTAuthentication):
+    """
+    JWT authentication that trusts user claims of the token instead of
+    fetching the user on every request. The claims are used while the
+    fingerprint cached for the user matches the token; role changes fall back
+    to the database and deleted users are rejected.
+    """
+    def get_user(self, validated_token):
+        user_id = validated_token.get(api_settings.USER_ID_CLAIM)
+        fingerprint = validated_token.get(FINGERPRINT_CLAIM)
+        if user_id is None or fingerprint is None:
+            return super().get_user(validated_token)
+
+        cached = get_cached_fingerprint(user_id)
+        if cached == REVOKED:
+            raise AuthenticationFailed(_('User not found'),
+                                       code='user_not_found')
+        if cached != fingerprint:
+            user = super().get_user(validated_token)
+            remember_fingerprint(user)
+            return user
+        return build_lazy_user(
+            user_id, {name: validated_token.get(name)
+                      for name in USER_CLAIMS})
@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from api.models import Comment, Review
+from users.models import User
+
+
+def count_by_author(model):
+    return Subquery(
+        model.objects.filter(author=OuterRef('pk')).order_by().values(
+            'author').annotate(total=Count('pk')).values('total'),
+        output_field=IntegerField())
+
+
+class Command(BaseCommand):
+    help = 'Recompute stored review and comment counts of all users.'
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            updated = User.objects.update(
+                review_count=Coalesce(count_by_author(Review), 0),
+                comment_count=Coalesce(count_by_author(Comment), 0),
+            )
+        self.stdout.write(
+            self.style.SUCCESS(f'Rebuilt counts for {updated} users.'))
@@ -0,0 +1,46 @@
+import logging
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from users.outbox import send_pending
+
+logger = logging.getLogger(__name__)
+
+# Longest pause in seconds after repeated failures of the outbox.
+MAX_BACKOFF = 300
+
+
+class Command(BaseCommand):
+    help = 'Send queued emails from the outbox in batches.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int)
+        parser.add_argument('--loop',
+                            action='store_true',
+                            help='Keep polling the outbox.')
+        parser.add_argument('--interval', type=float, default=1.0)
+
+    def handle(self, *args, **options):
+        failures = 0
+        while True:
+            try:
+                sent = send_pending(options['batch_size'])
+            except Exception:
+                if not options['loop']:
+                    raise
+                failures += 1
+                logger.exception('Sending the outbox failed')
+                close_old_connections()
+                time.sleep(min(options['interval'] * 2 ** failures,
+                               MAX_BACKOFF))
+                continue
+            failures = 0
+            if sent:
+                self.stdout.write(f'Sent {sent} emails.')
+            if not options['loop']:
+                return
+            close_old_connections()
+            if not sent:
+                time.sleep(options['interval'])
@@ -0,0 +1,37 @@
+# Generated by Django 3.0.8 on 2026-10-18 19:11
+
+from django.db import migrations, models
+
+
+def fill_activity_counts(apps, schema_editor):
+    User = apps.get_model('users', 'User')
+    for model, field in (('Review', 'review_count'),
+                         ('Comment', 'comment_count')):
+        counts = apps.get_model('api', model).objects.values(
+            'author').annotate(total=models.Count('pk'))
+        for row in counts.order_by():
+            User.objects.filter(pk=row['author']).update(
+                **{field: row['total']})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0002_email_outbox'),
+        ('api', '0007_author_feed_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='comment_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='review_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(fill_activity_counts,
+                             migrations.RunPython.noop),
+    ]
@@ -1,5 +1,6 @@
 from django.db import models
 from django.contrib.auth.models import AbstractUser
+from django.utils import timezone
 from django.utils.translation import ugettext_lazy as _
 
 
@@ -28,6 +29,9 @@ class User(AbstractUser):
         default=UserRoles.USER,
     )
     confirmation_code = models.CharField(max_length=10, default='FOOBAR')
+    # Maintained by the review and comment signals of the api app.
+    review_count = models.PositiveIntegerField(default=0, editable=False)
+    comment_count = models.PositiveIntegerField(default=0, editable=False)
 
     USERNAME_FIELD = 'email'
     REQUIRED_FIELDS = ('username', )
@@ -53,3 +57,28 @@ class User(AbstractUser):
         """
         full_name = '%s %s' % (self.first_name, self.last_name)
         return full_name.strip()
+
+
+class EmailOutbox(models.Model):
+    """
+    Email waiting to be sent by the outbox worker, see users.outbox.
+    """
+
+    subject = models.CharField(max_length=200)
+    body = models.TextField()
+    from_email = models.EmailField()
+    recipient = models.EmailField()
+    created = models.DateTimeField(auto_now_add=True)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    sent_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['sent_at', 'next_attempt_at'],
+                         name='email_outbox_pending_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.recipient}, {self.subject}'
@@ -0,0 +1,141 @@
+import logging
+import threading
+from datetime import timedelta
+
+from django.conf import settings
+from django.core import mail
+from django.db import close_old_connections, connection, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import EmailOutbox
+
+logger = logging.getLogger(__name__)
+
+
+def enqueue(subject, body, from_email, recipient):
+    """
+    Store an email in the outbox and wake the worker once it is committed.
+    """
+    message = EmailOutbox.objects.create(subject=subject,
+                                         body=body,
+                                         from_email=from_email,
+                                         recipient=recipient)
+    if settings.EMAIL_OUTBOX_WORKER == 'thread':
+        transaction.on_commit(worker.wake)
+    return message
+
+
+def get_backoff(attempts):
+    return timedelta(seconds=settings.EMAIL_OUTBOX_RETRY_DELAY
+                     * 2 ** (attempts - 1))
+
+
+def claim(batch_size):
+    """
+    Take a batch of due emails in a short transaction. Each claimed email
+    counts an attempt and is not due again for EMAIL_OUTBOX_CLAIM_TIMEOUT
+    seconds, so other workers skip it while it is being sent and a worker
+    that dies while sending leaves it to be retried.
+    """
+    with transaction.atomic():
+        pending = EmailOutbox.objects.filter(
+            sent_at__isnull=True,
+            next_attempt_at__lte=timezone.now(),
+            attempts__lt=settings.EMAIL_OUTBOX_MAX_ATTEMPTS,
+        ).order_by('next_attempt_at')
+        if connection.features.has_select_for_update_skip_locked:
+            pending = pending.select_for_update(skip_locked=True)
+        messages = list(pending[:batch_size])
+        claimed_until = timezone.now() + timedelta(
+            seconds=settings.EMAIL_OUTBOX_CLAIM_TIMEOUT)
+        EmailOutbox.objects.filter(
+            pk__in=[message.pk for message in messages]
+        ).update(attempts=F('attempts') + 1, next_attempt_at=claimed_until)
+    for message in messages:
+        message.attempts += 1
+        message.next_attempt_at = claimed_until
+    return messages
+
+
+def fail(message, error):
+    logger.warning('Email %s to %s failed: %s', message.pk,
+                   message.recipient, error)
+    message.last_error = str(error)
+    message.next_attempt_at = (timezone.now()
+                               + get_backoff(message.attempts))
+
+
+def send_pending(batch_size=None):
+    """
+    Send one batch of due emails over a single backend connection, outside
+    of any transaction. Failed emails are retried with exponential backoff
+    until EMAIL_OUTBOX_MAX_ATTEMPTS. Returns the number of sent emails.
+    """
+    messages = claim(batch_size or settings.EMAIL_OUTBOX_BATCH_SIZE)
+    if not messages:
+        return 0
+
+    done = set()
+    try:
+        with mail.get_connection() as backend:
+            for message in messages:
+                try:
+                    backend.send_messages([
+                        mail.EmailMessage(message.subject, message.body,
+                                          message.from_email,
+                                          [message.recipient])
+                    ])
+                except Exception as error:
+                    fail(message, error)
+                else:
+                    message.sent_at = timezone.now()
+                    message.last_error = ''
+                done.add(message.pk)
+    except Exception as error:
+        # The backend could not open or close its connection.
+        for message in messages:
+            if message.pk not in done:
+                fail(message, error)
+    EmailOutbox.objects.bulk_update(
+        messages, ['sent_at', 'next_attempt_at', 'last_error'])
+    return sum(message.sent_at is not None for message in messages)
+
+
+class OutboxWorker:
+    """
+    Background thread of one process flushing the outbox. It sends as soon
+    as it is woken up after a commit and otherwise polls for retries every
+    EMAIL_OUTBOX_POLL_INTERVAL seconds.
+    """
+    def __init__(self):
+        self.event = threading.Event()
+        self.lock = threading.Lock()
+        self.thread = None
+
+    def wake(self):
+        self.start()
+        self.event.set()
+
+    def start(self):
+        with self.lock:
+            if self.thread is None or not self.thread.is_alive():
+                self.thread = threading.Thread(target=self.run,
+                                               name='email-outbox',
+                                               daemon=True)
+                self.thread.start()
+
+    def run(self):
+        while True:
+            self.event.wait(settings.EMAIL_OUTBOX_POLL_INTERVAL)
+            self.event.clear()
+            try:
+                while send_pending():
+                    pass
+            except Exception:
+                logger.exception('Email outbox worker failed')
+            finally:
+                close_old_connections()
+
+
+worker = OutboxWorker()
@@ -0,0 +1,50 @@
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+
+from rest_framework_simplejwt.tokens import AccessToken
+
+# Claims carried by access tokens so permission checks need no user query.
+USER_CLAIMS = ('username', 'role', 'is_staff', 'is_superuser')
+
+FINGERPRINT_CLAIM = 'auth_fingerprint'
+FINGERPRINT_KEY = 'auth:fingerprint:{}'
+REVOKED = 'revoked'
+
+
+def get_fingerprint(user):
+    """
+    Short digest of every user attribute a token relies on.
+    """
+    raw = ':'.join(str(getattr(user, name))
+                   for name in USER_CLAIMS + ('is_active', ))
+    return hashlib.md5(raw.encode()).hexdigest()[:16]
+
+
+def get_cached_fingerprint(user_id):
+    return cache.get(FINGERPRINT_KEY.format(user_id))
+
+
+def remember_fingerprint(user):
+    cache.set(FINGERPRINT_KEY.format(user.pk), get_fingerprint(user),
+              settings.AUTH_FINGERPRINT_TIMEOUT)
+
+
+def revoke(user_id):
+    cache.set(FINGERPRINT_KEY.format(user_id), REVOKED,
+              settings.AUTH_FINGERPRINT_TIMEOUT)
+
+
+class UserClaimsAccessToken(AccessToken):
+    """
+    Access token carrying role and permission flags of the user.
+    """
+    @classmethod
+    def for_user(cls, user):
+        token = super().for_user(user)
+        for name in USER_CLAIMS:
+            token[name] = getattr(user, name)
+        token[FINGERPRINT_CLAIM] = get_fingerprint(user)
+        remember_fingerprint(user)
+        return token
@@ -1,22 +1,30 @@
 from django.contrib.auth.tokens import default_token_generator
-from django.core.mail import send_mail
 from django.shortcuts import get_object_or_404
 
 from rest_framework import viewsets, status
-from rest_framework.decorators import action, api_view, permission_classes
+from rest_framework.decorators import action, api_view, \
+    permission_classes, throttle_classes
+from rest_framework.exceptions import NotAuthenticated
 from rest_framework.permissions import IsAuthenticated, AllowAny
 from rest_framework.response import Response
 
+from api.lean import COMMENT_LIST, REVIEW_LIST
+from api.pagination import PubDateCursorPagination
+from api_yamdb.throttling import AuthThrottle
+
+from . import outbox
 from .models import User
 from .permissions import IsAdminPermissions
 from .serializers import UserSerializer, ConfirmationCodeSerializer, \
     UserCreationSerializer
+from .tokens import UserClaimsAccessToken
 
 EMAIL_AUTH = 'authorization@yamdb.fake'
 
 
 @api_view(['POST'])
 @permission_classes([AllowAny])
+@throttle_classes([AuthThrottle])
 def get_jwt_token(request):
     """
     Receiving a JWT token in exchange for email and confirmation_code.
@@ -25,11 +33,11 @@ def get_jwt_token(request):
     serializer = ConfirmationCodeSerializer(data=request.data)
     if not serializer.is_valid():
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
-    email = serializer.data.get('email')
-    confirmation_code = serializer.data.get('confirmation_code')
+    email = serializer.validated_data.get('email')
+    confirmation_code = serializer.validated_data.get('confirmation_code')
     user = get_object_or_404(User, email=email)
     if default_token_generator.check_token(user, confirmation_code):
-        token = AccessToken.for_user(user)
+        token = UserClaimsAccessToken.for_user(user)
         return Response({'token': str(token)}, status=status.HTTP_200_OK)
     return Response({'confirmation_code': 'Неверный код подтверждения'},
                     status=status.HTTP_400_BAD_REQUEST)
@@ -37,27 +45,27 @@ def get_jwt_token(request):
 
 @api_view(['POST'])
 @permission_classes([AllowAny])
+@throttle_classes([AuthThrottle])
 def send_confirm_code(request):
     """
     Sending confirmation_code to the transmitted email.
     Get or Creating an User object.
+    The email is queued in the outbox and sent by its worker.
     """
 
     serializer = UserCreationSerializer(data=request.data)
     serializer.is_valid(raise_exception=True)
     email = serializer.data['email']
     username = serializer.data['username']
-    user = User.objects.get_or_create(
+    user, _ = User.objects.get_or_create(
         email=email,
         username=username,
     )
     confirmation_code = default_token_generator.make_token(user)
-    send_mail(subject='Yours confirmation code',
-              message=f'confirmation_code: {confirmation_code}',
-              from_email=EMAIL_AUTH,
-              recipient_list=(email, ),
-              fail_silently=False)
-    serializer.save()
+    outbox.enqueue(subject='Yours confirmation code',
+                   body=f'confirmation_code: {confirmation_code}',
+                   from_email=EMAIL_AUTH,
+                   recipient=email)
     return Response(serializer.data, status=status.HTTP_200_OK)
 
 
@@ -68,6 +76,9 @@ class UserViewSet(viewsets.ModelViewSet):
     [DELETE] Delete user object by username. 'users/{username}/'
     3) [GET] Get your account details. [PATCH] Change your account details.
     'users/me/'
+    4) [GET] Get reviews or comments of a user, newest first.
+    'users/{username}/reviews/', 'users/{username}/comments/',
+    'users/me/reviews/', 'users/me/comments/'
     """
     queryset = User.objects.all()
     serializer_class = UserSerializer
@@ -79,7 +90,7 @@ class UserViewSet(viewsets.ModelViewSet):
             permission_classes=(IsAuthenticated, ),
             url_path='me')
     def me(self, request):
-        user_profile = get_object_or_404(User, email=self.request.user.email)
+        user_profile = get_object_or_404(User, pk=self.request.user.pk)
         if request.method == 'GET':
             serializer = UserSerializer(user_profile)
             return Response(serializer.data, status=status.HTTP_200_OK)
@@ -89,3 +100,36 @@ class UserViewSet(viewsets.ModelViewSet):
         serializer.is_valid(raise_exception=True)
         serializer.save()
         return Response(serializer.data, status=status.HTTP_200_OK)
+
+    @action(methods=['GET'], detail=True, permission_classes=(AllowAny, ))
+    def reviews(self, request, username=None):
+        return self.activity(request, username, 'reviews', REVIEW_LIST)
+
+    @action(methods=['GET'], detail=True, permission_classes=(AllowAny, ))
+    def comments(self, request, username=None):
+        return self.activity(request, username, 'comments', COMMENT_LIST)
+
+    def activity(self, request, username, related, lean_serializer):
+        """
+        Page through the reviews or comments of a user with keyset
+        pagination along the author index. The totals are the counts
+        stored on the user.
+        """
+        users = User.objects.only('pk', 'review_count', 'comment_count')
+        if username == 'me':
+            if not request.user.is_authenticated:
+                raise NotAuthenticated()
+            user = get_object_or_404(users, pk=request.user.pk)
+        else:
+            user = get_object_or_404(users, username=username)
+        paginator = PubDateCursorPagination()
+        page = paginator.paginate_queryset(
+            lean_serializer.get_rows(getattr(user, related).all()),
+            request, view=self)
+        return Response({
+            'review_count': user.review_count,
+            'comment_count': user.comment_count,
+            'next': paginator.get_next_link(),
+            'previous': paginator.get_previous_link(),
+            'results': lean_serializer.to_representation(page),
+        })